@@ -4,34 +4,55 @@ Exploratory analysis: investigates public data sets
 related to accountability,
 employing data analysis techniques."""
 
-import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from services.datasets import dataset_store, load_dataset
+from services.sketches import DEFAULT_CONFIDENCE, describe
+
 st.set_page_config(page_title='Análise Exploratória', layout='wide')
 st.title('Despesas de Empenho da Rubrica Diárias do País')
 
 
 @st.cache_data
-def load_data():
+def load_data(version):
     """
     Loads and processes public accountability data from a CSV file.
 
-    The function reads data from 'data/dados.csv', calculates the proportion
+    The function reads the shared 'dados' dataset, calculates the proportion
     of 'VALOREMPENHO' to 'PIB', and returns the processed DataFrame. The
     result is cached to optimize performance for repeated calls.
 
+    Parameters:
+        version (str): The `dataset_store.version` of the dataset, so that editing the file reloads it.
+
     Returns:
         pd.DataFrame: A DataFrame containing the loaded and processed data.
     """
 
-    dados = pd.read_csv('data/dados.csv', sep=';')
-    dados['PROPORCAO'] = dados['VALOREMPENHO'] / dados['PIB']
+    dados = load_dataset('dados')
+    return dados.assign(PROPORCAO=dados['VALOREMPENHO'] / dados['PIB'])
+
+
+@st.cache_data
+def summarize(version):
+    """
+    Summary table of the 'dados' dataset, read from its file chunk by chunk.
+
+    The quartiles come from mergeable sketches, exact while a column fits in one.
+
+    Parameters:
+        version (str): The `dataset_store.version` of the dataset, so that editing the file recomputes it.
 
-    return dados
+    Returns:
+        tuple: The table and the rank error bound of the quartiles of each column; see `describe`.
+    """
+    with dataset_store.chunks('dados') as reader:
+        return describe(chunk.assign(PROPORCAO=chunk['VALOREMPENHO'] / chunk['PIB']) for chunk in reader)
 
 
-dados = load_data()
+version = dataset_store.version('dados')
+dados = load_data(version)
 
 with st.sidebar:
     st.header('Configurações')
@@ -41,7 +62,13 @@ tab1, tab2, tab3 = st.tabs(['Visão Geral', 'Análises Detalhadas', 'Maiores Val
 
 with tab1:
     st.header('Resumo dos Dados')
-    st.dataframe(dados.describe())
+    resumo, erros = summarize(version)
+    st.dataframe(resumo)
+    if erros.max() > 0:
+        st.caption(
+            f'Quartis aproximados: erro de posição de até {erros.max():.2%} dos valores, '
+            f'com {DEFAULT_CONFIDENCE:.0%} de confiança.'
+        )
 
 with tab2:
     st.header('Distribuição dos Dados')
@@ -9,8 +9,11 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 from matplotlib import pyplot as plt
-from pmdarima import auto_arima
-from statsmodels.tsa.api import ExponentialSmoothing, Holt
+
+from services.backtesting import DEFAULT_ORIGINS, MIN_TRAIN, backtest
+from services.cache import cache_key, forecast_cache
+from services.charts import decimate
+from services.forecasting import DEFAULT_TIMEOUT, forecast_methods
 
 st.set_page_config(page_title='Benchmark de Séries Temporais', layout='wide')
 st.title('Benchmark de Séries Temporais')
@@ -46,67 +49,32 @@ def plot_forecasts(actual, forecasts, titles):
     Returns:
     matplotlib.pyplot: The plot object with the actual and forecasted data series.
     """
-    plt.figure(figsize=(10, 6))
-    plt.plot(actual, label='Dados Atuais')
+    figure = plt.figure(figsize=(10, 6))
+    # Each series is reduced to the lowest and highest point of each pixel column of the figure.
+    width = int(figure.get_figwidth() * figure.dpi)
+    plt.plot(*decimate(np.arange(len(actual)), actual, width, method='minmax'), label='Dados Atuais')
     for forecast, title in zip(forecasts, titles):
-        plt.plot(np.arange(len(actual), len(actual) + len(forecast)), forecast, label=title)
+        steps = np.arange(len(actual), len(actual) + len(forecast))
+        plt.plot(*decimate(steps, forecast, width, method='minmax'), label=title)
     plt.legend()
     plt.title('Benchmark de Séries Temporais')
     plt.grid(True)
     return plt
 
 
-def forecast_methods(train, h, methods):
+def cached_run(key, compute):
     """
-    Generate forecasts using specified methods for a given training dataset.
-
-    Parameters:
-    train (pd.Series): The training data series used for forecasting.
-    h (int): The forecast horizon, indicating the number of periods to predict.
-    methods (dict): A dictionary specifying which forecasting methods to use,
-        with keys as method names ('naive', 'mean', 'drift', 'holt', 'hw', 'arima')
-        and values as booleans indicating whether to apply the method.
+    Return the result stored under `key` in the forecast cache, computing it on a miss.
 
-    Returns:
-    tuple: A tuple containing two lists:
-        - forecast (list): A list of forecasted values for each selected method.
-        - titles (list): A list of method names corresponding to each forecast.
+    Results in which a method timed out or failed are returned but not stored, so the
+    next request gets another chance to fit every method.
     """
-    forecast = []
-    titles = []
-
-    if methods['naive']:
-        naive_forecast = np.tile(train.iloc[-1], h)
-        forecast.append(naive_forecast)
-        titles.append('Naive')
-
-    if methods['mean']:
-        mean_forecast = np.tile(train.mean(), h)
-        forecast.append(mean_forecast)
-        titles.append('Mean')
-
-    if methods['drift']:
-        drift_forecast = train.iloc[-1] + (np.arange(1, h + 1) * ((train.iloc[-1] - train.iloc[0]) / (len(train) - 1)))
-        forecast.append(drift_forecast)
-        titles.append('Drift')
-
-    if methods['holt']:
-        holt_forecast = Holt(train).fit().forecast(h)
-        forecast.append(holt_forecast)
-        titles.append('Holt')
-
-    if methods['hw']:
-        hw_forecast = ExponentialSmoothing(train, seasonal='additive', seasonal_periods=12).fit().forecast(h)
-        forecast.append(hw_forecast)
-        titles.append('HW Additive')
-
-    if methods['arima']:
-        arima_model = auto_arima(train, seasonal=True, m=12, suppress_warnings=True)
-        arima_forecast = arima_model.predict(n_periods=h)
-        forecast.append(arima_forecast)
-        titles.append('ARIMA')
-
-    return forecast, titles
+    result = forecast_cache.get(key)
+    if result is None:
+        result = compute()
+        if all(timing['status'] == 'ok' for timing in result[-1]):
+            forecast_cache.set(key, result)
+    return result
 
 
 with st.sidebar:
@@ -115,6 +83,9 @@ with st.sidebar:
     if uploaded_file is not None:
         data_range = st.date_input('Informe o Período', [])
         forecast_horizon = st.number_input('Informe o Perído de Previsão', min_value=1, value=24, step=1)
+        mode = st.radio('Modo', ['Previsão', 'Backtesting (origem móvel)'])
+        if mode == 'Backtesting (origem móvel)':
+            n_origins = st.number_input('Quantidade de Origens', min_value=1, value=DEFAULT_ORIGINS, step=1)
         st.write('Escolha os Métodos de Previsão:')
 
         methods = {
@@ -125,6 +96,7 @@ with st.sidebar:
             'hw': st.checkbox('Holt-Winters', value=True),
             'arima': st.checkbox('ARIMA', value=True),
         }
+        timeout = st.number_input('Tempo limite por método (segundos)', min_value=1.0, value=DEFAULT_TIMEOUT, step=10.0)
         process_button = st.button('Processar')
 
 if uploaded_file is not None:
@@ -139,9 +111,34 @@ if uploaded_file is not None:
             with st.spinner('Processando... Por Favor Aguarde!'):
                 start_date, end_date = data_range
                 train = data.iloc[:, 0]
-                forecasts, titles = forecast_methods(train, forecast_horizon, methods)
-                plt = plot_forecasts(train, forecasts, titles)
-                st.pyplot(plt)
+                if mode == 'Previsão':
+                    forecasts, titles, timings = cached_run(
+                        cache_key('forecast_methods', train, forecast_horizon, methods),
+                        lambda: forecast_methods(train, forecast_horizon, methods, timeout),
+                    )
+                    plt = plot_forecasts(train, forecasts, titles)
+                    st.pyplot(plt)
+                else:
+                    try:
+                        metrics, timings = cached_run(
+                            cache_key('backtest', train, forecast_horizon, methods, n_origins),
+                            lambda: backtest(train, forecast_horizon, methods, n_origins, timeout),
+                        )
+                    except ValueError:
+                        st.error(
+                            f'O backtest com horizonte de {forecast_horizon} precisa de uma série com pelo menos '
+                            f'{MIN_TRAIN + forecast_horizon} observações; a série tem {len(train)}.'
+                        )
+                        st.stop()
+                    st.write('Erros médios por método em todas as origens')
+                    st.dataframe(metrics.style.highlight_min(axis=0))
+                st.write('Tempo por método (segundos)')
+                st.dataframe(pd.DataFrame(timings), hide_index=True)
+                for timing in timings:
+                    if timing['status'] != 'ok':
+                        st.warning(f'{timing["method"]}: {timing["status"]}')
+                cache_stats = forecast_cache.stats()
+                st.caption(f'Cache de previsões: {cache_stats["hits"]} acertos, {cache_stats["misses"]} falhas')
 
     elif process_button:
         st.warning('Por favor selecioone um perído de datas válidos')
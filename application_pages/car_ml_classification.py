@@ -4,74 +4,45 @@ using classification algorithms.
 https://www.notion.so/elzasimoes/IA-Streamlit-Previs-o-da-Qualidade-de-Ve-culos-1411bb8db8cb8097a1aae9c8389bf014?pvs=4
 """
 
-import pandas as pd
 import streamlit as st
-from sklearn.metrics import accuracy_score
-from sklearn.model_selection import train_test_split
-from sklearn.naive_bayes import CategoricalNB
-from sklearn.preprocessing import OrdinalEncoder
 
-st.set_page_config(layout='wide', page_title='Classificação de Veículos')
-
-
-@st.cache_data
-def load_data_and_model():
-    """
-    Loads vehicle classification data, encodes categorical features,
-    splits the data into training and testing sets,
-    trains a Categorical Naive Bayes model, and returns the encoder,
-    trained model, and accuracy score.
-
-    Returns:
-        encoder (OrdinalEncoder): The encoder used for transforming categorical features.
-        model (CategoricalNB): The trained Naive Bayes model.
-        accuracy (float): The accuracy score of the model on the test data.
-    """
-
-    # The function reads a CSV file named
-    # 'car_ml_classification.csv' into a DataFrame.
-    cars = pd.read_csv('data/car_ml_classification.csv', sep=',')
-    # An OrdinalEncoder is instantiated.
-    encoder = OrdinalEncoder()
-
-    # Each column in the DataFrame, except for 'class',
-    # is converted to a categorical type.
-    for col in cars.columns.drop('class'):
-        cars[col] = cars[col].astype('category')
-
-    # The target labels are extracted and encoded as categorical codes
-
-    X_encoded = encoder.fit_transform(cars.drop('class', axis=1))
-    # A NumPy array of encoded features
-
-    y = cars['class'].astype('category').cat.codes
-    # A Pandas Series of encoded target labels.
-
-    # plit data into training and testing sets.
-    X_train, X_test, y_train, y_test = train_test_split(X_encoded, y, test_size=0.3, random_state=42)
-    # Train a CategoricalNB model and predict test data.
-    model = CategoricalNB()
-    model.fit(X_train, y_train)
-
-    # Calculate and return the accuracy score.
-    y_pred = model.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
-
-    return encoder, model, accuracy, cars
+from services.car_quality import DEFAULT_CHUNK_SIZE, FEATURES, LEVELS, train_streaming
+from services.datasets import dataset_store
+from services.models import model_registry
 
+st.set_page_config(layout='wide', page_title='Classificação de Veículos')
 
-encoder, model, accuracy, cars = load_data_and_model()
+HOLDOUT = 0.3
+RANDOM_STATE = 42
+
+# Trained once per version of the dataset and shared by every session. The file is
+# streamed in chunks, so its size is not bounded by memory, and training tabulates the
+# prediction of every combination of attributes, so predicting is a lookup.
+fitted, model_info = model_registry.get_or_fit(
+    'car_quality',
+    dataset_store.version('car_ml_classification'),
+    {'holdout': HOLDOUT, 'seed': RANDOM_STATE},
+    lambda: train_streaming(
+        dataset_store.path('car_ml_classification'), DEFAULT_CHUNK_SIZE, holdout=HOLDOUT, seed=RANDOM_STATE
+    ),
+)
+table = fitted['table']
+accuracy = model_info['metrics']['accuracy']
 
 st.title('Previsão de qualidade de veículo')
 st.write(f'Acuracia do modelo: {accuracy:.2f}')
+st.caption(
+    f'Treinado em {model_info["metrics"]["train_rows"]} linhas, '
+    f'{model_info["metrics"]["rows_per_second"]:,.0f} linhas/s'
+)
 
 input_features = [
-    st.selectbox('Preço:', cars['buying'].unique()),
-    st.selectbox('Manutenção:', cars['maint'].unique()),
-    st.selectbox('Portas:', cars['doors'].unique()),
-    st.selectbox('Capacidade de Passageiros:', cars['persons'].unique()),
-    st.selectbox('Porta Malas:', cars['lug_boot'].unique()),
-    st.selectbox('Segurança:', cars['safety'].unique()),
+    st.selectbox('Preço:', LEVELS['buying']),
+    st.selectbox('Manutenção:', LEVELS['maint']),
+    st.selectbox('Portas:', LEVELS['doors']),
+    st.selectbox('Capacidade de Passageiros:', LEVELS['persons']),
+    st.selectbox('Porta Malas:', LEVELS['lug_boot']),
+    st.selectbox('Segurança:', LEVELS['safety']),
 ]
 
 class_mapping = {'unacc': 'Inaceitável', 'acc': 'Aceitável', 'good': 'Bom', 'vgood': 'Muito bom'}
@@ -79,8 +50,28 @@ class_mapping = {'unacc': 'Inaceitável', 'acc': 'Aceitável', 'good': 'Bom', 'v
 processing = st.button('Processar')
 
 if processing is True:
-    input_df = pd.DataFrame([input_features], columns=cars.columns.drop('class'))
-    inputt_encoded = encoder.transform(input_df)
-    predict_encoded = model.predict(inputt_encoded)
-    final_prev = cars['class'].astype('category').cat.categories[predict_encoded][0]
+    final_prev = table.predict_one(input_features)
     st.write(f'A condição do carro é {class_mapping.get(final_prev)}')
+
+st.header('Previsão em lote')
+vehicles_file = st.file_uploader(
+    f'Arquivo CSV de veículos (colunas {", ".join(FEATURES)})', type='csv', key='vehicles_file'
+)
+if vehicles_file is not None:
+    # The file is scored only on request and the result kept until the file or the model
+    # changes, so other interactions on the page do not scan it again.
+    batch_key = (vehicles_file.file_id, model_info['key'])
+    if st.button('Avaliar lote'):
+        vehicles_file.seek(0)
+        try:
+            st.session_state['vehicles_batch'] = (batch_key, *table.score_csv(vehicles_file))
+        except ValueError as error:
+            st.error(f'Não foi possível avaliar o arquivo: {error}')
+    batch = st.session_state.get('vehicles_batch')
+    if batch is not None and batch[0] == batch_key:
+        _, scored, counts = batch
+        st.write(f'{counts.sum()} veículos avaliados')
+        st.dataframe(
+            counts.rename(index=lambda label: class_mapping.get(label, 'Atributos desconhecidos')).rename('Veículos')
+        )
+        st.download_button('Baixar previsões', scored, file_name='previsoes_veiculos.csv', mime='text/csv')
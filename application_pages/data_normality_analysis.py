@@ -3,14 +3,19 @@ Normal distribution: explore statistical techniques to verify the normality of t
 essential in many statistical analyzes and inferences.
 This code sets up a Streamlit application to test the normality of a dataset using statistical techniques.
 It allows users to upload a CSV file, then generates a histogram and a QQ plot of the data.
-It also performs a Shapiro-Wilk test to determine
+It also performs a Shapiro-Wilk test and other normality tests to determine
 if the data follows a normal distribution.
+The file is read in chunks, so files of any size are summarized in bounded memory;
+the tests that need every value run on a uniform random sample, as the report says,
+and the QQ plot is drawn from a fixed number of quantiles of the full data.
 """
 
 import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
 import streamlit as st
-from scipy import stats
+
+from services.normality import FULL_DATA, MIN_VALUES, SAMPLE, TooFewValuesError, qq_points, stream_normality
+from services.sketches import DEFAULT_CONFIDENCE
 
 st.set_page_config('Teste de normalidade dos dados', layout='wide')
 
@@ -23,39 +28,74 @@ with st.sidebar:
 
 if process_button is True and upload_file is not None:
     try:
-        # The code reads the CSV file and checks for valid data.
-        data = pd.read_csv(upload_file, header=None)
-        if data.empty or data.iloc[:, 0].isnull().all():
+        # The file is read in chunks, keeping only summaries of the first column whose size
+        # does not depend on the number of rows.
+        try:
+            summary = stream_normality(upload_file)
+        except TooFewValuesError as error:
+            if error.n:
+                st.error(
+                    f'A primeira coluna tem apenas {error.n} valor(es) válido(s); '
+                    f'são necessários pelo menos {MIN_VALUES} para testar a normalidade'
+                )
+            else:
+                st.error('O arquivo está vazio ou a primeira coluna não tem dados válidos')
+            st.stop()
+        except ValueError:
             st.error('O arquivo está vazio ou a primeira coluna não tem dados válidos')
-            raise (FileExistsError, FileNotFoundError)
+            st.stop()
+        tests, sample, sketch = summary['tests'], summary['sample'], summary['sketch']
+        n_rows = summary['moments'].n
 
         fig1, fig2 = st.columns(2)
 
         with fig1:
-            # It generates a histogram and a QQ plot of the first column of the dataset.
+            # It draws the histogram counted over the whole column and a QQ plot of its quantiles.
+            histogram = summary['histogram']
+            filled = np.flatnonzero(histogram.counts)
+            counts, edges = histogram.counts[filled[0] : filled[-1] + 1], histogram.edges[filled[0] : filled[-1] + 2]
             fig_hist, ax_hist = plt.subplots()
-            ax_hist.hist(data.iloc[:, 0].dropna(), bins='auto', color='blue', alpha=0.7, rwidth=0.85)
+            ax_hist.stairs(counts, edges, fill=True, color='blue', alpha=0.7)
             ax_hist.set_title('Histograma')
             st.pyplot(fig_hist)
 
         with fig2:
+            theoretical, observed = qq_points(sketch)
+            slope, intercept = np.polyfit(theoretical, observed, 1)
             fig_qq, ax_qq = plt.subplots()
-            stats.probplot(data.iloc[:, 0].dropna(), dist='norm', plot=ax_qq)
-            ax_qq.set_title('QQ Plot')
+            ax_qq.plot(theoretical, observed, 'bo')
+            ax_qq.plot(theoretical, slope * theoretical + intercept, 'r-')
+            ax_qq.set_xlabel('Theoretical quantiles')
+            ax_qq.set_ylabel('Ordered Values')
+            ax_qq.set_title('QQ Plot' if len(observed) == n_rows else f'QQ Plot ({len(observed)} quantis)')
             st.pyplot(fig_qq)
+            if not sketch.exact:
+                st.caption(
+                    f'Quantis aproximados: erro de posição de até {sketch.rank_error():.2%} dos valores, '
+                    f'com {DEFAULT_CONFIDENCE:.0%} de confiança.'
+                )
 
-        # A Shapiro-Wilk test is performed on the data.
-        shapiro_test = stats.shapiro(data.iloc[:, 0].dropna())
-        st.write(f'Valor de P: {shapiro_test.pvalue: .5f}')
+        # Shapiro-Wilk decides when it ran on the full data; D'Agostino-Pearson on larger files.
+        tests = tests.set_index('teste')
+        on_full_data = 'Shapiro-Wilk' in tests.index and tests.loc['Shapiro-Wilk', 'base'] == FULL_DATA
+        decisive = 'Shapiro-Wilk' if on_full_data else "D'Agostino-Pearson"
+        pvalue = tests.loc[decisive, 'valor_p']
+        st.write(f'Valor de P ({decisive}): {pvalue: .5f}')
 
         # The result of the test is displayed, indicating whether the data is normally distributed.
         SHAPIRO_ACCEPT_VALUE = 0.05
-        if shapiro_test.pvalue > SHAPIRO_ACCEPT_VALUE:
+        if pvalue > SHAPIRO_ACCEPT_VALUE:
             st.success('Não existem evidências para rejeitar a hipótese de normalidade dos dados')
 
         else:
             st.error('Existem evidências suficientes para rejeitar a hipótese de normalidade dos dados')
 
+        st.dataframe(tests)
+        coverage = f'Os testes sobre "{FULL_DATA}" usam os {n_rows} valores válidos da coluna'
+        if len(sample) < n_rows:
+            coverage += f'; os testes sobre "{SAMPLE}" usam uma amostra aleatória uniforme de {len(sample)} valores'
+        st.caption(f'{coverage}. {summary["missing"]} valores ausentes ou não numéricos foram ignorados.')
+
     except FileNotFoundError:
         st.error('Arquivo não encontrado')
     except Exception as e:
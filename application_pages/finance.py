@@ -1,36 +1,81 @@
 from datetime import date
 
+import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-import yfinance as yf
+from plotly.subplots import make_subplots
+
+from services.charts import aggregate_ohlc, decimate, line_trace
+from services.indicators import correlation, indicator_cache, price_matrix
+from services.prices import TICKER_PATTERN, price_store
+
+TICKERS = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'PETR4.SA', 'VALE3.SA', 'ITUB4.SA']
 
 st.set_page_config(page_title='Visualizador de Ações', layout='wide')
 st.title('Visualizador de Ações')
 
 with st.sidebar:
-    empresa_selecionada = st.selectbox(
-        'Selecione a empresa para visualizar:', ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA']
-    )
+    empresas_selecionadas = st.multiselect('Selecione as empresas para visualizar:', TICKERS, default=['AAPL'])
+    outras_empresas = st.text_input('Outras empresas (tickers separados por vírgula):')
     start_date = st.date_input('Data de Início', value=date(2020, 1, 1))
     end_date = st.date_input('Data de Fim', value=date(2020, 1, 15))
     gerar_graficos = st.button('Gerar Gráficos')
 
 if gerar_graficos:
-    data = yf.download(empresa_selecionada, start=start_date, end=end_date)
-    if data.size > 0:
-        tab1, tab2, tab3, tab4 = st.tabs(['Preço Fechado Ajustado', 'Volume', 'Gráfico de Velas', 'Dados'])
+    outras = [ticker.strip().upper() for ticker in outras_empresas.split(',') if ticker.strip()]
+    invalidas = [ticker for ticker in outras if not TICKER_PATTERN.fullmatch(ticker)]
+    if invalidas:
+        st.warning(f'Tickers inválidos ignorados: {", ".join(invalidas)}')
+    tickers = [*empresas_selecionadas, *(ticker for ticker in outras if ticker not in invalidas)]
+    # The tickers are fetched concurrently, and only the days not fetched before are downloaded.
+    with st.spinner('Carregando cotações...'):
+        prices, errors = price_store.get_many(tickers, start_date, end_date)
+    # The prices are kept so that choosing another company below neither clears the charts
+    # nor asks the source again for the days the store does not record, such as today.
+    st.session_state['finance_request'] = (prices, errors, start_date, end_date)
+
+if 'finance_request' in st.session_state:
+    prices, errors, start, end = st.session_state['finance_request']
+    prices = dict(prices)
+    for ticker, error in errors.items():
+        st.warning(f'Erro ao carregar {ticker}: {error}')
+    for ticker in [ticker for ticker, data in prices.items() if data.size == 0]:
+        st.warning(f'Nenhuma cotação de {ticker} no período')
+        del prices[ticker]
+
+    if prices:
+        matrix = price_matrix(prices)
+        indicators = indicator_cache.indicators(matrix, start, end)
+        empresa_selecionada = st.selectbox('Empresa em detalhe:', list(prices))
+        data = prices[empresa_selecionada]
+        if len(data) > 1:
+            # The charts are decimated to their width, so a shorter window shows finer detail.
+            janela = st.slider(
+                'Janela dos gráficos:',
+                min_value=data.index[0].date(),
+                max_value=data.index[-1].date(),
+                value=(data.index[0].date(), data.index[-1].date()),
+            )
+            data = data.loc[str(janela[0]) : str(janela[1])]
+        bars = aggregate_ohlc(data)
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+            'Preço Fechado Ajustado',
+            'Volume',
+            'Gráfico de Velas',
+            'Indicadores',
+            'Comparação',
+            'Dados',
+        ])
         with tab1:
             fig_close = go.Figure()
-            fig_close.add_trace(
-                go.Scatter(x=data.index, y=data['Adj Close'], mode='lines', name='Preço Fechado Ajustado')
-            )
+            fig_close.add_trace(line_trace(data.index, data['Adj Close'], name='Preço Fechado Ajustado'))
             fig_close.update_layout(
                 title=f'Histórico de Preços para {empresa_selecionada}', xaxis_title='Data', yaxis_title='Preço'
             )
             st.plotly_chart(fig_close, use_container_width=True)
         with tab2:
             fig_volume = go.Figure()
-            fig_volume.add_trace(go.Bar(x=data.index, y=data['Volume']))
+            fig_volume.add_trace(go.Bar(x=bars.index, y=bars['Volume']))
             fig_volume.update_layout(
                 title=f'Volume de Negociação para a empresa {empresa_selecionada}',
                 xaxis_title='Data',
@@ -41,7 +86,7 @@ if gerar_graficos:
             fig_candle = go.Figure(
                 data=[
                     go.Candlestick(
-                        x=data.index, open=data['Open'], high=data['High'], low=data['Low'], close=data['Close']
+                        x=bars.index, open=bars['Open'], high=bars['High'], low=bars['Low'], close=bars['Close']
                     )
                 ]
             )
@@ -50,6 +95,50 @@ if gerar_graficos:
             )
             st.plotly_chart(fig_candle, use_container_width=True)
         with tab4:
+            values = {name: frame[empresa_selecionada].loc[data.index] for name, frame in indicators.items()}
+            fig_indicators = make_subplots(
+                rows=3,
+                cols=1,
+                shared_xaxes=True,
+                row_heights=[0.6, 0.2, 0.2],
+                subplot_titles=['Preço, médias móveis e bandas de Bollinger', 'IFR', 'MACD'],
+            )
+            for name, label in [
+                ('bollinger_superior', 'Bollinger superior'),
+                ('bollinger_inferior', 'Bollinger inferior'),
+                ('mms', 'Média móvel simples'),
+                ('mme', 'Média móvel exponencial'),
+            ]:
+                fig_indicators.add_trace(
+                    line_trace(data.index, values[name], name=label, line={'width': 1}), row=1, col=1
+                )
+            fig_indicators.add_trace(
+                line_trace(data.index, data['Adj Close'], name='Preço Fechado Ajustado'), row=1, col=1
+            )
+            fig_indicators.add_trace(line_trace(data.index, values['ifr'], name='IFR'), row=2, col=1)
+            histogram_x, histogram_y = decimate(data.index, values['macd_histograma'], method='minmax')
+            fig_indicators.add_trace(go.Bar(x=histogram_x, y=histogram_y, name='Histograma'), row=3, col=1)
+            fig_indicators.add_trace(line_trace(data.index, values['macd'], name='MACD'), row=3, col=1)
+            fig_indicators.add_trace(line_trace(data.index, values['macd_sinal'], name='Sinal'), row=3, col=1)
+            fig_indicators.update_layout(title=f'Indicadores para a empresa {empresa_selecionada}', height=800)
+            st.plotly_chart(fig_indicators, use_container_width=True)
+        with tab5:
+            returns = indicators['retorno']
+            cumulative = (1 + returns.fillna(0)).cumprod() - 1
+            fig_returns = go.Figure()
+            for ticker in cumulative.columns:
+                fig_returns.add_trace(line_trace(cumulative.index, cumulative[ticker], name=ticker))
+            fig_returns.update_layout(
+                title='Retorno acumulado', xaxis_title='Data', yaxis_title='Retorno', yaxis_tickformat='.0%'
+            )
+            st.plotly_chart(fig_returns, use_container_width=True)
+            if len(prices) > 1:
+                fig_correlation = px.imshow(
+                    correlation(returns), zmin=-1, zmax=1, color_continuous_scale='RdBu', text_auto='.2f'
+                )
+                fig_correlation.update_layout(title='Correlação dos retornos diários')
+                st.plotly_chart(fig_correlation, use_container_width=True)
+        with tab6:
             st.dataframe(data)
 
     else:
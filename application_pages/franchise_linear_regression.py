@@ -1,34 +1,61 @@
-"""This code snippet creates and fits a linear regression model using the
-LinearRegression class from the sklearn library.
-It uses the input features X and the target variable y to train the model.
+"""This code snippet creates and fits a linear regression model from the
+running sufficient statistics of `services.franchise.IncrementalOLS`.
+It uses the input features X and the target variable y to train the model,
+and new observed franchises update the fit without refitting.
 https://www.notion.so/elzasimoes/IA-Streamlit-Prevendo-Custos-para-abrir-uma-Franquia-Regress-o-1411bb8db8cb809da5a1ee80e1317b6b?pvs=4
 """
 
+import copy
+
 import matplotlib.pyplot as plt
-import pandas as pd
 import plotly.express as px
 import streamlit as st
-from sklearn.linear_model import LinearRegression
+
+from services.datasets import dataset_store, load_dataset
+from services.franchise import FEATURE, TARGET, IncrementalOLS, predict_csv
+from services.models import model_registry
 
 st.title('Previsão inicial de custo para Franquia utilizando regressão Linear')
 
-franchise_data = pd.read_csv('data/franchise_linear_regression.csv', sep=';')
+
+def fit_model():
+    """
+    Fit the linear regression of the initial cost ('CusInic') by annual fee ('FrqAnual').
+
+    Returns:
+        tuple: The fitted IncrementalOLS and its metrics ('r2' on the training data).
+    """
+    data = load_dataset('franchise')
+    model = IncrementalOLS.fit(data[FEATURE], data[TARGET])
+    return model, {'r2': model.r2}
+
+
+franchise_data = load_dataset('franchise')
 
 X = franchise_data[['FrqAnual']]
 # A DataFrame containing the feature(s) for the linear regression model.
 y = franchise_data['CusInic']
 # y: A Series containing the target variable for the linear regression model.
 
-# Fit the linear regression model
-model = LinearRegression().fit(X, y)
+# Fit the linear regression model, once per version of the dataset
+base_model, model_info = model_registry.get_or_fit('franchise_ols', dataset_store.version('franchise'), {}, fit_model)
+# Each session updates its own copy with the franchises it observes.
+if st.session_state.get('franchise_model_key') != model_info['key']:
+    st.session_state['franchise_model_key'] = model_info['key']
+    st.session_state['franchise_model'] = copy.deepcopy(base_model)
+model = st.session_state['franchise_model']
 
 st.markdown('### Dados utilizados para treinar o modelo')
 st.dataframe(franchise_data.head(), hide_index=True)
+st.caption(
+    f'R² do modelo: {model_info["metrics"]["r2"]:.3f} '
+    f'(ajustado em {model_info["fit_time"]:.3f} s, {model_info["fitted_at"]})'
+)
 
 st.markdown('### Gráfico de dispersão com Matplot Lib')
 fig, ax = plt.subplots()
 ax.scatter(X, y, color='blue', label='Data Points')
-ax.plot(X, model.predict(X), color='red', label='Model Prediction')
+ax.plot(X, model.predict(X[FEATURE]), color='red', label='Model Prediction')
 ax.set_xlabel('X')
 ax.set_ylabel('y')
 ax.legend()
@@ -47,7 +74,7 @@ fig_2 = px.scatter(
 
 fig_2.add_scatter(
     x=franchise_data['FrqAnual'],
-    y=model.predict(franchise_data[['FrqAnual']]),
+    y=model.predict(franchise_data['FrqAnual']),
     mode='lines',
     name='Linha de Regressão',
     line=dict(color='red', dash='dash'),
@@ -68,6 +95,35 @@ new_value = st.number_input(
 processing = st.button('Processar')
 
 if processing is True:
-    new_value_data = pd.DataFrame([new_value], columns=['FrqAnual'])
-    prev = model.predict(new_value_data)
+    prev, lower, upper = model.interval([new_value])
     st.header(f'Nova previsão de custo inicial R$: {prev[0]:.2f}')
+    st.write(f'Intervalo de previsão de 95%: R$ {lower[0]:.2f} a R$ {upper[0]:.2f}')
+
+st.header('Franquia observada')
+with st.form('observed_franchise'):
+    observed_fee = st.number_input('Valor anual observado', min_value=1.0, max_value=9999.0, value=1500.0)
+    observed_cost = st.number_input('Custo inicial observado', min_value=1.0, max_value=99999.0, value=1500.0)
+    if st.form_submit_button('Atualizar modelo'):
+        model.update(observed_fee, observed_cost)
+st.caption(
+    f'Modelo com {model.n} franquias ({model.n - base_model.n} adicionadas nesta sessão): '
+    f'custo = {model.intercept:.2f} + {model.slope:.4f} x valor anual'
+)
+
+st.header('Previsão em lote')
+candidates_file = st.file_uploader(f'Arquivo CSV de franquias (separado por ";", coluna {FEATURE})', type='csv')
+if candidates_file is not None:
+    # The file is scored only on request and the result kept until the file or the model
+    # changes, so other interactions on the page do not score it again.
+    batch_key = (candidates_file.file_id, model.n, model.intercept, model.slope)
+    if st.button('Prever lote'):
+        candidates_file.seek(0)
+        try:
+            st.session_state['franchise_batch'] = (batch_key, *predict_csv(model, candidates_file))
+        except ValueError as error:
+            st.error(f'Não foi possível processar o arquivo: {error}')
+    batch = st.session_state.get('franchise_batch')
+    if batch is not None and batch[0] == batch_key:
+        _, predictions, n_rows = batch
+        st.write(f'{n_rows} franquias previstas, com intervalos de previsão de 95%')
+        st.download_button('Baixar previsões', predictions, file_name='previsoes_franquias.csv', mime='text/csv')
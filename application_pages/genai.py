@@ -1,11 +1,46 @@
+import os
+
 import streamlit as st
-import torch
-from diffusers import EulerDiscreteScheduler, StableDiffusionPipeline
+
+from services.diffusion import DEFAULT_MODEL, PipelinePool
+from services.generation_queue import GenerationQueue, QueueFullError
+from services.image_cache import DEFAULT_MAX_BYTES, ImageCache
 
 st.set_page_config(page_title='IA Generativa', layout='wide')
 st.title('Gerador de Imagens com Stable Diffusion')
 
 
+@st.cache_resource
+def get_pipeline_pool():
+    """
+    Create the pipeline pool shared by every session of the server process.
+
+    The model (a Hugging Face id or a local directory) and the number of pipelines kept
+    in memory come from the SD_MODEL_PATH and SD_POOL_SIZE environment variables.
+    """
+    return PipelinePool(os.environ.get('SD_MODEL_PATH', DEFAULT_MODEL), size=int(os.environ.get('SD_POOL_SIZE', '1')))
+
+
+@st.cache_resource
+def get_generation_queue():
+    """Create the queue that batches the requests of every session into shared pipeline calls."""
+    return GenerationQueue(get_pipeline_pool())
+
+
+@st.cache_resource
+def get_image_cache():
+    """
+    Open the store of generated images for the current model and scheduler.
+
+    Images of any other model are dropped. The size limit, in megabytes, comes from the
+    SD_IMAGE_CACHE_MB environment variable.
+    """
+    max_bytes = int(os.environ.get('SD_IMAGE_CACHE_MB', DEFAULT_MAX_BYTES // 1024**2)) * 1024**2
+    cache = ImageCache(get_pipeline_pool().fingerprint, max_bytes=max_bytes)
+    cache.prune_other_models()
+    return cache
+
+
 def generate_images(
     prompt, negative_prompt, num_images_per_prompt, num_inference_steps, height, width, seed, guidance_scale
 ):
@@ -16,6 +51,10 @@ def generate_images(
     based on the provided prompts and configuration parameters. The generation
     process can be influenced by various factors such as the number of images,
     inference steps, image dimensions, random seed, and guidance scale.
+    The request goes through the shared generation queue, which batches it with
+    compatible requests from other sessions; the model is only loaded the first
+    time it is used. Images generated before with the same parameters are read
+    from the image cache instead.
 
     Args:
         prompt (str): The text prompt to guide the image generation.
@@ -28,24 +67,22 @@ def generate_images(
         guidance_scale (float): Scale for guidance during image generation.
 
     Returns:
-        list: A list of generated images.
+        tuple: A list of generated images and a dict with the seconds spent 'waiting'
+            in the queue, 'loading' the model, the 'inference' time and the 'batch_size'
+            of the shared call, or None when the images came from the cache.
+
+    Raises:
+        QueueFullError: When the generation queue is at capacity.
     """
-    device = 'cuda' if torch.cuda.is_available() else 'cpu'
-    pretrained_model_or_path = 'stabilityai/stable-diffusion-2-1-base'
-    scheduler = EulerDiscreteScheduler.from_pretrained(pretrained_model_or_path, subfolder='scheduler')
-    pipeline = StableDiffusionPipeline.from_pretrained(pretrained_model_or_path, scheduler=scheduler).to(device)
-    generator = torch.Generator(device=device).manual_seed(seed)
-    images = pipeline(
-        prompt=prompt,
-        num_images_per_prompt=num_images_per_prompt,
-        negative_prompt=negative_prompt,
-        num_inference_steps=num_inference_steps,
-        height=height,
-        width=width,
-        generator=generator,
-        guidance_scale=guidance_scale,
-    )['images']
-    return images
+    request = (prompt, negative_prompt, num_images_per_prompt, num_inference_steps, height, width, seed, guidance_scale)
+    cache = get_image_cache()
+    key = cache.key(*request)
+    images = cache.get(key)
+    if images is not None:
+        return images, None
+    images, timings = get_generation_queue().submit(*request).result()
+    cache.set(key, images)
+    return images, timings
 
 
 st.header('Configurações da Geração da Imagem')
@@ -59,11 +96,25 @@ seed = st.number_input('Seed', min_value=0, max_value=99999, value=42)
 guidance_scale = st.number_input('Escala de Orientação', min_value=1.0, max_value=20.0, value=7.5)
 generate_button = st.button('Gerar Imagem')
 
+queue_stats = get_generation_queue().stats()
+st.caption(f'Pedidos na fila: {queue_stats["depth"]} | Espera média recente: {queue_stats["mean_wait"]:.1f} s')
+
 if generate_button and prompt:
     with st.spinner('Gerando Imagens...'):
-        images = generate_images(
-            prompt, negative_prompt, num_images_per_prompt, num_inference_steps, height, width, seed, guidance_scale
-        )
+        try:
+            images, timings = generate_images(
+                prompt, negative_prompt, num_images_per_prompt, num_inference_steps, height, width, seed, guidance_scale
+            )
+        except QueueFullError:
+            st.error('A fila de geração está cheia, tente novamente em instantes')
+            st.stop()
+        if timings is None:
+            st.caption('Imagens recuperadas do cache')
+        else:
+            st.caption(
+                f'Espera na fila: {timings["waiting"]:.1f} s | Carregamento do modelo: {timings["loading"]:.1f} s | '
+                f'Inferência: {timings["inference"]:.1f} s | Imagens no lote: {timings["batch_size"]}'
+            )
         cols = st.columns(len(images))
         for idx, (col, img) in enumerate(zip(cols, images)):
             with col:
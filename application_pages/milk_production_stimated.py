@@ -10,19 +10,51 @@ https://www.notion.so/elzasimoes/IA-Streamlit-Estimativa-da-Produ-o-de-Leite-S-r
 
 """
 
-from datetime import date
+from datetime import date, datetime
 from io import StringIO
+from time import perf_counter
 
 import matplotlib.pyplot as plt
 import pandas as pd
 import streamlit as st
-from statsmodels.tsa.seasonal import seasonal_decompose
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from services.cache import cache_key, forecast_cache
+from services.charts import decimate
 
 st.set_page_config('Análise e Previsão de Séries Temporais', layout='wide')
 
 st.markdown('### Sistema de Análise e Previsão de Séries Temporais')
 
+SARIMAX_ORDER = (2, 0, 0)
+SARIMAX_SEASONAL_ORDER = (0, 1, 1, 12)
+
+
+def sarimax_model(ts_data):
+    """The SARIMAX model of the series, not fitted yet."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX  # noqa: PLC0415
+
+    return SARIMAX(ts_data, order=SARIMAX_ORDER, seasonal_order=SARIMAX_SEASONAL_ORDER)
+
+
+def fit_sarimax(ts_data):
+    """
+    Fit the SARIMAX model to the series.
+
+    Returns:
+        dict: The fitted parameters ('params'), from which `SARIMAX.filter` rebuilds results
+            that forecast any horizon, the 'metrics' ('aic'), the 'fit_time' in seconds and
+            when it was 'fitted_at'.
+    """
+    start = perf_counter()
+    model_fit = sarimax_model(ts_data).fit()
+    return {
+        'params': model_fit.params,
+        'metrics': {'aic': float(model_fit.aic)},
+        'fit_time': perf_counter() - start,
+        'fitted_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
 with st.sidebar:
     # The user uploads a CSV file containing milk production data.
     uploaded_file = st.file_uploader(label='Carregue o arquivo da previsão', type='csv')
@@ -45,18 +77,30 @@ if uploaded_file is not None and processing is True:
             index=pd.date_range(start=inital_period, periods=len(milk_data), freq='M'),
         )
         # The application processes the data, decomposes the time series, and fits a SARIMAX model.
+        from statsmodels.tsa.seasonal import seasonal_decompose
+
         decompose = seasonal_decompose(ts_data, model='additive')
-        fig_decompose = decompose.plot()
-        fig_decompose.set_size_inches(10, 8)
+        # Long series are reduced to the lowest and highest point of each pixel column of the figures.
+        fig_decompose, axes = plt.subplots(4, 1, figsize=(10, 8), sharex=True)
+        width = int(fig_decompose.get_figwidth() * fig_decompose.dpi)
+        components = [decompose.observed, decompose.trend, decompose.seasonal, decompose.resid]
+        for ax, component, label in zip(axes, components, ['Observado', 'Tendência', 'Sazonalidade', 'Resíduos']):
+            ax.plot(*decimate(component.index, component, width, method='minmax'))
+            ax.set_ylabel(label)
+        fig_decompose.tight_layout()
 
         # Forecasts are generated and visualized alongside the original data.
-        model = SARIMAX(ts_data, order=(2, 0, 0), seasonal_order=(0, 1, 1, 12))
-        model_fit = model.fit()
+        # The same series is fitted once, whatever the forecast horizon and the session: the
+        # disk cache keeps its parameters, and filtering with them rebuilds the fitted model
+        # without estimating it again.
+        key = cache_key('sarimax', ts_data.values, inital_period, SARIMAX_ORDER, SARIMAX_SEASONAL_ORDER)
+        model_info = forecast_cache.get_or_set(key, lambda: fit_sarimax(ts_data))
+        model_fit = sarimax_model(ts_data).filter(model_info['params'])
         prev = model_fit.forecast(steps=prev_period)
 
         fig_prev, ax = plt.subplots(figsize=(10, 5))
-        ax = ts_data.plot(ax=ax)
-        prev.plot(ax=ax, style='r--')
+        ax.plot(*decimate(ts_data.index, ts_data, width, method='minmax'))
+        ax.plot(*decimate(prev.index, prev, width, method='minmax'), 'r--')
 
         st.write('Decomposição')
         st.pyplot(fig_decompose)
@@ -67,6 +111,13 @@ if uploaded_file is not None and processing is True:
         st.write('Dados da previsão')
         st.dataframe(prev)
 
+        st.caption(
+            f'Modelo SARIMAX ajustado em {model_info["fit_time"]:.2f} s ({model_info["fitted_at"]}), '
+            f'AIC {model_info["metrics"]["aic"]:.1f}'
+        )
+        cache_stats = forecast_cache.stats()
+        st.caption(f'Cache de previsões: {cache_stats["hits"]} acertos, {cache_stats["misses"]} falhas')
+
     except FileNotFoundError:
         st.error('Arquivo não encontrado. Verifique o caminho.')
     except Exception as e:
@@ -7,6 +7,10 @@ import pandas as pd
 import streamlit as st
 from geneticalgorithm import geneticalgorithm as ga
 
+from services.cargo import item_arrays, population_fitness
+from services.genetic import iterate_island_ga
+from services.knapsack import solve_cargo
+
 st.set_page_config(page_title='Otimização de Transporte de Carga', layout='wide')
 st.title('Otimização de Transporte de Carga')
 
@@ -15,30 +19,6 @@ def load_data(file):
     return pd.read_csv(file, sep=';')
 
 
-def fitness_function(X, data, max_volume, max_weight):
-    """
-    Evaluate the fitness of a solution in a genetic algorithm for cargo transportation.
-
-    Parameters:
-        X (array-like): Binary array indicating selected items.
-        data (DataFrame): DataFrame containing item details with columns 'PESO', 'VOLUME', and 'VALOR'.
-        max_volume (float): Maximum allowable volume for the selected items.
-        max_weight (float): Maximum allowable weight for the selected items.
-
-    Returns:
-        float: Negative sum of the 'VALOR' of selected items if constraints are met;
-            otherwise, returns -1 if weight or volume exceeds the limits.
-    """
-    selected_items = data.iloc[X.astype(bool), :]
-    total_weight = selected_items['PESO'].sum()
-    total_volume = selected_items['VOLUME'].sum()
-
-    if total_weight > max_weight or total_volume > max_volume:
-        return -1
-
-    return -selected_items['VALOR'].sum()
-
-
 data = None
 
 col1, col2 = st.columns(2)
@@ -61,10 +41,21 @@ if uploaded_file is not None:
 if data is not None:
     sobra_peso = st.number_input('Informa a sobra de Peso', value=6000)
     sobra_volume = st.number_input('Informe a sobra de Volume', value=350)
-    iteracao = st.number_input('Informe a quantidade de Iterações', value=10)
+    metodo = st.selectbox(
+        'Método de Otimização', ['Algoritmo Genético', 'Genético em Ilhas (multi-core)', 'Exato (Branch and Bound)']
+    )
+    if metodo == 'Algoritmo Genético':
+        iteracao = st.number_input('Informe a quantidade de Iterações', value=10)
+    elif metodo == 'Genético em Ilhas (multi-core)':
+        ilhas = st.number_input('Quantidade de Ilhas', min_value=1, max_value=32, value=4)
+        geracoes = st.number_input('Máximo de Gerações', min_value=1, value=500)
+        paciencia = st.number_input('Parar após Gerações sem Melhoria', min_value=1, value=100)
+        semente = st.number_input('Semente', min_value=0, value=42)
+    else:
+        tempo_limite = st.number_input('Tempo limite (segundos)', min_value=1.0, value=10.0)
     process_button = st.button('Processar')
 
-    if process_button:
+    if process_button and metodo == 'Algoritmo Genético':
         algorithm_param = {
             'max_num_iteration': iteracao,
             'population_size': 10,
@@ -75,16 +66,47 @@ if data is not None:
             'crossover_type': 'uniform',
             'max_iteration_without_improv': None,
         }
+        items = item_arrays(data)
         varbound = [[0, 1]] * len(data)
         model = ga(
-            function=lambda X: fitness_function(X, data, sobra_volume, sobra_peso),
+            function=lambda X: population_fitness(X, items, sobra_volume, sobra_peso)[0],
             dimension=len(data),
             variable_type='bool',
             variable_boundaries=varbound,
             algorithm_parameters=algorithm_param,
         )
         model.run()
-        solution = data.iloc[model.output_dict['variable'].astype(bool), :]
+        output = model.output_dict
+
+    if process_button and metodo == 'Genético em Ilhas (multi-core)':
+        progress_bar = st.progress(0.0, text='Evoluindo populações...')
+        chart = st.empty()
+        historico = []
+        for output in iterate_island_ga(
+            item_arrays(data),
+            sobra_volume,
+            sobra_peso,
+            n_islands=ilhas,
+            max_generations=geracoes,
+            patience=paciencia,
+            seed=semente,
+        ):
+            if not output.get('done'):
+                historico.append(output['best_value'])
+                progress_bar.progress(output['generation'] / geracoes, text=f'Geração {output["generation"]}')
+                chart.line_chart(pd.DataFrame({'Melhor Valor': historico}, index=range(1, len(historico) + 1)))
+        progress_bar.progress(1.0, text=f'Concluído na geração {output["generation"]}')
+
+    if process_button and metodo == 'Exato (Branch and Bound)':
+        output = solve_cargo(data, sobra_volume, sobra_peso, time_budget=tempo_limite)
+        if output['optimal']:
+            st.success(f'Solução ótima encontrada em {output["elapsed"]:.2f} s')
+        else:
+            st.warning(f'Tempo limite atingido, gap de otimalidade: {output["gap"]:.2%}')
+        st.write(f'Tempo até a melhor solução: {output["time_to_best"]:.2f} s')
+
+    if process_button:
+        solution = data.iloc[output['variable'].astype(bool), :]
         st.write(solution)
         st.write(f'Quantidade Final: {len(solution)}')
         st.write(f'Peso Final: {solution["PESO"].sum()}')
@@ -9,39 +9,72 @@ and then processes the data to generate and display association rules.
 """
 
 import matplotlib.pyplot as plt
-import pandas as pd
 import streamlit as st
-from mlxtend.frequent_patterns import apriori, association_rules
-from mlxtend.preprocessing import TransactionEncoder
+
+from services.incremental import merge_batch
+from services.itemsets import ENGINES, file_fingerprint, mining_cache
+from services.transactions import PREVIEW_ROWS, encode_transactions
 
 st.set_page_config(page_title='Geração de Regras de Recomendação', layout='wide')
 st.title('Geração de Regras de Recomendação')
 
 with st.sidebar:
     uploaded_file = st.file_uploader('Escolha o arquivo', type=['csv'])
+    new_transactions_file = st.file_uploader('Novas Transações (mineração incremental)', type=['csv'])
     support_min = st.number_input('Suporte Mínimo', 0.0001, 1.0, 0.01, 0.01)
     trust_min = st.number_input('Confiança Mínima', 0.0001, 1.0, 0.2, 0.01)
     lift_minimo = st.number_input('Lift Mínimo', 0.0001, 10.0, 1.0, 0.1)
     size_min = st.number_input('Tamanho Mínimo', 1, 10, 2, 1)
+    engine = st.selectbox('Algoritmo de Mineração', list(ENGINES), format_func=ENGINES.get)
+    basket = st.text_input('Cesta para Recomendação (itens separados por vírgula)')
+    baskets_file = st.file_uploader('Cestas para Recomendação em Lote', type=['csv'])
     processing = st.button('Processar')
 
-if processing and uploaded_file is not None:
-    try:
-        transactions = []
-        for line in uploaded_file:
-            transaction = line.decode('utf-8').strip().split(',')
-            transactions.append(transaction)
 
-        transaction_encoder = TransactionEncoder()
-        # Boolean Matrix
+def itemsets_as_text(recommendations):
+    """Show the itemsets of the recommendations as comma-separated item names."""
+    for column in ('consequents', 'antecedents'):
+        recommendations[column] = recommendations[column].map(lambda itemset: ', '.join(sorted(itemset)))
+    return recommendations
 
-        transaction_encoder_ary = transaction_encoder.fit(transactions).transform(transactions)
 
-        df = pd.DataFrame(transaction_encoder_ary, columns=transaction_encoder.columns_)
+if processing and uploaded_file is not None:
+    try:
+        # Sparse boolean matrix and itemsets, reused while the file and the support are unchanged
+        fingerprint = file_fingerprint(uploaded_file)
+        transactions = mining_cache.transactions(fingerprint, uploaded_file)
+
+        if new_transactions_file is None:
+            itemsets = mining_cache.itemsets(fingerprint, transactions, support_min, engine)
+        else:
+            # Merge the new transactions into the itemsets of the file instead of mining everything again.
+            # Each batch is appended to the log merged so far, kept for the session per file and support.
+            log = st.session_state.get('retail_log')
+            if log is None or log['base'] != (fingerprint, support_min):
+                log = {'base': (fingerprint, support_min), 'heads': [fingerprint], 'batches': []}
+            batch_fingerprint = file_fingerprint(new_transactions_file)
+            # A rerun with the batch still uploaded finds the merge already stored.
+            repeated = bool(log['batches']) and log['batches'][-1] == batch_fingerprint
+            head = log['heads'][-2] if repeated else log['heads'][-1]
+            merged, miner = merge_batch(
+                mining_cache.cache,
+                head,
+                transactions if head == fingerprint else None,
+                support_min,
+                batch_fingerprint,
+                new_transactions_file,
+            )
+            if not repeated:
+                log['heads'].append(merged)
+                log['batches'].append(batch_fingerprint)
+            st.session_state['retail_log'] = log
+            fingerprint, transactions = merged, miner.history
+            itemsets = miner.itemsets()
+            st.sidebar.caption(f'{len(log["batches"])} lote(s) de novas transações incorporados')
 
-        frequent_itemsets = apriori(df, min_support=support_min, use_colnames=True)
+        from mlxtend.frequent_patterns import association_rules
 
-        regras = association_rules(df=frequent_itemsets, metric='confidence', min_threshold=trust_min)
+        regras = association_rules(df=itemsets, metric='confidence', min_threshold=trust_min)
         regras_filtradas = regras[
             (regras['lift'] >= lift_minimo) & (regras['antecedents'].apply(lambda x: len(x) >= size_min))
         ]
@@ -51,7 +84,12 @@ if processing and uploaded_file is not None:
 
             with col1:
                 st.header('Transações')
-                st.dataframe(df)
+                preview = transactions.preview()
+                st.caption(
+                    f'Amostra de {len(preview)} de {transactions.n_transactions} transações '
+                    f'com {len(transactions.items)} itens distintos'
+                )
+                st.dataframe(preview)
 
             with col2:
                 st.header('Regras Encontradas')
@@ -85,6 +123,27 @@ if processing and uploaded_file is not None:
                 file_name='regras_associacao.csv',
                 mime='text/csv',
             )
+
+            rule_index = mining_cache.rule_index(
+                fingerprint, (support_min, trust_min, lift_minimo, size_min), regras_filtradas
+            )
+            if basket:
+                st.header('Recomendações para a Cesta')
+                recommendations = rule_index.recommend(item.strip() for item in basket.split(','))
+                if recommendations.empty:
+                    st.write('Nenhuma regra se aplica a esta cesta')
+                else:
+                    st.dataframe(itemsets_as_text(recommendations), hide_index=True)
+            if baskets_file is not None:
+                st.header('Recomendações em Lote')
+                batch = itemsets_as_text(rule_index.recommend_many(encode_transactions(baskets_file)))
+                st.dataframe(batch.head(PREVIEW_ROWS), hide_index=True)
+                st.download_button(
+                    label='Exportar Recomendações como CSV',
+                    data=batch.to_csv(index=False),
+                    file_name='recomendacoes.csv',
+                    mime='text/csv',
+                )
         else:
             st.write('Nenhuma regra foi encontrada com os parâmetros definidos')
 
@@ -0,0 +1 @@
+"""Standalone performance benchmarks. Run one with `python -m benchmarks.<module>`."""
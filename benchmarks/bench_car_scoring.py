@@ -0,0 +1,61 @@
+"""
+Score a million vehicles with the prediction table and with the fitted model.
+
+The row-by-row path of the page (one DataFrame, `transform` and `predict` per vehicle)
+is timed on a sample and reported as rows per second.
+
+Usage:
+    python -m benchmarks.bench_car_scoring
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of
+from services.car_quality import FEATURES, train
+from services.datasets import load_dataset
+
+N_VEHICLES = 1_000_000
+ROW_BY_ROW_SAMPLE = 2_000
+
+
+def synthetic_vehicles(table, n_vehicles, seed=0):
+    """Uniformly drawn attribute levels, as strings."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        feature: np.asarray(levels, dtype=object)[rng.integers(len(levels), size=n_vehicles)]
+        for feature, levels in zip(FEATURES, table.categories)
+    })
+
+
+def main():
+    fitted, _ = train(load_dataset('car_ml_classification'), test_size=0.3, random_state=42)
+    encoder, model, table = fitted['encoder'], fitted['model'], fitted['table']
+    vehicles = synthetic_vehicles(table, N_VEHICLES)
+    csv = vehicles.to_csv(index=False).encode()
+
+    def row_by_row():
+        for values in vehicles.head(ROW_BY_ROW_SAMPLE).itertuples(index=False):
+            model.predict(encoder.transform(pd.DataFrame([values], columns=list(FEATURES))))
+
+    timings = {
+        'linha a linha (transform + predict)': (best_of(row_by_row, repeat=1)[0], ROW_BY_ROW_SAMPLE),
+        'modelo vetorizado (transform + predict_proba)': (
+            best_of(lambda: model.predict_proba(encoder.transform(vehicles)), repeat=3)[0],
+            N_VEHICLES,
+        ),
+        'tabela (score)': (best_of(lambda: table.score(vehicles), repeat=3)[0], N_VEHICLES),
+        'tabela (CSV lido, avaliado e escrito)': (
+            best_of(lambda: table.score_csv(io.BytesIO(csv)), repeat=1)[0],
+            N_VEHICLES,
+        ),
+    }
+    print(f'{"caminho":<46} {"linhas":>9} {"tempo (s)":>10} {"linhas/s":>12}')
+    for name, (elapsed, n_rows) in timings.items():
+        print(f'{name:<46} {n_rows:>9} {elapsed:>10.3f} {n_rows / elapsed:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
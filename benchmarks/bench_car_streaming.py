@@ -0,0 +1,61 @@
+"""
+Train the vehicle classifier on growing CSV files, streamed in chunks.
+
+The files hold synthetic vehicles labelled by the model trained on the bundled data.
+Peak memory is the largest amount traced by `tracemalloc` during training, which
+should depend on the chunk size and not on the file size.
+
+Usage:
+    python -m benchmarks.bench_car_streaming
+"""
+
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of
+from services.car_quality import FEATURES, LEVELS, TARGET, train_streaming
+
+SIZES = (250_000, 1_000_000, 4_000_000)
+CHUNK_SIZES = (10_000, 100_000)
+WRITE_CHUNK = 500_000
+
+
+def write_vehicles(path, n_vehicles, table, seed=0):
+    """Write `n_vehicles` random vehicles labelled by `table` to a CSV file."""
+    rng = np.random.default_rng(seed)
+    levels = [np.asarray(LEVELS[feature], dtype=object) for feature in FEATURES]
+    for start in range(0, n_vehicles, WRITE_CHUNK):
+        size = min(WRITE_CHUNK, n_vehicles - start)
+        codes = np.column_stack([rng.integers(len(values), size=size) for values in levels])
+        vehicles = pd.DataFrame({
+            feature: values[codes[:, i]] for i, (feature, values) in enumerate(zip(FEATURES, levels))
+        })
+        vehicles[TARGET] = table.classes[table.best[codes @ table.strides]]
+        vehicles.to_csv(path, mode='a', header=start == 0, index=False)
+
+
+def main():
+    fitted, _ = train_streaming(Path('data/car_ml_classification.csv'))
+    print(f'{"linhas":>9} {"chunk":>8} {"tempo (s)":>10} {"linhas/s":>10} {"pico (MB)":>10} {"acurácia":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        for n_vehicles in SIZES:
+            path = Path(directory) / f'vehicles_{n_vehicles}.csv'
+            write_vehicles(path, n_vehicles, fitted['table'])
+            for chunk_size in CHUNK_SIZES:
+                tracemalloc.start()
+                elapsed, (_, metrics) = best_of(lambda: train_streaming(path, chunk_size), repeat=1)
+                peak = tracemalloc.get_traced_memory()[1] / 1024**2
+                tracemalloc.stop()
+                print(
+                    f'{n_vehicles:>9} {chunk_size:>8} {elapsed:>10.2f} {metrics["rows_per_second"]:>10,.0f} '
+                    f'{peak:>10.1f} {metrics["accuracy"]:>9.3f}'
+                )
+            path.unlink()
+
+
+if __name__ == '__main__':
+    main()
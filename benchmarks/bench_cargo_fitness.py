@@ -0,0 +1,46 @@
+"""
+Compare the per-individual DataFrame fitness with the batched population fitness.
+
+Usage:
+    python -m benchmarks.bench_cargo_fitness
+"""
+
+import numpy as np
+
+from benchmarks.common import best_of, synthetic_manifest
+from services.cargo import item_arrays, population_fitness
+
+POPULATION_SIZE = 100
+SELECTION_RATE = 0.2
+MANIFEST_SIZES = (5_000, 20_000, 50_000)
+
+
+def dataframe_fitness(X, data, max_volume, max_weight):
+    """The original per-individual scoring, kept here as the baseline."""
+    selected_items = data.iloc[X.astype(bool), :]
+    total_weight = selected_items['PESO'].sum()
+    total_volume = selected_items['VOLUME'].sum()
+
+    if total_weight > max_weight or total_volume > max_volume:
+        return -1
+
+    return -selected_items['VALOR'].sum()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f'{"itens":>8} {"dataframe (s)":>14} {"matricial (s)":>14} {"ganho":>8}')
+    for n_items in MANIFEST_SIZES:
+        data = synthetic_manifest(n_items)
+        max_weight = data['PESO'].sum() / 4
+        max_volume = data['VOLUME'].sum() / 4
+        population = (rng.random((POPULATION_SIZE, n_items)) < SELECTION_RATE).astype(np.float64)
+
+        legacy_time, _ = best_of(lambda: [dataframe_fitness(X, data, max_volume, max_weight) for X in population])
+        items = item_arrays(data)
+        batched_time, _ = best_of(lambda: population_fitness(population, items, max_volume, max_weight))
+        print(f'{n_items:>8} {legacy_time:>14.4f} {batched_time:>14.4f} {legacy_time / batched_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
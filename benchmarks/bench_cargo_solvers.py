@@ -0,0 +1,67 @@
+"""
+Compare the exact branch-and-bound solver with `geneticalgorithm` on synthetic manifests.
+
+Usage:
+    python -m benchmarks.bench_cargo_solvers
+"""
+
+from time import perf_counter
+
+import numpy as np
+from geneticalgorithm import geneticalgorithm as ga
+
+from benchmarks.common import synthetic_manifest
+from services.cargo import item_arrays, population_fitness
+from services.knapsack import solve_cargo
+
+MANIFEST_SIZES = (20, 100, 1_000, 10_000)
+TIME_BUDGET = 10.0
+GA_ITERATIONS = 100
+
+
+def run_ga(data, max_volume, max_weight):
+    items = item_arrays(data)
+    algorithm_param = {
+        'max_num_iteration': GA_ITERATIONS,
+        'population_size': 10,
+        'mutation_probability': 0.1,
+        'elit_ratio': 0.01,
+        'crossover_probability': 0.5,
+        'parents_portion': 0.3,
+        'crossover_type': 'uniform',
+        'max_iteration_without_improv': None,
+    }
+    model = ga(
+        function=lambda X: population_fitness(X, items, max_volume, max_weight)[0],
+        dimension=len(data),
+        variable_type='bool',
+        variable_boundaries=[[0, 1]] * len(data),
+        algorithm_parameters=algorithm_param,
+        convergence_curve=False,
+        progress_bar=False,
+    )
+    model.run()
+    return max(-model.output_dict['function'], 0.0)
+
+
+def main():
+    print(f'{"itens":>7} {"GA valor":>12} {"GA (s)":>8} {"exato valor":>12} {"gap":>8} {"exato (s)":>10} {"ótimo":>6}')
+    for n_items in MANIFEST_SIZES:
+        data = synthetic_manifest(n_items)
+        max_weight = data['PESO'].sum() / 4
+        max_volume = data['VOLUME'].sum() / 4
+
+        start = perf_counter()
+        ga_value = run_ga(data, max_volume, max_weight)
+        ga_time = perf_counter() - start
+
+        result = solve_cargo(data, max_volume, max_weight, time_budget=TIME_BUDGET)
+        print(
+            f'{n_items:>7} {ga_value:>12.0f} {ga_time:>8.2f} {result["value"]:>12.0f} '
+            f'{result["gap"]:>8.2%} {result["elapsed"]:>10.2f} {result["optimal"]!s:>6}'
+        )
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    main()
@@ -0,0 +1,116 @@
+"""
+Payload and render time of long series charts, with and without decimation.
+
+Two years of minute bars are drawn as a Plotly line, candlesticks and volume bars, and a
+long series with a forecast is drawn with matplotlib as in `plot_forecasts`. Plotly
+figures are timed from building the figure to its JSON, which is what the browser
+receives; matplotlib figures are timed up to the rendered PNG.
+
+Usage:
+    python -m benchmarks.bench_chart_payload
+"""
+
+import io
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.graph_objects as go  # noqa: E402
+
+from benchmarks.common import best_of  # noqa: E402
+from services.charts import aggregate_ohlc, decimate, line_trace  # noqa: E402
+
+N_MINUTES = 2 * 252 * 390
+N_SERIES = 1_000_000
+
+
+def minute_bars(seed=0):
+    """Random walk minute bars of the trading hours of two years."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2022-01-03', periods=N_MINUTES // 390)
+    minutes = (days.values[:, None] + np.timedelta64(570, 'm') + np.arange(390) * np.timedelta64(1, 'm')).ravel()
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, N_MINUTES)))
+    spread = np.abs(rng.normal(0, 0.0005, (2, N_MINUTES))) * close
+    return pd.DataFrame(
+        {
+            'Open': np.roll(close, 1),
+            'High': close + spread[0],
+            'Low': close - spread[1],
+            'Close': close,
+            'Volume': rng.integers(100, 10_000, N_MINUTES).astype(np.float64),
+        },
+        index=pd.DatetimeIndex(minutes, name='Date'),
+    )
+
+
+def plotly_payload(build):
+    """The JSON size, in bytes, and the best time to build and serialize a figure."""
+    elapsed, payload = best_of(lambda: build().to_json(), repeat=3)
+    return len(payload), elapsed
+
+
+def matplotlib_render(series, forecast, decimated):
+    figure = plt.figure(figsize=(10, 6))
+    width = int(figure.get_figwidth() * figure.dpi)
+    steps = np.arange(len(series), len(series) + len(forecast))
+    if decimated:
+        plt.plot(*decimate(np.arange(len(series)), series, width, method='minmax'))
+        plt.plot(*decimate(steps, forecast, width, method='minmax'))
+    else:
+        plt.plot(series)
+        plt.plot(steps, forecast)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    plt.close(figure)
+    return buffer.getbuffer().nbytes
+
+
+def main():
+    bars = minute_bars()
+    figures = {
+        'linha': (
+            lambda: go.Figure(go.Scatter(x=bars.index, y=bars['Close'], mode='lines')),
+            lambda: go.Figure(line_trace(bars.index, bars['Close'])),
+        ),
+        'velas': (
+            lambda: go.Figure(
+                go.Candlestick(x=bars.index, open=bars['Open'], high=bars['High'], low=bars['Low'], close=bars['Close'])
+            ),
+            lambda: go.Figure(
+                go.Candlestick(
+                    x=(merged := aggregate_ohlc(bars)).index,
+                    open=merged['Open'],
+                    high=merged['High'],
+                    low=merged['Low'],
+                    close=merged['Close'],
+                )
+            ),
+        ),
+        'volume': (
+            lambda: go.Figure(go.Bar(x=bars.index, y=bars['Volume'])),
+            lambda: go.Figure(go.Bar(x=(merged := aggregate_ohlc(bars)).index, y=merged['Volume'])),
+        ),
+    }
+
+    print(f'Plotly, {N_MINUTES} barras de um minuto')
+    print(f'{"gráfico":<10} {"bytes antes":>13} {"bytes depois":>13} {"tempo antes (s)":>16} {"tempo depois (s)":>17}')
+    for name, (full, decimated) in figures.items():
+        full_bytes, full_time = plotly_payload(full)
+        decimated_bytes, decimated_time = plotly_payload(decimated)
+        print(f'{name:<10} {full_bytes:>13,} {decimated_bytes:>13,} {full_time:>16.3f} {decimated_time:>17.3f}')
+
+    rng = np.random.default_rng(1)
+    series = np.cumsum(rng.normal(size=N_SERIES))
+    forecast = series[-1] + np.cumsum(rng.normal(size=N_SERIES // 10))
+    print(f'\nmatplotlib, série de {N_SERIES} pontos e previsão de {N_SERIES // 10}')
+    for label, decimated in (('completa', False), ('dizimada', True)):
+        elapsed, size = best_of(lambda decimated=decimated: matplotlib_render(series, forecast, decimated), repeat=3)
+        print(f'{label:<10} PNG de {size:>9,} bytes em {elapsed:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Predict a million franchises in batch and row by row, and update the fit incrementally.
+
+The row-by-row paths are timed on a sample and reported as rows per second. Updating the
+running statistics with one new franchise is compared with refitting scikit-learn's
+LinearRegression on all the data seen.
+
+Usage:
+    python -m benchmarks.bench_franchise_batch
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from benchmarks.common import best_of
+from services.datasets import load_dataset
+from services.franchise import FEATURE, TARGET, IncrementalOLS, predict_csv
+
+N_ROWS = 1_000_000
+ROW_BY_ROW_SAMPLE = 2_000
+UPDATES = 10_000
+
+
+def main():
+    data = load_dataset('franchise')
+    model = IncrementalOLS.fit(data[FEATURE], data[TARGET])
+    sklearn_model = LinearRegression().fit(data[[FEATURE]], data[TARGET])
+    rng = np.random.default_rng(0)
+    fees = rng.uniform(800, 2000, N_ROWS).round(2)
+    csv = pd.DataFrame({FEATURE: fees}).to_csv(sep=';', index=False).encode()
+
+    def sklearn_row_by_row():
+        for fee in fees[:ROW_BY_ROW_SAMPLE]:
+            sklearn_model.predict(pd.DataFrame([fee], columns=[FEATURE]))
+
+    def interval_row_by_row():
+        for fee in fees[:ROW_BY_ROW_SAMPLE]:
+            model.interval([fee])
+
+    timings = {
+        'linha a linha (LinearRegression.predict)': (best_of(sklearn_row_by_row, repeat=1)[0], ROW_BY_ROW_SAMPLE),
+        'linha a linha (previsão com intervalo)': (best_of(interval_row_by_row, repeat=1)[0], ROW_BY_ROW_SAMPLE),
+        'lote (previsão com intervalo)': (best_of(lambda: model.interval(fees), repeat=3)[0], N_ROWS),
+        'lote (CSV lido, previsto e escrito)': (best_of(lambda: predict_csv(model, io.BytesIO(csv)))[0], N_ROWS),
+    }
+    print(f'{"caminho":<44} {"linhas":>9} {"tempo (s)":>10} {"linhas/s":>12}')
+    for name, (elapsed, n_rows) in timings.items():
+        print(f'{name:<44} {n_rows:>9} {elapsed:>10.3f} {n_rows / elapsed:>12,.0f}')
+
+    costs = model.predict(fees) + rng.normal(0, 100, N_ROWS)
+    growing = IncrementalOLS.fit(fees[:-UPDATES], costs[:-UPDATES])
+
+    def update_one_by_one():
+        for fee, cost in zip(fees[-UPDATES:], costs[-UPDATES:]):
+            growing.update(fee, cost)
+
+    update_time = best_of(update_one_by_one, repeat=1)[0] / UPDATES
+    refit_time = best_of(lambda: LinearRegression().fit(fees[:, np.newaxis], costs))[0]
+    print(f'\natualizar com uma franquia: {update_time * 1e6:.1f} µs')
+    print(f'reajustar LinearRegression com {N_ROWS} franquias: {refit_time * 1e3:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
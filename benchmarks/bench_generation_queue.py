@@ -0,0 +1,40 @@
+"""
+Compare one-at-a-time image generation with the batching generation queue.
+
+Point SD_MODEL_PATH at the model to use, for instance a small local pipeline.
+
+Usage:
+    SD_MODEL_PATH=/path/to/pipeline python -m benchmarks.bench_generation_queue
+"""
+
+import os
+from time import perf_counter
+
+from services.diffusion import DEFAULT_MODEL, PipelinePool
+from services.generation_queue import GenerationQueue
+
+N_REQUESTS = 16
+SETTINGS = {'num_inference_steps': 10, 'height': 256, 'width': 256, 'guidance_scale': 7.5}
+
+
+def run(queue):
+    start = perf_counter()
+    futures = [queue.submit(f'produto {index}', '', 1, seed=index, **SETTINGS) for index in range(N_REQUESTS)]
+    waits = [future.result()[1]['waiting'] for future in futures]
+    return perf_counter() - start, max(waits)
+
+
+def main():
+    pool = PipelinePool(os.environ.get('SD_MODEL_PATH', DEFAULT_MODEL), size=1)
+    with pool.acquire():
+        pass
+    print(f'Modelo carregado em {pool.load_times[0]:.1f} s')
+
+    print(f'{"lote máximo":>11} {"tempo (s)":>10} {"imagens/s":>10} {"espera máx. (s)":>16}')
+    for max_batch_images in (1, 2, 4, 8):
+        elapsed, max_wait = run(GenerationQueue(pool, max_batch_images=max_batch_images))
+        print(f'{max_batch_images:>11} {elapsed:>10.2f} {N_REQUESTS / elapsed:>10.2f} {max_wait:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare incremental itemset maintenance with mining the whole log again.
+
+The incremental run parses only the new batch and merges it; the full run parses the
+whole log and mines it with Eclat ('mineração' is the mining step alone). Every merge is
+checked against the full result.
+
+Usage:
+    python -m benchmarks.bench_incremental_mining
+"""
+
+from benchmarks.common import best_of, synthetic_baskets
+from services.incremental import IncrementalMiner
+from services.itemsets import eclat
+from services.transactions import encode_transactions
+
+HISTORY_SIZE = 1_000_000
+N_ITEMS = 20_000
+BATCH_SIZES = (1_000, 10_000, 50_000, 100_000)
+MIN_SUPPORT = 0.001
+
+
+def as_dict(itemsets):
+    return {itemset: round(support, 12) for itemset, support in zip(itemsets['itemsets'], itemsets['support'])}
+
+
+def main():
+    lines = synthetic_baskets(HISTORY_SIZE + sum(BATCH_SIZES), N_ITEMS, mean_size=6)
+    miner = IncrementalMiner.from_transactions(encode_transactions(lines[:HISTORY_SIZE]), MIN_SUPPORT)
+    end = HISTORY_SIZE
+    print(
+        f'{"histórico":>10} {"lote":>7} {"incremental (s)":>16} {"completo (s)":>13} {"mineração (s)":>14} '
+        f'{"ganho":>7} {"contados":>9} {"igual":>6}'
+    )
+    for batch_size in BATCH_SIZES:
+        history_size, end = end, end + batch_size
+        batch_lines = lines[history_size:end]
+        incremental_time, _ = best_of(lambda: miner.update(encode_transactions(batch_lines)), repeat=1)
+        parse_time, log = best_of(lambda: encode_transactions(lines[:end]), repeat=1)
+        mining_time, full = best_of(lambda: eclat(log, MIN_SUPPORT), repeat=1)
+        full_time = parse_time + mining_time
+        same = as_dict(miner.itemsets()) == as_dict(full)
+        print(
+            f'{history_size:>10} {batch_size:>7} {incremental_time:>16.2f} {full_time:>13.2f} {mining_time:>14.2f} '
+            f'{full_time / incremental_time:>6.1f}x {miner.last_update["history_counted"]:>9} {str(same):>6}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Load 500 tickers with 20 years of daily bars and compute their indicators.
+
+The tickers are served by a local source that waits before each answer, like a remote
+API. Loading is timed one ticker after the other and through the bounded pool of
+`PriceStore.get_many`; the indicators are computed once per ticker, in one pass over the
+wide price matrix, and read back from the cache.
+
+Usage:
+    python -m benchmarks.bench_indicators
+"""
+
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of
+from services.cache import DiskCache
+from services.indicators import IndicatorCache, compute_indicators, correlation, price_matrix
+from services.prices import PRICE_COLUMNS, PriceSource, PriceStore
+
+N_TICKERS = 500
+START, END = date(2004, 1, 1), date(2024, 1, 1)
+LATENCY = 0.02
+WORKERS = 16
+
+
+class SyntheticSource(PriceSource):
+    """Random walk prices of every business day, answered after `LATENCY` seconds."""
+
+    name = 'synthetic'
+
+    def __init__(self, days, seed=0):
+        rng = np.random.default_rng(seed)
+        self.days = days
+        self.closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (len(days), N_TICKERS)), axis=0))
+
+    def fetch(self, ticker, start, end):
+        time.sleep(LATENCY)
+        rows = (self.days >= pd.Timestamp(start)) & (self.days < pd.Timestamp(end))
+        close = self.closes[rows, int(ticker[1:])]
+        return pd.DataFrame({column: close for column in PRICE_COLUMNS}, index=self.days[rows])
+
+
+def main():
+    days = pd.bdate_range(START, END, inclusive='left')
+    source = SyntheticSource(days)
+    tickers = [f'T{number:03d}' for number in range(N_TICKERS)]
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PriceStore(source, f'{directory}/sequential', today=lambda: END)
+        timings['carga sequencial'], _ = best_of(
+            lambda: [store.get(ticker, START, END) for ticker in tickers], repeat=1
+        )
+        store = PriceStore(source, f'{directory}/pool', today=lambda: END)
+        timings[f'carga com {WORKERS} threads'], (prices, _) = best_of(
+            lambda: store.get_many(tickers, START, END, max_workers=WORKERS), repeat=1
+        )
+        timings['carga repetida (já armazenada)'] = best_of(
+            lambda: PriceStore(source, f'{directory}/pool', today=lambda: END).get_many(tickers, START, END), repeat=1
+        )[0]
+
+        matrix = price_matrix(prices)
+        timings['indicadores, um ticker por vez'] = best_of(
+            lambda: [compute_indicators(matrix[[ticker]]) for ticker in tickers], repeat=1
+        )[0]
+        timings['indicadores, matriz larga'], indicators = best_of(lambda: compute_indicators(matrix), repeat=3)
+        timings['correlação dos retornos'] = best_of(lambda: correlation(indicators['retorno']), repeat=3)[0]
+        timings['correlação (DataFrame.corr)'] = best_of(indicators['retorno'].corr, repeat=1)[0]
+
+        cache = IndicatorCache(DiskCache(f'{directory}/indicators', max_bytes=1024**3))
+        timings['indicadores com cache vazio'] = best_of(lambda: cache.indicators(matrix, START, END), repeat=1)[0]
+        timings['indicadores do cache'] = best_of(lambda: cache.indicators(matrix, START, END), repeat=3)[0]
+
+    print(f'{N_TICKERS} tickers x {len(days)} pregões, {LATENCY * 1000:.0f} ms por requisição')
+    print(f'{"etapa":<34} {"tempo (s)":>10}')
+    for name, elapsed in timings.items():
+        print(f'{name:<34} {elapsed:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Measure how the island-model genetic algorithm scales with the number of processes.
+
+Every run uses the same seed and islands, so all of them follow the same trajectory and
+the wall-clock time to reach the target profit only depends on the parallelism.
+
+Usage:
+    python -m benchmarks.bench_island_ga
+"""
+
+import os
+from time import perf_counter
+
+from benchmarks.common import synthetic_manifest
+from services.cargo import item_arrays
+from services.genetic import run_island_ga
+
+N_ITEMS = 20_000
+N_ISLANDS = 8
+TARGET_SHARE = 0.9
+
+
+def main():
+    data = synthetic_manifest(N_ITEMS)
+    items = item_arrays(data)
+    max_weight = data['PESO'].sum() / 4
+    max_volume = data['VOLUME'].sum() / 4
+    options = {'n_islands': N_ISLANDS, 'population_size': 50, 'max_generations': 2000, 'seed': 0}
+
+    reference = run_island_ga(items, max_volume, max_weight, processes=0, **{**options, 'max_generations': 200})
+    target = TARGET_SHARE * reference['best_value']
+    print(f'Lucro alvo: {target:.0f}')
+
+    baseline = None
+    print(f'{"processos":>9} {"tempo (s)":>10} {"gerações":>9} {"speedup":>8}')
+    for processes in sorted({1, 2, 4, min(N_ISLANDS, os.cpu_count() or 1)}):
+        start = perf_counter()
+        result = run_island_ga(items, max_volume, max_weight, processes=processes, target_value=target, **options)
+        elapsed = perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'{processes:>9} {elapsed:>10.2f} {result["generation"]:>9} {baseline / elapsed:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
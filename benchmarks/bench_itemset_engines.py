@@ -0,0 +1,39 @@
+"""
+Time the frequent itemset engines over support thresholds and basket counts.
+
+Apriori materializes dense candidate blocks, so it only runs on the smaller datasets.
+
+Usage:
+    python -m benchmarks.bench_itemset_engines
+"""
+
+from benchmarks.common import best_of, synthetic_baskets
+from services.itemsets import ENGINES, frequent_itemsets
+from services.transactions import encode_transactions
+
+# (transactions, distinct items)
+SIZES = ((10_000, 500), (100_000, 5_000), (1_000_000, 20_000))
+SUPPORTS = (0.01, 0.005, 0.001, 0.0005)
+MAX_TRANSACTIONS = {'apriori': 10_000}
+
+
+def main():
+    print(
+        f'{"transações":>11} {"suporte":>8} {"itemsets":>9}', *(f'{title + " (s)":>15}' for title in ENGINES.values())
+    )
+    for n_transactions, n_items in SIZES:
+        transactions = encode_transactions(synthetic_baskets(n_transactions, n_items, mean_size=6))
+        for min_support in SUPPORTS:
+            cells, n_itemsets = [], 0
+            for engine in ENGINES:
+                if n_transactions > MAX_TRANSACTIONS.get(engine, n_transactions):
+                    cells.append(f'{"-":>15}')
+                    continue
+                elapsed, itemsets = best_of(lambda: frequent_itemsets(transactions, min_support, engine), repeat=1)
+                n_itemsets = len(itemsets)
+                cells.append(f'{elapsed:>15.2f}')
+            print(f'{n_transactions:>11} {min_support:>8} {n_itemsets:>9}', *cells)
+
+
+if __name__ == '__main__':
+    main()
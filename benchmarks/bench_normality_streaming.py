@@ -0,0 +1,57 @@
+"""
+Test the normality of growing CSV files, streamed in chunks.
+
+The files hold one column of normal values. Peak memory is the largest amount traced by
+`tracemalloc` while the file is summarized and tested, which should depend on the chunk
+and sample sizes and not on the file size.
+
+Usage:
+    python -m benchmarks.bench_normality_streaming
+"""
+
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.common import best_of
+from services.normality import stream_normality
+
+SIZES = (100_000, 1_000_000, 10_000_000)
+CHUNK_SIZES = (100_000, 1_000_000)
+WRITE_CHUNK = 1_000_000
+
+
+def write_values(path, n_values, seed=0):
+    """Write `n_values` normal values, one per line, to a CSV file."""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', encoding='utf-8') as file:
+        for start in range(0, n_values, WRITE_CHUNK):
+            np.savetxt(file, rng.normal(10, 2, min(WRITE_CHUNK, n_values - start)), fmt='%.6f')
+
+
+def main():
+    # Import SciPy before the timings, as the page has by the time a file is tested.
+    import scipy.stats  # noqa: F401, PLC0415
+
+    print(f'{"linhas":>11} {"chunk":>10} {"tempo (s)":>10} {"linhas/s":>12} {"pico (MB)":>10} {"p (D-P)":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for n_values in SIZES:
+            path = Path(directory) / f'values_{n_values}.csv'
+            write_values(path, n_values)
+            for chunk_size in CHUNK_SIZES:
+                tracemalloc.start()
+                elapsed, result = best_of(lambda: stream_normality(path, chunk_size), repeat=1)
+                peak = tracemalloc.get_traced_memory()[1] / 1024**2
+                tracemalloc.stop()
+                p_value = result['tests']['valor_p'].iloc[0]
+                print(
+                    f'{n_values:>11} {chunk_size:>10} {elapsed:>10.2f} {n_values / elapsed:>12,.0f} '
+                    f'{peak:>10.1f} {p_value:>8.3f}'
+                )
+            path.unlink()
+
+
+if __name__ == '__main__':
+    main()
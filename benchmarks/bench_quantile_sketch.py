@@ -0,0 +1,98 @@
+"""
+Quantiles, summary tables and QQ plots of long columns, exact and from KLL sketches.
+
+The sketches are built chunk by chunk and on several threads, whose parts are merged.
+The rank error of 99 percentiles is measured against the sorted column and printed next
+to the bound stated by the sketch. The QQ plots are timed up to the rendered PNG.
+
+Usage:
+    python -m benchmarks.bench_quantile_sketch
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from scipy import stats  # noqa: E402
+
+from benchmarks.common import best_of  # noqa: E402
+from services.normality import qq_points  # noqa: E402
+from services.sketches import KLLSketch, describe  # noqa: E402
+
+N_VALUES = 10_000_000
+CHUNK_SIZE = 1_000_000
+WORKERS = 8
+N_QQ = 1_000_000
+PROBABILITIES = np.linspace(0.01, 0.99, 99)
+
+
+def chunked_sketch(values):
+    sketch = KLLSketch()
+    for start in range(0, len(values), CHUNK_SIZE):
+        sketch.update(values[start : start + CHUNK_SIZE])
+    return sketch
+
+
+def parallel_sketch(values):
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        parts = list(pool.map(chunked_sketch, np.array_split(values, WORKERS)))
+    for part in parts[1:]:
+        parts[0].merge(part)
+    return parts[0]
+
+
+def render(plot):
+    figure, axis = plt.subplots()
+    plot(axis)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    plt.close(figure)
+
+
+def sketch_qq(axis, values):
+    theoretical, observed = qq_points(chunked_sketch(values))
+    axis.plot(theoretical, observed, 'bo')
+    axis.plot(theoretical, np.poly1d(np.polyfit(theoretical, observed, 1))(theoretical), 'r-')
+
+
+def main():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=N_VALUES)
+    ordered = np.sort(values)
+
+    print(f'{N_VALUES} valores, {len(PROBABILITIES)} percentis')
+    print(f'{"método":<28} {"tempo (s)":>10} {"valores guardados":>18} {"erro máximo":>12} {"limite (99%)":>13}')
+    elapsed, exact = best_of(lambda: np.quantile(values, PROBABILITIES), repeat=1)
+    print(f'{"exato (numpy.quantile)":<28} {elapsed:>10.3f} {N_VALUES:>18,} {0:>12.4%} {0:>13.4%}')
+    for name, build in (
+        (f'sketch em chunks de {CHUNK_SIZE}', chunked_sketch),
+        (f'sketch em {WORKERS} threads', parallel_sketch),
+    ):
+        elapsed, sketch = best_of(lambda build=build: build(values), repeat=3)
+        ranks = np.searchsorted(ordered, sketch.quantiles(PROBABILITIES), side='right') / N_VALUES
+        error = np.abs(ranks - PROBABILITIES).max()
+        print(f'{name:<28} {elapsed:>10.3f} {sketch.size:>18,} {error:>12.4%} {sketch.rank_error():>13.4%}')
+
+    frame = pd.DataFrame({'a': values, 'b': rng.normal(size=N_VALUES), 'c': rng.exponential(size=N_VALUES)})
+    chunks = [frame.iloc[start : start + CHUNK_SIZE] for start in range(0, N_VALUES, CHUNK_SIZE)]
+    print(f'\ndescribe() de {N_VALUES} linhas x {frame.shape[1]} colunas')
+    print(f'{"DataFrame.describe":<28} {best_of(frame.describe, repeat=1)[0]:>10.3f}')
+    elapsed, (_, errors) = best_of(lambda: describe(chunks), repeat=3)
+    print(f'{"describe com sketches":<28} {elapsed:>10.3f}   limite do erro de posição {errors.max():.4%}')
+
+    sample = values[:N_QQ]
+    print(f'\nQQ plot de {N_QQ} valores')
+    elapsed = best_of(lambda: render(lambda axis: stats.probplot(sample, plot=axis)), repeat=1)[0]
+    print(f'{"probplot, um ponto por valor":<28} {elapsed:>10.3f}')
+    elapsed = best_of(lambda: render(lambda axis: sketch_qq(axis, sample)), repeat=3)[0]
+    print(f'{"sketch, 400 quantis":<28} {elapsed:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Latency of basket queries against an index of one million association rules.
+
+Usage:
+    python -m benchmarks.bench_rule_index
+"""
+
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of, synthetic_baskets
+from services.rule_index import RuleIndex
+from services.transactions import encode_transactions
+
+N_RULES = 1_000_000
+N_ITEMS = 20_000
+BASKET_SIZES = (5, 10, 20, 50)
+N_QUERIES = 1_000
+N_BATCH_BASKETS = 10_000
+
+
+def synthetic_rules(n_rules, n_items, seed=0):
+    """Random rules with antecedents of one to three items and single-item consequents."""
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, n_items + 1)
+    popularity /= popularity.sum()
+    names = np.array([f'SKU{item:06d}' for item in range(n_items)])
+    sizes = rng.choice([1, 2, 3], n_rules, p=[0.2, 0.5, 0.3])
+    drawn = rng.choice(n_items, (n_rules, 4), p=popularity)
+    return pd.DataFrame({
+        'antecedents': [frozenset(names[row[:size]]) for row, size in zip(drawn, sizes)],
+        'consequents': [frozenset([name]) for name in names[rng.integers(0, n_items, n_rules)]],
+        'lift': rng.lognormal(0.5, 0.5, n_rules),
+        'confidence': rng.uniform(0.1, 1.0, n_rules),
+    })
+
+
+def main():
+    rules = synthetic_rules(N_RULES, N_ITEMS)
+    build_time, index = best_of(lambda: RuleIndex.from_rules(rules), repeat=1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'rules.npz'
+        save_time, _ = best_of(lambda: index.save(path), repeat=1)
+        load_time, index = best_of(lambda: RuleIndex.load(path), repeat=1)
+    print(f'{len(rules)} regras, {index.n_rules} mantidas no índice')
+    print(f'construção {build_time:.2f} s | gravação {save_time:.2f} s | leitura {load_time:.2f} s')
+
+    rng = np.random.default_rng(1)
+    items = index.items.tolist()
+    print(f'{"itens na cesta":>15} {"p50 (ms)":>9} {"p99 (ms)":>9}')
+    for size in BASKET_SIZES:
+        latencies = []
+        for _ in range(N_QUERIES):
+            basket = [items[i] for i in rng.integers(0, len(items), size)]
+            start = perf_counter()
+            index.recommend(basket)
+            latencies.append((perf_counter() - start) * 1000)
+        print(f'{size:>15} {np.percentile(latencies, 50):>9.2f} {np.percentile(latencies, 99):>9.2f}')
+
+    baskets = encode_transactions(synthetic_baskets(N_BATCH_BASKETS, N_ITEMS, mean_size=8))
+    batch_time, _ = best_of(lambda: index.recommend_many(baskets), repeat=1)
+    print(f'lote de {N_BATCH_BASKETS} cestas: {batch_time:.2f} s ({N_BATCH_BASKETS / batch_time:.0f} cestas/s)')
+
+
+if __name__ == '__main__':
+    main()
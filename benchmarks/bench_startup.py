@@ -0,0 +1,92 @@
+"""
+Time the first render of every page against a startup budget.
+
+Each page runs in a fresh interpreter with Streamlit's `AppTest`, so the measured time
+includes every import the page triggers. The script reports the first-render time and
+the heavy libraries loaded by each page, and exits with status 1 when a page is slower
+than its budget or loads a library it should only import when a feature is used.
+
+Usage:
+    python -m benchmarks.bench_startup [page ...]
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PAGES_DIR = Path('application_pages')
+HEAVY_MODULES = ('torch', 'diffusers', 'statsmodels', 'pmdarima', 'sklearn', 'mlxtend', 'yfinance', 'scipy.stats')
+DEFAULT_BUDGET = 3.0
+# Seconds to first render, and heavy modules each page may load before any interaction.
+BUDGETS = {
+    'analysis_of_public_accountability_data': (DEFAULT_BUDGET, ()),
+    'benchmarking_temporal_series': (DEFAULT_BUDGET, ()),
+    'car_ml_classification': (4.0, ('sklearn', 'scipy.stats')),
+    'data_normality_analysis': (5.0, ('scipy.stats',)),
+    'equipment_failure_probability_assessment': (5.0, ('scipy.stats',)),
+    'finance': (DEFAULT_BUDGET, ()),
+    'franchise_linear_regression': (DEFAULT_BUDGET, ()),
+    'genai': (DEFAULT_BUDGET, ()),
+    'milk_production_stimated': (DEFAULT_BUDGET, ()),
+    'optimize_cargo_transportation': (DEFAULT_BUDGET, ()),
+    'retail_recommendation_system': (DEFAULT_BUDGET, ()),
+}
+TIMEOUT = 60
+
+# Run in the child interpreter: render the page once and report what it cost.
+PROBE = """
+import json, sys
+from time import perf_counter
+from streamlit.testing.v1 import AppTest
+
+start = perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout={timeout}).run()
+elapsed = perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'errors': [str(error.value) for error in app.exception],
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def profile_page(path):
+    """First-render time, exceptions and heavy modules of a page, measured in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE.format(timeout=TIMEOUT, heavy=HEAVY_MODULES), str(path.resolve())],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        return {'seconds': float('nan'), 'errors': [completed.stderr.strip().splitlines()[-1]], 'loaded': []}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check(name, profile):
+    """Budget violations of a page profile, as messages."""
+    budget, allowed = BUDGETS.get(name, (DEFAULT_BUDGET, ()))
+    problems = [f'erro: {error}' for error in profile['errors']]
+    if not profile['seconds'] <= budget:
+        problems.append(f'{profile["seconds"]:.2f}s acima do orçamento de {budget:.2f}s')
+    problems.extend(f'carrega {module}' for module in profile['loaded'] if module not in allowed)
+    return problems
+
+
+def main(names=None):
+    names = names or sorted(path.stem for path in PAGES_DIR.glob('*.py'))
+    print(f'{"página":<42} {"render (s)":>11} {"orçamento":>10}  módulos pesados')
+    failures = 0
+    for name in names:
+        profile = profile_page(PAGES_DIR / f'{name}.py')
+        budget = BUDGETS.get(name, (DEFAULT_BUDGET, ()))[0]
+        print(f'{name:<42} {profile["seconds"]:>11.2f} {budget:>10.2f}  {", ".join(profile["loaded"]) or "-"}')
+        for problem in check(name, profile):
+            failures += 1
+            print(f'    ! {problem}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
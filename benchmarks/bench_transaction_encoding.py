@@ -0,0 +1,44 @@
+"""
+Compare the dense TransactionEncoder matrix with the streamed sparse encoding.
+
+Usage:
+    python -m benchmarks.bench_transaction_encoding
+"""
+
+from mlxtend.preprocessing import TransactionEncoder
+
+from benchmarks.common import best_of, synthetic_baskets
+from services.transactions import encode_transactions
+
+# (transactions, distinct items); the dense encoder is skipped above DENSE_LIMIT cells.
+SIZES = ((10_000, 1_000), (100_000, 5_000), (1_000_000, 20_000))
+DENSE_LIMIT = 10**9
+
+
+def dense_encoding(lines):
+    """The original encoding, kept here as the baseline."""
+    transactions = [line.split(',') for line in lines]
+    return TransactionEncoder().fit(transactions).transform(transactions)
+
+
+def main():
+    print(
+        f'{"transações":>11} {"itens":>7} {"densa (s)":>10} {"densa (MB)":>11} {"esparsa (s)":>12} {"esparsa (MB)":>13}'
+    )
+    for n_transactions, n_items in SIZES:
+        lines = synthetic_baskets(n_transactions, n_items)
+        sparse_time, encoded = best_of(lambda: encode_transactions(lines), repeat=1)
+        matrix = encoded.matrix
+        sparse_mb = (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1024**2
+
+        if n_transactions * n_items <= DENSE_LIMIT:
+            dense_time, dense = best_of(lambda: dense_encoding(lines), repeat=1)
+            dense_cells = f'{dense_time:>10.2f} {dense.nbytes / 1024**2:>11.1f}'
+        else:
+            dense_cells = f'{"-":>10} {n_transactions * n_items / 1024**2:>10.0f}*'
+        print(f'{n_transactions:>11} {n_items:>7} {dense_cells} {sparse_time:>12.2f} {sparse_mb:>13.1f}')
+    print('* tamanho estimado da matriz densa, que não foi construída')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Helpers shared by the benchmark scripts."""
+
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_manifest(n_items, seed=0):
+    """
+    Generate a random cargo manifest shaped like `data/Itens.csv`.
+
+    Parameters:
+        n_items (int): Number of items in the manifest.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        DataFrame: Items with 'ID', 'PESO', 'VALOR' and 'VOLUME' columns.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'ID': np.arange(1, n_items + 1),
+        'PESO': rng.integers(100, 1000, n_items),
+        'VALOR': rng.integers(1000, 10000, n_items),
+        'VOLUME': rng.integers(10, 50, n_items),
+    })
+
+
+def best_of(function, repeat=3):
+    """
+    Time a callable and keep the fastest run.
+
+    Returns:
+        tuple: The best elapsed time in seconds and the result of the last call.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = function()
+        best = min(best, perf_counter() - start)
+    return best, result
+
+
+def synthetic_baskets(n_transactions, n_items, mean_size=4, seed=0):
+    """
+    Generate random market baskets shaped like `data/transacoes.csv`.
+
+    Item popularity follows a Zipf-like law, so a few items are in many baskets and most
+    items are rare, as in real point-of-sale data.
+
+    Returns:
+        list of str: One comma-separated basket per line.
+    """
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, n_items + 1)
+    sizes = np.maximum(rng.poisson(mean_size, n_transactions), 1)
+    items = rng.choice(n_items, sizes.sum(), p=popularity / popularity.sum())
+    names = np.array([f'SKU{item:06d}' for item in range(n_items)])
+    return [','.join(names[basket]) for basket in np.split(items, np.cumsum(sizes)[:-1])]
@@ -0,0 +1 @@
+"""Reusable, Streamlit-free building blocks shared by the application pages."""
@@ -0,0 +1,203 @@
+"""
+Rolling-origin (time series cross-validation) backtesting for the forecast benchmark.
+
+Every method forecasts `h` periods ahead from each cutoff of an expanding training
+window and is scored against what actually happened. The naive, mean and drift baselines
+are computed for all cutoffs at once with array operations. The statistical models are
+warm-started: Holt and Holt-Winters restart the optimizer from the previous cutoff's
+parameters and ARIMA keeps the order found at the first cutoff and only updates its fit
+with the new observations.
+"""
+
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from services.forecasting import (
+    DEFAULT_TIMEOUT,
+    METHOD_TITLES,
+    PARALLEL_METHODS,
+    SEASONAL_PERIODS,
+    run_in_pool,
+    smoothing_model,
+    timing_rows,
+)
+
+DEFAULT_ORIGINS = 100
+# Two seasonal cycles, the least Holt-Winters can be initialized from.
+MIN_TRAIN = 2 * SEASONAL_PERIODS
+METRICS = ('MAE', 'RMSE', 'MAPE', 'MASE')
+
+
+def rolling_cutoffs(n_obs, h, n_origins=DEFAULT_ORIGINS, min_train=MIN_TRAIN):
+    """
+    Consecutive cutoffs of an expanding window, the last one leaving exactly `h` observations out.
+
+    Parameters:
+        n_obs (int): Length of the series.
+        h (int): The forecast horizon.
+        n_origins (int): Maximum number of cutoffs.
+        min_train (int): Minimum number of observations before the first cutoff.
+
+    Returns:
+        ndarray: The training lengths, one per forecast origin.
+    """
+    last = n_obs - h
+    first = max(min_train, last - n_origins + 1)
+    if first > last:
+        raise ValueError(f'The series needs at least {min_train + h} observations for a horizon of {h}.')
+    return np.arange(first, last + 1)
+
+
+def baseline_forecasts(values, cutoffs, h):
+    """
+    Naive, mean and drift forecasts for every cutoff at once.
+
+    Returns:
+        dict: Maps 'naive', 'mean' and 'drift' to a (n_cutoffs, h) forecast matrix.
+    """
+    steps = np.arange(1, h + 1)
+    last = values[cutoffs - 1]
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    slope = (last - values[0]) / (cutoffs - 1)
+    return {
+        'naive': np.repeat(last[:, np.newaxis], h, axis=1),
+        'mean': np.repeat((cumulative[cutoffs] / cutoffs)[:, np.newaxis], h, axis=1),
+        'drift': last[:, np.newaxis] + steps * slope[:, np.newaxis],
+    }
+
+
+def _free_parameters(result):
+    """The optimizer's free parameters of a fitted smoothing model, in `start_params` order."""
+    params, model = result.params, result.model
+    free = [params['smoothing_level']]
+    if model.has_trend:
+        free.append(params['smoothing_trend'])
+    if model.has_seasonal:
+        free.append(params['smoothing_seasonal'])
+    free.append(params['initial_level'])
+    if model.has_trend:
+        free.append(params['initial_trend'])
+    if model.damped_trend:
+        free.append(params['damping_trend'])
+    if model.has_seasonal:
+        free.extend(params['initial_seasons'])
+    return np.asarray(free)
+
+
+def backtest_method(method, values, cutoffs, h):
+    """
+    Forecast from every cutoff with one statistical model, warm-starting each fit.
+
+    Parameters:
+        method (str): 'holt', 'hw' or 'arima'.
+        values (ndarray): The whole series.
+        cutoffs (ndarray): Increasing training lengths.
+        h (int): The forecast horizon.
+
+    Returns:
+        tuple: The (n_cutoffs, h) forecast matrix, the total fit time and the total forecast time.
+    """
+    forecasts = np.empty((len(cutoffs), h))
+    fit_time = forecast_time = 0.0
+    previous, model = None, None
+    for row, cutoff in enumerate(cutoffs):
+        start = perf_counter()
+        if method == 'arima':
+            if model is None:
+                from pmdarima import auto_arima  # noqa: PLC0415
+
+                model = auto_arima(values[:cutoff], seasonal=True, m=SEASONAL_PERIODS, suppress_warnings=True)
+            else:
+                model.update(values[previous:cutoff])
+            previous = cutoff
+        elif previous is None:
+            model = smoothing_model(method, values[:cutoff]).fit()
+        else:
+            model = smoothing_model(method, values[:cutoff]).fit(start_params=previous, use_brute=False)
+        fitted = perf_counter()
+
+        if method == 'arima':
+            forecasts[row] = model.predict(n_periods=h)
+        else:
+            previous = _free_parameters(model)
+            forecasts[row] = model.forecast(h)
+        fit_time += fitted - start
+        forecast_time += perf_counter() - fitted
+
+    return forecasts, fit_time, forecast_time
+
+
+def forecast_errors(values, cutoffs, forecasts, season=SEASONAL_PERIODS):
+    """
+    Score a forecast matrix against the observed values.
+
+    MASE scales the errors of each origin by the in-sample mean absolute error of the
+    seasonal naive forecast on that origin's training window.
+
+    Parameters:
+        values (ndarray): The whole series.
+        cutoffs (ndarray): Training lengths, one per row of `forecasts`.
+        forecasts (ndarray): A (n_cutoffs, h) forecast matrix.
+        season (int): Seasonal period used by the MASE scale.
+
+    Returns:
+        dict: MAE, RMSE, MAPE (in percent) and MASE averaged over all origins and horizons.
+    """
+    h = forecasts.shape[1]
+    actual = values[cutoffs[:, np.newaxis] + np.arange(h)]
+    errors = forecasts - actual
+
+    seasonal_errors = np.concatenate(([0.0], np.cumsum(np.abs(values[season:] - values[:-season]))))
+    scale = seasonal_errors[cutoffs - season] / (cutoffs - season)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage = np.abs(errors / actual)[actual != 0]
+        scaled = np.abs(errors) / scale[:, np.newaxis]
+
+    return {
+        'MAE': float(np.mean(np.abs(errors))),
+        'RMSE': float(np.sqrt(np.mean(errors**2))),
+        'MAPE': float(100 * np.mean(percentage)) if percentage.size else np.nan,
+        'MASE': float(np.mean(scaled[np.isfinite(scaled)])) if np.isfinite(scaled).any() else np.nan,
+    }
+
+
+def backtest(train, h, methods, n_origins=DEFAULT_ORIGINS, timeout=DEFAULT_TIMEOUT):
+    """
+    Evaluate the selected forecasting methods over rolling forecast origins.
+
+    Parameters:
+        train (pd.Series): The observed series.
+        h (int): The forecast horizon.
+        methods (dict): Method names mapped to booleans, as in `forecast_methods`.
+        n_origins (int): Maximum number of forecast origins.
+        timeout (float): Seconds each statistical model may take for the whole backtest.
+
+    Returns:
+        tuple: A DataFrame of MAE, RMSE, MAPE and MASE per method (indexed by title) and
+            the per-method timings, as returned by `forecast_methods`.
+    """
+    values = np.asarray(train, dtype=np.float64)
+    cutoffs = rolling_cutoffs(len(values), h, n_origins)
+    selected = [method for method in METHOD_TITLES if methods.get(method)]
+    parallel = [method for method in selected if method in PARALLEL_METHODS]
+
+    results, statuses = {}, {}
+    if parallel:
+        results, statuses = run_in_pool(
+            {method: (backtest_method, (method, values, cutoffs, h)) for method in parallel}, timeout
+        )
+    start = perf_counter()
+    baselines = baseline_forecasts(values, cutoffs, h)
+    elapsed = perf_counter() - start
+    for method in selected:
+        if method not in PARALLEL_METHODS:
+            results[method] = (baselines[method], elapsed, 0.0)
+
+    metrics = pd.DataFrame(
+        [forecast_errors(values, cutoffs, results[method][0]) for method in selected if method in results],
+        index=[METHOD_TITLES[method] for method in selected if method in results],
+        columns=list(METRICS),
+    )
+    return metrics, timing_rows(selected, results, statuses)
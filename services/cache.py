@@ -0,0 +1,139 @@
+"""
+Content-addressed, disk-backed LRU cache.
+
+Entries are pickled into one file per key under a cache directory. Reading an entry
+refreshes its modification time, and writes evict the least recently used files once
+the directory grows past its size limit. Keys are SHA-256 digests of the inputs, so the
+same data submitted again, from any session, finds the stored result.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path('.cache')
+DEFAULT_MAX_BYTES = 256 * 1024**2
+ENTRY_SUFFIX = '.pkl'
+
+
+def cache_key(*parts):
+    """
+    Hash the given parts into a stable hexadecimal key.
+
+    Arrays, Series and DataFrames contribute their values, dtype and shape; any other
+    object contributes its `repr`, so dicts and tuples of plain values are fine.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        value = part.to_numpy() if isinstance(part, (pd.Series, pd.DataFrame)) else part
+        if isinstance(value, np.ndarray):
+            digest.update(f'{value.dtype}{value.shape}'.encode())
+            if value.dtype == object:
+                value = pd.util.hash_array(value.ravel())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    A size-bounded LRU cache of pickled values stored in a directory.
+
+    Parameters:
+        directory (str or Path): Where the entries are stored; created on first write.
+        max_bytes (int): Total size above which the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.directory / f'{key}{ENTRY_SUFFIX}'
+
+    def get(self, key, default=None):
+        """Return the value stored under `key`, or `default` when it is missing."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            with self._lock:
+                self.misses += 1
+            return default
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Store `value` under `key`, then evict old entries if the cache is over its limit."""
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        """Store each `(key, value)` of `items`, evicting old entries once at the end."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for key, value in items:
+            # Write to a temporary file first so that readers never see a partial entry.
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(file.name, self._path(key))
+        self.evict()
+
+    def get_or_set(self, key, compute):
+        """Return the value stored under `key`, computing and storing it with `compute()` on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.glob(f'*{ENTRY_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in `max_bytes`."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Remove every entry."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self):
+        """Hit and miss counters of this process plus the number and total size of stored entries."""
+        entries = self._entries() if self.directory.exists() else []
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
+
+
+forecast_cache = DiskCache(CACHE_DIR / 'forecasts')
@@ -0,0 +1,69 @@
+"""
+Vectorized fitness evaluation for the cargo transportation optimizer.
+
+A population is scored as a whole: each row of a 0/1 matrix is one candidate load and
+weight, volume and value totals come out of a single matrix product against the item
+columns, instead of slicing a DataFrame per individual.
+"""
+
+import numpy as np
+
+ITEM_COLUMNS = ('PESO', 'VOLUME', 'VALOR')
+SELECTED_THRESHOLD = 0.5
+
+
+def item_arrays(data):
+    """
+    Extract the item attributes used by the fitness engine.
+
+    Parameters:
+        data (DataFrame): Item details with columns 'PESO', 'VOLUME' and 'VALOR'.
+
+    Returns:
+        ndarray: A (n_items, 3) float array with weight, volume and value columns.
+    """
+    return data.loc[:, list(ITEM_COLUMNS)].to_numpy(dtype=np.float64)
+
+
+def population_totals(population, items):
+    """
+    Compute weight, volume and value totals for every individual of a population.
+
+    Parameters:
+        population (array-like): A (n_individuals, n_items) 0/1 matrix, or a single 0/1 vector.
+        items (ndarray): The (n_items, 3) array returned by `item_arrays`.
+
+    Returns:
+        ndarray: A (n_individuals, 3) array with the totals of each individual.
+    """
+    population = np.atleast_2d(np.asarray(population))
+    return (population > SELECTED_THRESHOLD).astype(np.float64) @ items
+
+
+def population_fitness(population, items, max_volume, max_weight, penalty=1.0):
+    """
+    Evaluate the fitness of a whole population of cargo selections.
+
+    The score follows the minimization convention of `geneticalgorithm`: feasible loads
+    score the negative of their value. Overloaded ones score a positive, graded penalty
+    that grows with the relative excess of weight and volume, so they always rank below
+    any feasible load while a smaller violation still ranks above a larger one.
+
+    Parameters:
+        population (array-like): A (n_individuals, n_items) 0/1 matrix, or a single 0/1 vector.
+        items (ndarray): The (n_items, 3) array returned by `item_arrays`.
+        max_volume (float): Maximum allowable volume for the selected items.
+        max_weight (float): Maximum allowable weight for the selected items.
+        penalty (float): Scale of the penalty applied per unit of relative excess.
+
+    Returns:
+        ndarray: The fitness of each individual, lower is better.
+    """
+    totals = population_totals(population, items)
+    weight, volume, value = totals[:, 0], totals[:, 1], totals[:, 2]
+
+    weight_excess = np.maximum(weight - max_weight, 0) / max(max_weight, 1e-12)
+    volume_excess = np.maximum(volume - max_volume, 0) / max(max_volume, 1e-12)
+    excess = weight_excess + volume_excess
+
+    return np.where(excess > 0, 1.0 + penalty * excess, -value)
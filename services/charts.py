@@ -0,0 +1,205 @@
+"""
+Decimation of long series before they are charted.
+
+A chart cannot show more points than it has pixels, so sending every point of a long
+series to the browser, or to matplotlib, only costs payload and rendering time. The
+functions here reduce a series to about as many points as the chart is wide:
+
+- `lttb_indices` keeps the points of Largest-Triangle-Three-Buckets, which preserve the
+  shape of a line;
+- `minmax_indices` keeps the lowest and highest point of each pixel-wide bucket, which
+  draws the same envelope as the full series;
+- `aggregate_ohlc` merges consecutive bars into coarser ones (first open, highest high,
+  lowest low, last close and total volume).
+
+`line_trace` builds a Plotly line from a decimated series, and switches to the WebGL
+variant of the trace for series of more than `WEBGL_THRESHOLD` points, whether or not they
+are decimated.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WIDTH = 1200
+# Pixels per candle, so that bodies and wicks stay visible.
+CANDLE_WIDTH = 4
+WEBGL_THRESHOLD = 5000
+# LTTB keeps the first and last points and one point per bucket in between.
+MIN_LTTB_POINTS = 3
+
+
+def _numeric(x):
+    """The abscissas as floats, dates as nanoseconds."""
+    if isinstance(x, pd.Index) and x.dtype.kind == 'M':
+        return x.asi8.astype(np.float64)
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):  # noqa: PLR0914
+    """
+    Positions of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept, and the others are split into `n_out - 2`
+    buckets. Each bucket keeps the point forming the largest triangle with the point kept
+    from the previous bucket and the average of the next one.
+
+    Parameters:
+        x (array-like): The abscissas, in ascending order; dates are accepted.
+        y (array-like): The values; missing values are never kept over valid ones.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        ndarray: The positions kept, in ascending order; all of them when `n_out` is not smaller than the series.
+    """
+    n = len(y)
+    if n_out >= n or n_out < MIN_LTTB_POINTS:
+        return np.arange(n)
+    x = _numeric(x)
+    x -= x[0]
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n).tolist()
+    # The average of each bucket, with the last point as a bucket of its own.
+    valid = ~np.isnan(y)
+    has_missing = not valid.all()
+    counts = np.add.reduceat(valid, edges[:-1])
+    averages_x = (np.add.reduceat(x, edges[:-1]) / np.diff(edges)).tolist()
+    with np.errstate(invalid='ignore'):
+        averages_y = (np.add.reduceat(np.where(valid, y, 0.0), edges[:-1]) / counts).tolist()
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        previous_x, previous_y = float(x[previous]), float(y[previous])
+        next_x, next_y = averages_x[bucket + 1], averages_y[bucket + 1]
+        if math.isnan(next_y):
+            next_y = previous_y
+        # Twice the area of the triangle with the previous point and the next average, for every candidate.
+        area = np.abs(
+            (previous_x - next_x) * (y[start:end] - previous_y) - (previous_x - x[start:end]) * (next_y - previous_y)
+        )
+        if has_missing:
+            area = np.nan_to_num(area, nan=-1.0)
+        previous = start + int(area.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Positions of the lowest and highest value of each of `n_buckets` equal buckets, with the first and last points.
+
+    Returns:
+        ndarray: The positions kept, in ascending order; all of them when the series has
+            no more than two points per bucket.
+    """
+    n = len(y)
+    if n <= 2 * n_buckets or n_buckets < 1:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    # Missing values lose both comparisons.
+    lows = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    kept = np.unique(np.concatenate([[0, n - 1], lows, highs]))
+    return kept[kept < n]
+
+
+def decimate(x, y, max_points=DEFAULT_WIDTH, method='lttb'):
+    """
+    A series reduced to at most about `max_points` points.
+
+    Parameters:
+        x (array-like): The abscissas, in ascending order.
+        y (array-like): The values.
+        max_points (int): Points to keep, about the width of the chart in pixels.
+        method (str): 'lttb' to keep the shape of a line, 'minmax' to keep its envelope
+            (up to two points per bucket, `max_points // 2` buckets).
+
+    Returns:
+        tuple: The kept abscissas and values, of the types of `x` and `y`.
+    """
+    if method == 'lttb':
+        kept = lttb_indices(x, y, max_points)
+    elif method == 'minmax':
+        kept = minmax_indices(np.asarray(y, dtype=np.float64), max_points // 2)
+    else:
+        raise ValueError(f'Unknown decimation method: {method}')
+    if len(kept) == len(y):
+        return x, y
+    return _take(x, kept), _take(y, kept)
+
+
+def _take(values, positions):
+    if isinstance(values, pd.Series):
+        return values.iloc[positions]
+    if isinstance(values, pd.Index):
+        return values[positions]
+    return np.asarray(values)[positions]
+
+
+def aggregate_ohlc(prices, max_bars=DEFAULT_WIDTH // CANDLE_WIDTH):
+    """
+    Bars merged into at most `max_bars` coarser bars of consecutive rows.
+
+    Parameters:
+        prices (DataFrame): Bars with any of the 'Open', 'High', 'Low', 'Close', 'Adj Close' and 'Volume' columns.
+        max_bars (int): Largest number of bars to return.
+
+    Returns:
+        DataFrame: Each merged bar indexed by its first date, with its first open, highest
+            high, lowest low, last closes and total volume; `prices` itself when it already fits.
+    """
+    n = len(prices)
+    if n <= max_bars:
+        return prices
+    size = -(-n // max_bars)
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+    reducers = {
+        'Open': lambda values: values[starts],
+        'High': lambda values: np.fmax.reduceat(values, starts),
+        'Low': lambda values: np.fmin.reduceat(values, starts),
+        'Close': lambda values: values[ends],
+        'Adj Close': lambda values: values[ends],
+        'Volume': lambda values: np.add.reduceat(np.nan_to_num(values), starts),
+    }
+    return pd.DataFrame(
+        {
+            column: reducers[column](prices[column].to_numpy(dtype=np.float64))
+            for column in prices.columns
+            if column in reducers
+        },
+        index=prices.index[starts],
+    )
+
+
+def line_trace(x, y, max_points=DEFAULT_WIDTH, method='lttb', **kwargs):
+    """
+    A Plotly line of the decimated series, drawn with WebGL when the full series has more than `WEBGL_THRESHOLD` points.
+
+    Parameters:
+        x (array-like): The abscissas, in ascending order.
+        y (array-like): The values.
+        max_points (int): Points to keep, about the width of the chart in pixels; None keeps every point.
+        method (str): The `decimate` method.
+        **kwargs: Other properties of the trace, such as `name`.
+
+    Returns:
+        go.Scatter or go.Scattergl: The trace.
+    """
+    import plotly.graph_objects as go  # noqa: PLC0415
+
+    # The length before decimation decides, since the decimated series is never longer than `max_points`.
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    if max_points is not None:
+        x, y = decimate(x, y, max_points, method)
+    return trace(x=x, y=y, mode='lines', **kwargs)
@@ -0,0 +1,194 @@
+"""
+Shared access to the datasets bundled in `data/`.
+
+Every dataset is read from its CSV file once, with explicit compact dtypes, and written
+to a Parquet copy under the cache directory, so later processes read the columnar copy
+instead of parsing the text again. The loaded frames are kept in memory by a single
+process-wide store, so every session and rerun gets the same copy.
+
+A dataset is reloaded when its CSV file changes. A different modification time or size
+makes the store hash the file, and only a different SHA-256 discards the stored copies,
+so touching a file without editing it does not parse it again. The frames are shared:
+callers must not modify them in place. `version` hashes the file without parsing it, so
+readers that stream a large file themselves never hold its frame in memory.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.cache import CACHE_DIR
+
+DATA_DIR = Path('data')
+DEFAULT_CHUNK_SIZE = 1_000_000
+# File name and `pd.read_csv` options of each dataset.
+DATASETS = {
+    'dados': (
+        'dados.csv',
+        {
+            'sep': ';',
+            'dtype': {'CODIGO': 'int32', 'MUNICIPIO': 'string', 'PIB': 'float64', 'VALOREMPENHO': 'float64'},
+        },
+    ),
+    'car_ml_classification': (
+        'car_ml_classification.csv',
+        {'sep': ',', 'dtype': 'category'},
+    ),
+    'franchise': (
+        'franchise_linear_regression.csv',
+        {'sep': ';', 'dtype': {'FrqAnual': 'int32', 'CusInic': 'int32'}},
+    ),
+}
+SOURCE_SIGNATURE = b'source_signature'
+SOURCE_SHA256 = b'source_sha256'
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024**2), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetStore:
+    """
+    The bundled datasets, loaded through a Parquet copy and shared in memory.
+
+    Parameters:
+        data_dir (str or Path): Where the CSV files are.
+        directory (str or Path): Where the Parquet copies are written.
+        datasets (dict): File name and `pd.read_csv` options of each dataset, keyed by name.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, directory=CACHE_DIR / 'datasets', datasets=DATASETS):
+        self.data_dir = Path(data_dir)
+        self.directory = Path(directory)
+        self.datasets = datasets
+        self.loads = {'memory': 0, 'parquet': 0, 'csv': 0}
+        # name -> (modification time and size, SHA-256, frame) of the loaded CSV file.
+        self._loaded = {}
+        # name -> (modification time and size, SHA-256) of the files hashed by `version`.
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        """Path of the CSV file of a dataset, for readers that stream it."""
+        return self.data_dir / self.datasets[name][0]
+
+    def chunks(self, name, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        The rows of a dataset read from its CSV file `chunk_size` at a time, with the dataset's dtypes.
+
+        Nothing is loaded into the shared frame, so a file larger than memory can be summarized.
+        """
+        return pd.read_csv(self.path(name), chunksize=chunk_size, **self.datasets[name][1])
+
+    def _parquet_path(self, name):
+        return self.directory / f'{name}.parquet'
+
+    def _parquet_metadata(self, name):
+        try:
+            return pq.read_schema(self._parquet_path(name)).metadata or {}
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return {}
+
+    def _read_parquet(self, name, field, value):
+        """The stored copy of `name` and the SHA-256 of its source if its `field` metadata is `value`."""
+        metadata = self._parquet_metadata(name)
+        if metadata.get(field) != value.encode():
+            return None, None
+        return pq.read_table(self._parquet_path(name)).to_pandas(), metadata[SOURCE_SHA256].decode()
+
+    def _write_parquet(self, name, frame, signature, digest):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        metadata = {
+            **(table.schema.metadata or {}),
+            SOURCE_SIGNATURE: signature.encode(),
+            SOURCE_SHA256: digest.encode(),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that other processes never read a partial copy.
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as file:
+            pq.write_table(table.replace_schema_metadata(metadata), file)
+        os.replace(file.name, self._parquet_path(name))
+
+    def _signature(self, name):
+        stat = self.path(name).stat()
+        return f'{stat.st_mtime_ns}:{stat.st_size}'
+
+    def _load(self, name):
+        options = self.datasets[name][1]
+        source = self.path(name)
+        signature = self._signature(name)
+        loaded = self._loaded.get(name)
+        if loaded is not None and loaded[0] == signature:
+            self.loads['memory'] += 1
+            return loaded
+
+        # A copy written from a file with the same modification time and size is trusted without hashing.
+        frame, digest = self._read_parquet(name, SOURCE_SIGNATURE, signature)
+        if frame is not None:
+            self.loads['parquet'] += 1
+        else:
+            digest = _sha256(source)
+            if loaded is not None and loaded[1] == digest:
+                self.loads['memory'] += 1
+                frame = loaded[2]
+            else:
+                frame, _ = self._read_parquet(name, SOURCE_SHA256, digest)
+                if frame is not None:
+                    self.loads['parquet'] += 1
+                else:
+                    self.loads['csv'] += 1
+                    frame = pd.read_csv(source, **options)
+            self._write_parquet(name, frame, signature, digest)
+        self._loaded[name] = (signature, digest, frame)
+        return self._loaded[name]
+
+    def load(self, name):
+        """
+        The frame of a dataset, reloaded only when its CSV file changed.
+
+        Parameters:
+            name (str): One of the keys of `datasets`.
+
+        Returns:
+            DataFrame: The shared frame; copy it before modifying it.
+        """
+        with self._lock:
+            return self._load(name)[2]
+
+    def version(self, name):
+        """
+        SHA-256 of the CSV file of `name`, to key derived results.
+
+        The file is hashed by streaming its bytes, without parsing it into a frame, and only
+        when its modification time or size differ from the last load, hash or stored copy.
+        """
+        with self._lock:
+            signature = self._signature(name)
+            for known in (self._loaded.get(name), self._digests.get(name)):
+                if known is not None and known[0] == signature:
+                    return known[1]
+            metadata = self._parquet_metadata(name)
+            if metadata.get(SOURCE_SIGNATURE) == signature.encode():
+                digest = metadata[SOURCE_SHA256].decode()
+            else:
+                digest = _sha256(self.path(name))
+            self._digests[name] = (signature, digest)
+            return digest
+
+
+dataset_store = DatasetStore()
+
+
+def load_dataset(name):
+    """The shared frame of a bundled dataset; see `DatasetStore.load`."""
+    return dataset_store.load(name)
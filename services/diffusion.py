@@ -0,0 +1,138 @@
+"""
+Process-wide pool of Stable Diffusion pipelines.
+
+Loading a pipeline reads gigabytes of weights, so the pool loads at most `size`
+pipelines, each one the first time it is needed, and hands them out to callers one at a
+time. Every session and rerun of the page shares the same pool, so the weights are read
+once per server process instead of on every click.
+
+torch and diffusers are imported when the first pipeline is loaded, not when the page
+that creates the pool is rendered.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from services.image_cache import model_fingerprint
+
+DEFAULT_MODEL = 'stabilityai/stable-diffusion-2-1-base'
+SCHEDULER_NAME = 'EulerDiscreteScheduler'
+
+
+def default_device():
+    import torch  # noqa: PLC0415
+
+    return 'cuda' if torch.cuda.is_available() else 'cpu'
+
+
+class PipelinePool:
+    """
+    A bounded pool of lazily loaded Stable Diffusion pipelines.
+
+    Parameters:
+        model_path (str): A Hugging Face model id or a local directory saved with `save_pretrained`.
+        size (int): Maximum number of pipelines kept in memory.
+        device (str, optional): Torch device; defaults to CUDA when available.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL, size=1, device=None):
+        self.model_path = model_path
+        self.size = size
+        self._device = device
+        self.load_times = []
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @property
+    def device(self):
+        """The torch device of the pipelines, resolved on first use."""
+        if self._device is None:
+            self._device = default_device()
+        return self._device
+
+    @property
+    def fingerprint(self):
+        """Identifies the model and scheduler, so that stored images can be tied to them."""
+        return model_fingerprint(self.model_path, SCHEDULER_NAME)
+
+    def _load(self):
+        from diffusers import EulerDiscreteScheduler, StableDiffusionPipeline  # noqa: PLC0415
+
+        start = perf_counter()
+        scheduler = EulerDiscreteScheduler.from_pretrained(self.model_path, subfolder='scheduler')
+        pipeline = StableDiffusionPipeline.from_pretrained(self.model_path, scheduler=scheduler).to(self.device)
+        pipeline.set_progress_bar_config(disable=True)
+        self.load_times.append(perf_counter() - start)
+        return pipeline
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Borrow a pipeline, loading a new one if the pool is not full yet.
+
+        Parameters:
+            timeout (float, optional): Seconds to wait for a busy pipeline before `queue.Empty` is raised.
+
+        Yields:
+            StableDiffusionPipeline: A pipeline that no other caller uses until the block exits.
+        """
+        try:
+            pipeline = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    pipeline = self._load()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                pipeline = self._idle.get(timeout=timeout)
+        try:
+            yield pipeline
+        finally:
+            self._idle.put(pipeline)
+
+    def stats(self):
+        """Number of loaded pipelines, idle pipelines and the time spent loading them."""
+        return {
+            'loaded': self._created,
+            'idle': self._idle.qsize(),
+            'load_time': sum(self.load_times),
+        }
+
+
+def generate(  # noqa: PLR0913, PLR0917
+    pool, prompt, negative_prompt, num_images_per_prompt, num_inference_steps, height, width, seed, guidance_scale
+):
+    """
+    Generate images with a pipeline borrowed from `pool`.
+
+    Returns:
+        tuple: The list of generated images and a dict with the seconds spent 'loading'
+            (or waiting for) the pipeline and running 'inference'.
+    """
+    import torch  # noqa: PLC0415
+
+    start = perf_counter()
+    with pool.acquire() as pipeline:
+        acquired = perf_counter()
+        generator = torch.Generator(device=pool.device).manual_seed(seed)
+        images = pipeline(
+            prompt=prompt,
+            num_images_per_prompt=num_images_per_prompt,
+            negative_prompt=negative_prompt,
+            num_inference_steps=num_inference_steps,
+            height=height,
+            width=width,
+            generator=generator,
+            guidance_scale=guidance_scale,
+        )['images']
+    return images, {'loading': acquired - start, 'inference': perf_counter() - acquired}
@@ -0,0 +1,49 @@
+"""
+CSV export of files scored chunk by chunk.
+
+Scored files are written with Arrow's CSV writer, which is several times faster than
+`DataFrame.to_csv` on millions of rows. Chunks are written as they are produced, so the
+frames of the whole file are never held at once; the CSV output itself is built in memory,
+since `st.download_button` takes the whole content of the file to download.
+"""
+
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+
+def _csv_type(arrow_type):
+    """Categorical columns are written as their values; all-null columns as strings."""
+    if pa.types.is_dictionary(arrow_type):
+        return _csv_type(arrow_type.value_type)
+    if pa.types.is_null(arrow_type):
+        return pa.string()
+    return arrow_type
+
+
+def frames_to_csv(frames, delimiter=','):
+    """
+    Write DataFrames with the same columns one after the other as a single CSV file.
+
+    The column types are fixed by the first frame, and the other frames are cast to them.
+
+    Parameters:
+        frames (iterable of DataFrame): The chunks, in file order; the index is not written.
+        delimiter (str): The field separator.
+
+    Returns:
+        bytes: The CSV file, with a header line; empty when there are no frames.
+    """
+    output = io.BytesIO()
+    writer = schema = None
+    for frame in frames:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            schema = pa.schema([pa.field(field.name, _csv_type(field.type)) for field in table.schema])
+            options = pa_csv.WriteOptions(delimiter=delimiter, quoting_style='needed')
+            writer = pa_csv.CSVWriter(output, schema, write_options=options)
+        writer.write_table(table.cast(schema))
+    if writer is not None:
+        writer.close()
+    return output.getvalue()
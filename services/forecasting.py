@@ -0,0 +1,203 @@
+"""
+Forecasting methods used by the time series benchmark page.
+
+The statistical models (Holt, Holt-Winters and seasonal ARIMA) are fitted concurrently,
+each one in its own worker process with its own deadline, while the cheap baselines run
+in the calling process. Every method reports how long it took to fit and to forecast.
+
+statsmodels and pmdarima take seconds to import, so they are imported by the functions
+that fit the models rather than when the page loads.
+"""
+
+import multiprocessing
+from multiprocessing.connection import wait
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+METHOD_TITLES = {
+    'naive': 'Naive',
+    'mean': 'Mean',
+    'drift': 'Drift',
+    'holt': 'Holt',
+    'hw': 'HW Additive',
+    'arima': 'ARIMA',
+}
+PARALLEL_METHODS = ('holt', 'hw', 'arima')
+SEASONAL_PERIODS = 12
+DEFAULT_TIMEOUT = 120.0
+
+
+def smoothing_model(method, train):
+    """Unfitted Holt ('holt') or additive Holt-Winters ('hw') model for a training series."""
+    from statsmodels.tsa.api import ExponentialSmoothing, Holt  # noqa: PLC0415
+
+    # The baseline relied on initialization_method=None, deprecated since statsmodels 0.12 and
+    # rejected by newer releases; 'estimated' is its replacement and also fits the initial states.
+    if method == 'holt':
+        return Holt(train, initialization_method='estimated')
+    return ExponentialSmoothing(
+        train, seasonal='additive', seasonal_periods=SEASONAL_PERIODS, initialization_method='estimated'
+    )
+
+
+def _fit(method, train):
+    if method in {'holt', 'hw'}:
+        return smoothing_model(method, train).fit()
+    if method == 'arima':
+        from pmdarima import auto_arima  # noqa: PLC0415
+
+        return auto_arima(train, seasonal=True, m=SEASONAL_PERIODS, suppress_warnings=True)
+    return None
+
+
+def _forecast(method, model, train, h):
+    if method == 'naive':
+        return np.tile(train.iloc[-1], h)
+    if method == 'mean':
+        return np.tile(train.mean(), h)
+    if method == 'drift':
+        return train.iloc[-1] + (np.arange(1, h + 1) * ((train.iloc[-1] - train.iloc[0]) / (len(train) - 1)))
+    if method == 'arima':
+        return np.asarray(model.predict(n_periods=h))
+    return np.asarray(model.forecast(h))
+
+
+def fit_forecast(method, values, h):
+    """
+    Fit one forecasting method and forecast `h` periods ahead.
+
+    Parameters:
+        method (str): One of the keys of `METHOD_TITLES`.
+        values (array-like): The training series.
+        h (int): The forecast horizon.
+
+    Returns:
+        tuple: The forecast, the fit time and the forecast time in seconds.
+    """
+    train = pd.Series(np.asarray(values, dtype=np.float64))
+    start = perf_counter()
+    model = _fit(method, train)
+    fitted = perf_counter()
+    forecast = _forecast(method, model, train, h)
+    return np.asarray(forecast, dtype=np.float64), fitted - start, perf_counter() - fitted
+
+
+def _run_task(connection, function, args):
+    """Body of a worker process: report that the task started, then its result or error."""
+    connection.send(('started', None))
+    try:
+        connection.send(('done', function(*args)))
+    except Exception as error:
+        connection.send(('error', str(error)))
+    finally:
+        connection.close()
+
+
+def run_in_pool(tasks, timeout=DEFAULT_TIMEOUT, max_workers=len(PARALLEL_METHODS)):
+    """
+    Run tasks concurrently, each one in a worker process of its own and with its own deadline.
+
+    Every call starts its own workers, so a timed out task only kills its own worker and
+    never the tasks of other sessions.
+
+    Parameters:
+        tasks (dict): Maps a task name to a `(function, args)` pair; the function must be importable.
+        timeout (float): Seconds each task may take, counted from when its worker starts running it.
+        max_workers (int): Tasks running at the same time; the others wait for a free worker.
+
+    Returns:
+        tuple: The results of the finished tasks and the status of the failed ones
+            ('timeout' or 'erro: <message>'), both keyed by task name.
+    """
+    # Spawned workers avoid forking the threads of the Streamlit server.
+    context = multiprocessing.get_context('spawn')
+    waiting = list(tasks.items())
+    # Maps the receiving end of each running task to its name, process and deadline.
+    running = {}
+    results, statuses = {}, {}
+
+    def finish(receiver):
+        name, process, _ = running.pop(receiver)
+        receiver.close()
+        process.join()
+        return name
+
+    while waiting or running:
+        while waiting and len(running) < max_workers:
+            name, (function, args) = waiting.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_task, args=(sender, function, args), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = [name, process, None]
+
+        deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+        for receiver in wait(list(running), max(min(deadlines) - perf_counter(), 0) if deadlines else None):
+            try:
+                kind, payload = receiver.recv()
+            except EOFError:
+                kind, payload = 'error', 'o processo do modelo terminou inesperadamente'
+            if kind == 'started':
+                running[receiver][2] = perf_counter() + timeout
+            elif kind == 'done':
+                results[finish(receiver)] = payload
+            else:
+                statuses[finish(receiver)] = f'erro: {payload}'
+
+        now = perf_counter()
+        for receiver, (_, process, deadline) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                process.terminate()
+                statuses[finish(receiver)] = 'timeout'
+    return results, statuses
+
+
+def timing_rows(selected, results, statuses):
+    """Per-method rows of status, fit time and forecast time from `(output, fit_time, forecast_time)` results."""
+    rows = []
+    for method in selected:
+        fit_time, forecast_time = results[method][1:] if method in results else (None, None)
+        rows.append({
+            'method': METHOD_TITLES[method],
+            'status': statuses.get(method, 'ok'),
+            'fit_time': fit_time,
+            'forecast_time': forecast_time,
+        })
+    return rows
+
+
+def forecast_methods(train, h, methods, timeout=DEFAULT_TIMEOUT):
+    """
+    Generate forecasts using specified methods for a given training dataset.
+
+    Parameters:
+    train (pd.Series): The training data series used for forecasting.
+    h (int): The forecast horizon, indicating the number of periods to predict.
+    methods (dict): A dictionary specifying which forecasting methods to use,
+        with keys as method names ('naive', 'mean', 'drift', 'holt', 'hw', 'arima')
+        and values as booleans indicating whether to apply the method.
+    timeout (float): Seconds each statistical model may take before it is abandoned.
+
+    Returns:
+    tuple: A tuple containing three lists:
+        - forecast (list): A list of forecasted values for each method that finished.
+        - titles (list): A list of method names corresponding to each forecast.
+        - timings (list): One dict per selected method with 'method', 'status',
+          'fit_time' and 'forecast_time' (seconds).
+    """
+    values = np.asarray(train, dtype=np.float64)
+    selected = [method for method in METHOD_TITLES if methods.get(method)]
+    parallel = [method for method in selected if method in PARALLEL_METHODS]
+    inline = [method for method in selected if method not in PARALLEL_METHODS]
+
+    results, statuses = {}, {}
+    if parallel:
+        results, statuses = run_in_pool({method: (fit_forecast, (method, values, h)) for method in parallel}, timeout)
+    for method in inline:
+        results[method] = fit_forecast(method, values, h)
+
+    forecast = [results[method][0] for method in selected if method in results]
+    titles = [METHOD_TITLES[method] for method in selected if method in results]
+    return forecast, titles, timing_rows(selected, results, statuses)
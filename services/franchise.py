@@ -0,0 +1,142 @@
+"""
+Linear model of the initial cost of a franchise by its annual fee.
+
+`IncrementalOLS` keeps the running sufficient statistics of a simple linear regression
+(the count, the means and the centered sums of squares and cross products), so adding
+observations updates the fit in constant time per batch without revisiting the data,
+and any two fits merge exactly. The statistics are updated with the pairwise formulas of
+Chan et al., which stay accurate where raw sums of squares would cancel.
+
+Predictions come with the classical OLS prediction interval, and files of candidate
+franchises are predicted in chunks with vectorized arithmetic.
+"""
+
+import numpy as np
+import pandas as pd
+
+from services.exports import frames_to_csv
+
+FEATURE = 'FrqAnual'
+TARGET = 'CusInic'
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_LEVEL = 0.95
+PREDICTION_COLUMNS = ('previsao', 'limite_inferior', 'limite_superior')
+
+
+class IncrementalOLS:
+    """
+    Simple linear regression fitted from running sufficient statistics.
+
+    Build it with `fit`, or empty, and add observations with `update`.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+        self.syy = 0.0
+
+    @classmethod
+    def fit(cls, x, y):
+        """A model fitted on the observations `x` and `y`."""
+        return cls().update(x, y)
+
+    def update(self, x, y):
+        """
+        Add observations to the fit.
+
+        Parameters:
+            x (float or array-like): The annual fees.
+            y (float or array-like): The initial costs.
+
+        Returns:
+            IncrementalOLS: `self`.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        n = len(x)
+        if not n:
+            return self
+        mean_x, mean_y = x.mean(), y.mean()
+        dx, dy = x - mean_x, y - mean_y
+        total = self.n + n
+        delta_x, delta_y = mean_x - self.mean_x, mean_y - self.mean_y
+        weight = self.n * n / total
+        self.sxx += dx @ dx + delta_x * delta_x * weight
+        self.sxy += dx @ dy + delta_x * delta_y * weight
+        self.syy += dy @ dy + delta_y * delta_y * weight
+        self.mean_x += delta_x * n / total
+        self.mean_y += delta_y * n / total
+        self.n = total
+        return self
+
+    @property
+    def slope(self):
+        return self.sxy / self.sxx
+
+    @property
+    def intercept(self):
+        return self.mean_y - self.slope * self.mean_x
+
+    @property
+    def r2(self):
+        """Coefficient of determination on the observations seen."""
+        return self.sxy * self.sxy / (self.sxx * self.syy)
+
+    @property
+    def residual_std(self):
+        """Standard deviation of the residuals, with n - 2 degrees of freedom."""
+        return np.sqrt(max(self.syy - self.slope * self.sxy, 0.0) / (self.n - 2))
+
+    def predict(self, x):
+        """Predicted initial cost of each annual fee in `x`."""
+        return self.intercept + self.slope * np.asarray(x, dtype=np.float64)
+
+    def interval(self, x, level=DEFAULT_LEVEL):
+        """
+        Prediction interval of a new franchise at each annual fee in `x`.
+
+        Returns:
+            tuple: The predictions and the lower and upper bounds, as arrays.
+        """
+        from scipy.stats import t  # noqa: PLC0415
+
+        x = np.asarray(x, dtype=np.float64)
+        prediction = self.predict(x)
+        spread = np.sqrt(1 + 1 / self.n + (x - self.mean_x) ** 2 / self.sxx)
+        margin = t.ppf((1 + level) / 2, self.n - 2) * self.residual_std * spread
+        return prediction, prediction - margin, prediction + margin
+
+
+def predict_csv(model, source, chunk_size=DEFAULT_CHUNK_SIZE, level=DEFAULT_LEVEL):
+    """
+    Predict the initial cost of every franchise of a CSV file, chunk by chunk.
+
+    The input is read one chunk at a time, but the output is not streamed: the CSV bytes
+    are built in memory, for `st.download_button`, and grow with the number of rows.
+
+    Parameters:
+        model (IncrementalOLS): The fitted model.
+        source: A path or file object of a `;`-separated file with a `FEATURE` column.
+        chunk_size (int): Rows read at a time.
+        level (float): Coverage of the prediction intervals.
+
+    Returns:
+        tuple: The input columns followed by the `PREDICTION_COLUMNS`, rounded to cents,
+            as `;`-separated CSV bytes, and the number of rows.
+    """
+    n_rows = 0
+
+    def predicted_chunks():
+        nonlocal n_rows
+        # The input columns are copied to the output as they were written.
+        for chunk in pd.read_csv(source, sep=';', dtype=str, chunksize=chunk_size):
+            if FEATURE not in chunk.columns:
+                raise ValueError(f'Missing column: {FEATURE}')
+            bounds = model.interval(pd.to_numeric(chunk[FEATURE], errors='coerce'), level)
+            n_rows += len(chunk)
+            yield chunk.assign(**{column: np.round(values, 2) for column, values in zip(PREDICTION_COLUMNS, bounds)})
+
+    return frames_to_csv(predicted_chunks(), delimiter=';'), n_rows
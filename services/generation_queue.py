@@ -0,0 +1,188 @@
+"""
+Cross-session batching of image generation requests.
+
+Requests from every session go through one bounded queue. A worker takes the oldest
+request, waits a short batching window for compatible ones (same size, number of steps
+and guidance scale) and runs them all in a single pipeline call. Each request keeps its
+own prompt and seed: its initial latents are drawn from its own seeded generator, exactly
+as an unbatched call would draw them, and its images are routed back through a Future.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+from time import monotonic, perf_counter
+
+DEFAULT_BATCH_WINDOW = 0.2
+DEFAULT_MAX_BATCH_IMAGES = 4
+DEFAULT_MAX_QUEUE = 32
+RECENT_WAITS = 100
+
+
+class QueueFullError(RuntimeError):
+    """Raised by `GenerationQueue.submit` when the queue is at capacity."""
+
+
+class _Request:
+    def __init__(self, prompt, negative_prompt, num_images, seed, settings):
+        self.prompt = prompt
+        self.negative_prompt = negative_prompt
+        self.num_images = num_images
+        self.seed = seed
+        self.settings = settings
+        self.future = Future()
+        self.enqueued = monotonic()
+
+
+class GenerationQueue:
+    """
+    Batch compatible generation requests into shared pipeline calls.
+
+    Parameters:
+        pool (PipelinePool): Where the pipelines are borrowed from; one worker runs per pipeline.
+        batch_window (float): Seconds the oldest request waits for compatible ones.
+        max_batch_images (int): Maximum number of images generated by one pipeline call.
+        max_queue (int): Maximum number of waiting requests.
+    """
+
+    def __init__(
+        self,
+        pool,
+        batch_window=DEFAULT_BATCH_WINDOW,
+        max_batch_images=DEFAULT_MAX_BATCH_IMAGES,
+        max_queue=DEFAULT_MAX_QUEUE,
+    ):
+        self.pool = pool
+        self.batch_window = batch_window
+        self.max_batch_images = max_batch_images
+        self.max_queue = max_queue
+        self.batches = 0
+        self.images = 0
+        self._pending = deque()
+        self._waits = deque(maxlen=RECENT_WAITS)
+        self._condition = threading.Condition()
+        for _ in range(pool.size):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def submit(  # noqa: PLR0913, PLR0917
+        self, prompt, negative_prompt, num_images_per_prompt, num_inference_steps, height, width, seed, guidance_scale
+    ):
+        """
+        Queue a generation request.
+
+        Returns:
+            Future: Resolves to the list of images and a dict with the seconds the request
+                spent 'waiting' in the queue, 'loading' or waiting for a pipeline, the
+                'inference' time of its batch and the 'batch_size' (images generated together).
+
+        Raises:
+            QueueFullError: When `max_queue` requests are already waiting.
+        """
+        settings = (num_inference_steps, height, width, guidance_scale)
+        request = _Request(prompt, negative_prompt or '', num_images_per_prompt, seed, settings)
+        with self._condition:
+            if len(self._pending) >= self.max_queue:
+                raise QueueFullError('The generation queue is full.')
+            self._pending.append(request)
+            self._condition.notify_all()
+        return request.future
+
+    def _take_batch(self):
+        with self._condition:
+            first = None
+            # Another worker may take the oldest request while this one waits for the window.
+            while first is None or first not in self._pending:
+                while not self._pending:
+                    self._condition.wait()
+                first = self._pending[0]
+                deadline = first.enqueued + self.batch_window
+                while self._compatible_images(first) < self.max_batch_images and monotonic() < deadline:
+                    self._condition.wait(max(deadline - monotonic(), 0))
+
+            batch, images = [], 0
+            limit = max(self.max_batch_images, first.num_images)
+            for request in list(self._pending):
+                if request.settings == first.settings and images + request.num_images <= limit:
+                    batch.append(request)
+                    images += request.num_images
+                    self._pending.remove(request)
+            return batch
+
+    def _compatible_images(self, first):
+        return sum(request.num_images for request in self._pending if request.settings == first.settings)
+
+    def _work(self):
+        while True:
+            batch = self._take_batch()
+            started = monotonic()
+            for request in batch:
+                self._waits.append(started - request.enqueued)
+            try:
+                images, loading, inference = self._run(batch)
+            except Exception as error:
+                for request in batch:
+                    request.future.set_exception(error)
+                continue
+
+            with self._condition:
+                self.batches += 1
+                self.images += len(images)
+            offset = 0
+            for request in batch:
+                request.future.set_result((
+                    images[offset : offset + request.num_images],
+                    {
+                        'waiting': started - request.enqueued,
+                        'loading': loading,
+                        'inference': inference,
+                        'batch_size': len(images),
+                    },
+                ))
+                offset += request.num_images
+
+    def _run(self, batch):
+        import torch  # noqa: PLC0415
+        from diffusers.utils.torch_utils import randn_tensor  # noqa: PLC0415
+
+        num_inference_steps, height, width, guidance_scale = batch[0].settings
+        # Borrowing the pipeline loads it the first time, or waits while another caller uses it.
+        start = perf_counter()
+        with self.pool.acquire() as pipeline:
+            acquired = perf_counter()
+            shape = (
+                pipeline.unet.config.in_channels,
+                height // pipeline.vae_scale_factor,
+                width // pipeline.vae_scale_factor,
+            )
+            # Same draws as an unbatched call seeded with the request's seed.
+            latents = torch.cat([
+                randn_tensor(
+                    (request.num_images, *shape),
+                    generator=torch.Generator(device=self.pool.device).manual_seed(request.seed),
+                    device=pipeline.device,
+                    dtype=pipeline.unet.dtype,
+                )
+                for request in batch
+            ])
+            images = pipeline(
+                prompt=[request.prompt for request in batch for _ in range(request.num_images)],
+                negative_prompt=[request.negative_prompt for request in batch for _ in range(request.num_images)],
+                num_inference_steps=num_inference_steps,
+                height=height,
+                width=width,
+                guidance_scale=guidance_scale,
+                latents=latents,
+            )['images']
+        return images, acquired - start, perf_counter() - acquired
+
+    def stats(self):
+        """Queue depth, mean wait of the recent requests and totals of batches and images."""
+        with self._condition:
+            depth = len(self._pending)
+            waits = list(self._waits)
+        return {
+            'depth': depth,
+            'mean_wait': sum(waits) / len(waits) if waits else 0.0,
+            'batches': self.batches,
+            'images': self.images,
+        }
@@ -0,0 +1,236 @@
+"""
+Island-model genetic algorithm for the cargo transportation optimizer.
+
+Several populations ("islands") evolve independently in a process pool and exchange
+their best individuals every `migration_interval` generations along a ring. Each island
+owns a random generator derived from a single seed and its state travels with the
+island between epochs, so a run is reproducible whatever the number of processes.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from services.cargo import population_fitness
+
+UNIFORM_CROSSOVER_RATE = 0.5
+
+_WORKER_PROBLEM = {}
+
+
+def _init_worker(items, max_volume, max_weight):
+    _WORKER_PROBLEM.update(items=items, max_volume=max_volume, max_weight=max_weight)
+
+
+def _tournament(fitness, rng, n_parents, size):
+    contenders = rng.integers(0, len(fitness), (n_parents, size))
+    winners = np.argmin(fitness[contenders], axis=1)
+    return contenders[np.arange(n_parents), winners]
+
+
+def _initial_islands(items, max_volume, max_weight, n_islands, population_size, seed):  # noqa: PLR0913, PLR0917
+    """Random initial populations and generator states, one per island."""
+    # Start with sparse loads so that a useful share of the first generation is feasible.
+    totals = items.sum(axis=0)
+    density = float(np.clip(min(max_weight / max(totals[0], 1), max_volume / max(totals[1], 1)), 0.01, 0.5))
+    generators = [np.random.Generator(np.random.PCG64(s)) for s in np.random.SeedSequence(seed).spawn(n_islands)]
+    populations = [(rng.random((population_size, len(items))) < density).astype(np.uint8) for rng in generators]
+    return populations, [rng.bit_generator.state for rng in generators]
+
+
+def _migrate(populations, fitnesses, n_migrants):
+    """Ring migration: the best individuals of island i replace the worst of island i + 1."""
+    migrants = [
+        population[np.argsort(fitness, kind='stable')[:n_migrants]]
+        for population, fitness in zip(populations, fitnesses)
+    ]
+    migrated = []
+    for island, (population, fitness) in enumerate(zip(populations, fitnesses)):
+        worst = np.argsort(fitness, kind='stable')[::-1][:n_migrants]
+        receiver = population.copy()
+        receiver[worst] = migrants[island - 1]
+        migrated.append(receiver)
+    return migrated
+
+
+def evolve_island(population, rng_state, generations, params):
+    """
+    Evolve one island for a number of generations.
+
+    Parameters:
+        population (ndarray): A (population_size, n_items) uint8 matrix.
+        rng_state (dict): State of the island's `numpy.random.PCG64` generator.
+        generations (int): Number of generations to run.
+        params (dict): Operator settings with the keys 'mutation_probability',
+            'crossover_probability', 'elite_size' and 'tournament_size'.
+
+    Returns:
+        tuple: The evolved population, its fitness, the new generator state and the best
+            fitness of each generation.
+    """
+    problem = _WORKER_PROBLEM
+    rng = np.random.Generator(np.random.PCG64())
+    rng.bit_generator.state = rng_state
+    size, n_items = population.shape
+
+    def score(individuals):
+        return population_fitness(individuals, problem['items'], problem['max_volume'], problem['max_weight'])
+
+    fitness = score(population)
+    history = []
+    for _ in range(generations):
+        order = np.argsort(fitness, kind='stable')
+        elite = population[order[: params['elite_size']]]
+        n_children = size - len(elite)
+
+        mothers = population[_tournament(fitness, rng, n_children, params['tournament_size'])]
+        fathers = population[_tournament(fitness, rng, n_children, params['tournament_size'])]
+        crossover = rng.random(n_children) < params['crossover_probability']
+        mask = (rng.random((n_children, n_items)) < UNIFORM_CROSSOVER_RATE) & crossover[:, np.newaxis]
+        children = np.where(mask, fathers, mothers)
+        children ^= (rng.random((n_children, n_items)) < params['mutation_probability']).astype(np.uint8)
+
+        population = np.concatenate((elite, children))
+        fitness = np.concatenate((fitness[order[: len(elite)]], score(children)))
+        history.append(float(fitness.min()))
+
+    return population, fitness, rng.bit_generator.state, history
+
+
+def iterate_island_ga(  # noqa: PLR0912, PLR0913, PLR0914, PLR0917
+    items,
+    max_volume,
+    max_weight,
+    n_islands=4,
+    population_size=50,
+    max_generations=500,
+    migration_interval=10,
+    n_migrants=2,
+    patience=100,
+    target_value=None,
+    seed=0,
+    processes=None,
+):
+    """
+    Run the island-model genetic algorithm, yielding progress after every generation.
+
+    Islands advance in epochs of `migration_interval` generations, so progress for the
+    generations of an epoch arrives together once the slowest island finishes it.
+
+    Parameters:
+        items (ndarray): The (n_items, 3) array returned by `services.cargo.item_arrays`.
+        max_volume (float): Maximum allowable volume for the selected items.
+        max_weight (float): Maximum allowable weight for the selected items.
+        n_islands (int): Number of independent populations.
+        population_size (int): Individuals per island.
+        max_generations (int): Upper limit of generations.
+        migration_interval (int): Generations between migrations.
+        n_migrants (int): Best individuals sent from each island to the next one.
+        patience (int): Stop after this many generations without improvement of the best load.
+        target_value (float, optional): Stop as soon as a load reaches this value.
+        seed (int): Seed of the whole run.
+        processes (int, optional): Worker processes; defaults to one per island,
+            and 0 runs every island in the calling process.
+
+    Yields:
+        dict: For each generation, 'generation', 'best_value' and 'island_values'
+            (best feasible value per island). The last item also holds 'done' set to
+            True, 'variable' (0/1 selection of the best load) and 'stopped_by'.
+    """
+    items = np.asarray(items, dtype=np.float64)
+    n_items = len(items)
+    params = {
+        'mutation_probability': min(0.05, 2.0 / max(n_items, 1)),
+        'crossover_probability': 0.9,
+        'elite_size': max(1, population_size // 20),
+        'tournament_size': 3,
+    }
+
+    populations, states = _initial_islands(items, max_volume, max_weight, n_islands, population_size, seed)
+
+    processes = n_islands if processes is None else processes
+    executor = None
+    if processes > 0:
+        # Spawned workers avoid forking the threads of the Streamlit server.
+        executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(items, max_volume, max_weight),
+        )
+    else:
+        _init_worker(items, max_volume, max_weight)
+
+    best_fitness, best_variable = np.inf, np.zeros(n_items)
+    running_best, generation, stale = np.inf, 0, 0
+    stopped_by = 'max_generations'
+    try:
+        while generation < max_generations:
+            epoch = min(migration_interval, max_generations - generation)
+            if executor is None:
+                results = [evolve_island(pop, state, epoch, params) for pop, state in zip(populations, states)]
+            else:
+                futures = [
+                    executor.submit(evolve_island, pop, state, epoch, params) for pop, state in zip(populations, states)
+                ]
+                results = [future.result() for future in futures]
+
+            populations = [result[0] for result in results]
+            fitnesses = [result[1] for result in results]
+            states = [result[2] for result in results]
+            histories = np.array([result[3] for result in results])
+
+            for population, fitness in zip(populations, fitnesses):
+                leader = int(np.argmin(fitness))
+                if fitness[leader] < best_fitness:
+                    best_fitness = float(fitness[leader])
+                    best_variable = population[leader].astype(np.float64)
+
+            for generation_best in histories.T:
+                generation += 1
+                if generation_best.min() < running_best:
+                    running_best, stale = float(generation_best.min()), 0
+                else:
+                    stale += 1
+                yield {
+                    'generation': generation,
+                    'best_value': max(-running_best, 0.0),
+                    'island_values': np.maximum(-generation_best, 0.0).tolist(),
+                }
+
+            if target_value is not None and -best_fitness >= target_value:
+                stopped_by = 'target_value'
+                break
+            if stale >= patience:
+                stopped_by = 'patience'
+                break
+
+            populations = _migrate(populations, fitnesses, n_migrants)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if best_fitness > 0:
+        # Not a single feasible load was found: fall back to the empty one.
+        best_fitness, best_variable = 0.0, np.zeros(n_items)
+
+    yield {
+        'generation': generation,
+        'best_value': -best_fitness,
+        'done': True,
+        'variable': best_variable,
+        'stopped_by': stopped_by,
+    }
+
+
+def run_island_ga(items, max_volume, max_weight, **kwargs):
+    """
+    Run `iterate_island_ga` to completion.
+
+    Returns:
+        dict: The final progress item, with 'variable', 'best_value' and 'stopped_by'.
+    """
+    for progress in iterate_island_ga(items, max_volume, max_weight, **kwargs):
+        pass
+    return progress
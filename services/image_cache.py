@@ -0,0 +1,103 @@
+"""
+Disk-backed store of generated images.
+
+Stable Diffusion output is fully determined by the model, the scheduler and the
+generation parameters, so images are stored as PNG files keyed by those parameters and
+served again without running the pipeline. Entries live in one directory per model
+fingerprint: changing the model or its scheduler starts a fresh directory, and the
+entries of other fingerprints can be dropped with `prune_other_models`.
+"""
+
+import hashlib
+import io
+import shutil
+from pathlib import Path
+
+from PIL import Image
+
+from services.cache import CACHE_DIR, DiskCache, cache_key
+
+DEFAULT_MAX_BYTES = 512 * 1024**2
+FINGERPRINT_FILES = ('model_index.json', 'scheduler/scheduler_config.json')
+
+
+def model_fingerprint(model_path, scheduler_name):
+    """
+    Identify a model and scheduler combination.
+
+    For a local pipeline directory the pipeline index and scheduler configuration are
+    hashed too, so editing or replacing the saved model changes the fingerprint.
+
+    Parameters:
+        model_path (str): A Hugging Face model id or a local pipeline directory.
+        scheduler_name (str): Class name of the scheduler used with the model.
+
+    Returns:
+        str: A short hexadecimal fingerprint.
+    """
+    digest = hashlib.sha256(f'{model_path}\x00{scheduler_name}'.encode())
+    directory = Path(model_path)
+    if directory.is_dir():
+        for name in FINGERPRINT_FILES:
+            path = directory / name
+            if path.is_file():
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ImageCache:
+    """
+    Size-bounded store of generated images for one model fingerprint.
+
+    Parameters:
+        fingerprint (str): The value returned by `model_fingerprint`.
+        directory (str or Path): Root directory shared by every fingerprint.
+        max_bytes (int): Size above which the least recently used entries are evicted.
+    """
+
+    def __init__(self, fingerprint, directory=CACHE_DIR / 'images', max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(directory)
+        self.fingerprint = fingerprint
+        self.store = DiskCache(self.root / fingerprint, max_bytes=max_bytes)
+
+    @staticmethod
+    def key(prompt, negative_prompt, num_images_per_prompt, num_inference_steps, height, width, seed, guidance_scale):  # noqa: PLR0913, PLR0917
+        """Hash the generation parameters, normalized so that equal requests share a key."""
+        return cache_key(
+            prompt,
+            negative_prompt or '',
+            int(num_images_per_prompt),
+            int(num_inference_steps),
+            int(height),
+            int(width),
+            int(seed),
+            float(guidance_scale),
+        )
+
+    def get(self, key):
+        """Return the stored images for `key`, or None."""
+        encoded = self.store.get(key)
+        if encoded is None:
+            return None
+        return [Image.open(io.BytesIO(data)) for data in encoded]
+
+    def set(self, key, images):
+        """Store images as PNG files under `key`."""
+        encoded = []
+        for image in images:
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG')
+            encoded.append(buffer.getvalue())
+        self.store.set(key, encoded)
+
+    def invalidate(self):
+        """Drop every image stored for this fingerprint."""
+        self.store.clear()
+
+    def prune_other_models(self):
+        """Drop the images generated with any other model or scheduler."""
+        if not self.root.exists():
+            return
+        for directory in self.root.iterdir():
+            if directory.is_dir() and directory.name != self.fingerprint:
+                shutil.rmtree(directory, ignore_errors=True)
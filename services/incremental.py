@@ -0,0 +1,270 @@
+"""
+Incremental maintenance of frequent itemsets as transactions are appended.
+
+`IncrementalMiner` follows FUP (Cheung et al., 1996). An itemset can only be frequent
+in the updated data if it was frequent before or is frequent in the new batch, so an
+update counts the known itemsets in the batch alone and walks the new candidates level
+by level, dropping those that are not frequent in the batch. Only the candidates that
+survive are counted in the history, and only on the rows that contain their rarest item.
+
+Every itemset counted that way is remembered with its exact count even when it is not
+frequent, which grows a border of known infrequent itemsets that later updates resolve
+without touching the history again.
+"""
+
+import math
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from services.cache import cache_key
+from services.itemsets import PAIR_SIZE, POPCOUNT, eclat
+from services.transactions import EncodedTransactions, encode_transactions
+
+BITSET_CHUNK = 256
+
+
+def _count(matrix, itemsets):
+    """Number of rows of the integer CSR `matrix` containing each itemset, given as tuples of column ids."""
+    if not itemsets:
+        return np.zeros(0, dtype=np.int64)
+    lengths = np.array([len(itemset) for itemset in itemsets], dtype=np.int64)
+    incidence = sp.csr_matrix(
+        (
+            np.ones(int(lengths.sum()), dtype=np.int32),
+            [item for itemset in itemsets for item in itemset],
+            np.concatenate(([0], np.cumsum(lengths))),
+        ),
+        shape=(len(itemsets), matrix.shape[1]),
+    )
+    hits = (matrix @ incidence.T).tocoo()
+    return np.bincount(hits.col[hits.data == lengths[hits.col]], minlength=len(itemsets))
+
+
+def _count_with_bitsets(matrix, itemsets):
+    """
+    Same as `_count` for a boolean `matrix` and many itemsets: the rows of each item
+    involved are packed into a bitset and each itemset is counted by intersecting the
+    bitsets of its items.
+    """
+    counts = np.zeros(len(itemsets), dtype=np.int64)
+    if not itemsets:
+        return counts
+    involved = np.unique(np.fromiter((item for itemset in itemsets for item in itemset), dtype=np.int64))
+    local = np.zeros(matrix.shape[1], dtype=np.int64)
+    local[involved] = np.arange(len(involved))
+    columns = matrix.tocsc()
+    bitsets = np.concatenate([
+        np.packbits(columns[:, involved[start : start + BITSET_CHUNK]].toarray().T.astype(bool), axis=1)
+        for start in range(0, len(involved), BITSET_CHUNK)
+    ])
+    by_length = {}
+    for position, itemset in enumerate(itemsets):
+        by_length.setdefault(len(itemset), []).append(position)
+    for group in by_length.values():
+        positions = np.array(group)
+        members = local[np.array([itemsets[position] for position in positions])]
+        for start in range(0, len(positions), BITSET_CHUNK):
+            joined = bitsets[members[start : start + BITSET_CHUNK, 0]]
+            for column in range(1, members.shape[1]):
+                joined &= bitsets[members[start : start + BITSET_CHUNK, column]]
+            counts[positions[start : start + BITSET_CHUNK]] = POPCOUNT[joined].sum(axis=1)
+    return counts
+
+
+def _count_by_rarest(matrix, columns, itemsets):
+    """
+    Same as `_count`, for a large `matrix` with few itemsets to count.
+
+    Itemsets are grouped by their rarest item and each group is checked only on the rows
+    that contain that item, read from `columns`, the CSC copy of `matrix`.
+    """
+    counts = np.zeros(len(itemsets), dtype=np.int64)
+    column_sizes = np.diff(columns.indptr)
+    groups = {}
+    for position, itemset in enumerate(itemsets):
+        groups.setdefault(min(itemset, key=column_sizes.__getitem__), []).append(position)
+    for rarest, positions in groups.items():
+        rows = matrix[columns.indices[columns.indptr[rarest] : columns.indptr[rarest + 1]]]
+        counts[positions] = _count(rows, [itemsets[position] for position in positions])
+    return counts
+
+
+def _join(level):
+    """Apriori candidate generation: the (k + 1)-itemsets whose k-subsets are all in `level`."""
+    known = set(level)
+    by_prefix = {}
+    for itemset in sorted(level):
+        by_prefix.setdefault(itemset[:-1], []).append(itemset[-1])
+    candidates = []
+    for prefix, lasts in by_prefix.items():
+        for first, second in combinations(lasts, 2):
+            candidate = (*prefix, first, second)
+            if all(candidate[:i] + candidate[i + 1 :] in known for i in range(len(candidate) - 2)):
+                candidates.append(candidate)
+    return candidates
+
+
+class IncrementalMiner:
+    """
+    Frequent itemsets of a growing transaction log at a fixed minimum support.
+
+    Build it with `from_transactions`, then call `update` with each new batch.
+
+    Parameters:
+        history (EncodedTransactions): Every transaction seen so far.
+        min_support (float): Minimum share of transactions containing an itemset.
+        item_counts (ndarray): Number of transactions containing each item.
+        counts (dict): Exact count of every tracked itemset of two or more items, keyed
+            by the sorted tuple of its item ids. Frequent itemsets are always tracked.
+    """
+
+    def __init__(self, history, min_support, item_counts, counts):
+        self.history = history
+        self.min_support = min_support
+        self.item_counts = item_counts
+        self.counts = counts
+        self.last_update = {}
+
+    @classmethod
+    def from_transactions(cls, transactions, min_support):
+        """Mine `transactions` from scratch and track the frequent itemsets found."""
+        ids = {item: i for i, item in enumerate(transactions.items)}
+        mined = eclat(transactions, min_support)
+        counts = {
+            tuple(sorted(ids[item] for item in itemset)): round(support * transactions.n_transactions)
+            for itemset, support in zip(mined['itemsets'], mined['support'])
+            if len(itemset) > 1
+        }
+        item_counts = np.bincount(transactions.matrix.indices, minlength=len(transactions.items))
+        return cls(transactions, min_support, item_counts, counts)
+
+    @property
+    def n_transactions(self):
+        return self.history.n_transactions
+
+    def _min_count(self, n_transactions):
+        return max(1, math.ceil(self.min_support * n_transactions - 1e-9))
+
+    def update(self, batch):  # noqa: PLR0914
+        """
+        Merge a batch of new transactions into the frequent itemsets.
+
+        Parameters:
+            batch (EncodedTransactions): The appended transactions.
+
+        Returns:
+            IncrementalMiner: `self`, with `last_update` holding the number of
+                'candidates' examined, of 'history_counted' itemsets that needed the
+                history and of 'history_rows' scanned to count them.
+        """
+        combined = self.history.append(batch)
+        # Both parts over the combined vocabulary.
+        n_old = self.history.n_transactions
+        old = EncodedTransactions(combined.matrix[:n_old], combined.items)
+        batch = EncodedTransactions(combined.matrix[n_old:], combined.items)
+        need = self._min_count(combined.n_transactions)
+        batch_need = self._min_count(batch.n_transactions)
+
+        self.item_counts = np.concatenate((
+            self.item_counts,
+            np.zeros(len(combined.items) - len(self.item_counts), dtype=np.int64),
+        )) + np.bincount(batch.matrix.indices, minlength=len(combined.items))
+        old_rows, old_columns = old.matrix.astype(np.int32), old.matrix.tocsc()
+        batch_rows = batch.matrix.astype(np.int32)
+        tracked = list(self.counts)
+        for itemset, count in zip(tracked, _count_with_bitsets(batch.matrix, tracked)):
+            self.counts[itemset] += int(count)
+
+        frequent_items = np.flatnonzero(self.item_counts >= need)
+        # Pairs frequent in the batch; any other frequent pair was already tracked.
+        in_batch = batch_rows[:, frequent_items]
+        pairs = sp.triu((in_batch.T @ in_batch).tocoo(), k=1).tocoo()
+        keep = pairs.data >= batch_need
+        candidates = {
+            (int(frequent_items[a]), int(frequent_items[b])) for a, b in zip(pairs.row[keep], pairs.col[keep])
+        }
+        candidates.update(
+            itemset
+            for itemset in tracked
+            if len(itemset) == PAIR_SIZE and (self.item_counts[list(itemset)] >= need).all()
+        )
+
+        examined = counted = 0
+        while candidates:
+            candidates = sorted(candidates)
+            examined += len(candidates)
+            unknown = [itemset for itemset in candidates if itemset not in self.counts]
+            batch_counts = dict(zip(unknown, _count_with_bitsets(batch.matrix, unknown).tolist()))
+            # Not frequent before and not frequent in the batch: cannot be frequent now.
+            unknown = [itemset for itemset in unknown if batch_counts[itemset] >= batch_need]
+            counted += len(unknown)
+            for itemset, count in zip(unknown, _count_by_rarest(old_rows, old_columns, unknown)):
+                self.counts[itemset] = int(count) + batch_counts[itemset]
+            level = [itemset for itemset in candidates if self.counts.get(itemset, 0) >= need]
+            candidates = set(_join(level))
+
+        self.history = combined
+        self.last_update = {
+            'candidates': examined,
+            'history_counted': counted,
+            'history_rows': n_old if counted else 0,
+        }
+        return self
+
+    def itemsets(self):
+        """
+        The current frequent itemsets.
+
+        Returns:
+            DataFrame: 'support' and 'itemsets' columns, in the format of mlxtend.
+        """
+        need = self._min_count(self.n_transactions)
+        items = np.asarray(self.history.items, dtype=object)
+        frequent_items = np.flatnonzero(self.item_counts >= need)
+        frequent = [((int(item),), int(self.item_counts[item])) for item in frequent_items]
+        frequent += sorted(
+            ((itemset, count) for itemset, count in self.counts.items() if count >= need),
+            key=lambda entry: len(entry[0]),
+        )
+        return pd.DataFrame({
+            'support': [count / self.n_transactions for _, count in frequent],
+            'itemsets': [frozenset(items[list(itemset)]) for itemset, _ in frequent],
+        })
+
+
+def merge_batch(cache, fingerprint, transactions, min_support, batch_fingerprint, batch_source):  # noqa: PLR0913, PLR0917
+    """
+    Merge an uploaded batch into the itemsets of a file, reusing stored miners.
+
+    The miner of the file and the miner after the merge are kept in `cache`, so the file
+    is mined from scratch once per support and the same batch is merged only once. The
+    returned fingerprint can be passed back to append the next batch to the merged log.
+
+    Parameters:
+        cache (DiskCache): Where the miners are stored.
+        fingerprint (str): Fingerprint of the file or merged log the batch is appended to.
+        transactions (EncodedTransactions or None): The encoded baskets of that file; None
+            when `fingerprint` is a merged log, whose miner must then still be stored.
+        min_support (float): Minimum share of transactions containing an itemset.
+        batch_fingerprint (str): Fingerprint of the batch.
+        batch_source: The batch, in any form accepted by `encode_transactions`.
+
+    Returns:
+        tuple: The fingerprint of the appended log and its `IncrementalMiner`.
+    """
+    appended = cache_key('appended', fingerprint, batch_fingerprint)
+    merged = cache.get(cache_key('miner', appended, min_support))
+    if merged is not None:
+        return appended, merged
+    miner = cache.get(cache_key('miner', fingerprint, min_support))
+    if miner is None:
+        if transactions is None:
+            raise ValueError('The merged transactions are no longer stored; upload the full file again.')
+        miner = IncrementalMiner.from_transactions(transactions, min_support)
+        cache.set(cache_key('miner', fingerprint, min_support), miner)
+    merged = miner.update(encode_transactions(batch_source))
+    cache.set(cache_key('miner', appended, min_support), merged)
+    return appended, merged
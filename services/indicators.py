@@ -0,0 +1,210 @@
+"""
+Technical indicators of many tickers at once.
+
+The prices of every ticker are laid out as the columns of one wide matrix indexed by
+date, and each indicator is computed for all of them in a single vectorized pass with
+the rolling and exponentially weighted windows of pandas, instead of once per ticker.
+Windows run over the trading days of each ticker: tickers listed on different calendars,
+or with missing days, are grouped by the days they have prices for, and each group is
+computed on its own rows.
+
+`IndicatorCache` stores the indicators of each ticker under a hash of its prices, the
+requested range and the parameters, so adding a ticker to a comparison only computes the
+new one.
+"""
+
+import numpy as np
+import pandas as pd
+
+from services.cache import CACHE_DIR, DiskCache, cache_key
+
+PRICE_COLUMN = 'Adj Close'
+# Days a pair of tickers needs in common for a correlation.
+MIN_PAIRED_DAYS = 2
+DEFAULT_PARAMS = {
+    'sma_window': 20,
+    'ema_span': 20,
+    'rsi_period': 14,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'bollinger_window': 20,
+    'bollinger_width': 2.0,
+}
+INDICATORS = (
+    'retorno',
+    'mms',
+    'mme',
+    'ifr',
+    'macd',
+    'macd_sinal',
+    'macd_histograma',
+    'bollinger_media',
+    'bollinger_inferior',
+    'bollinger_superior',
+)
+
+
+def price_matrix(prices, column=PRICE_COLUMN):
+    """
+    The `column` of the prices of each ticker, side by side.
+
+    Parameters:
+        prices (dict): The prices of each ticker, as returned by `PriceStore.get_many`.
+        column (str): The price column to use.
+
+    Returns:
+        DataFrame: One column per ticker, indexed by every date any ticker has a price for.
+    """
+    return pd.DataFrame({ticker: frame[column] for ticker, frame in prices.items()}, dtype='float64')
+
+
+def _indicators_of(matrix, params):
+    """Every indicator of `INDICATORS` of the columns of a matrix without missing prices."""
+    returns = matrix.pct_change(fill_method=None)
+
+    delta = matrix.diff()
+    # Wilder's smoothing is an exponential average with alpha = 1 / period.
+    smoothing = {'alpha': 1 / params['rsi_period'], 'adjust': False, 'min_periods': params['rsi_period']}
+    gains = delta.clip(lower=0).ewm(**smoothing).mean()
+    losses = (-delta).clip(lower=0).ewm(**smoothing).mean()
+    rsi = 100 - 100 / (1 + gains / losses)
+
+    fast = matrix.ewm(span=params['macd_fast'], adjust=False).mean()
+    slow = matrix.ewm(span=params['macd_slow'], adjust=False).mean()
+    macd = fast - slow
+    signal = macd.ewm(span=params['macd_signal'], adjust=False).mean()
+
+    window = matrix.rolling(params['bollinger_window'])
+    middle = window.mean()
+    width = params['bollinger_width'] * window.std(ddof=0)
+
+    return {
+        'retorno': returns,
+        'mms': matrix.rolling(params['sma_window']).mean(),
+        'mme': matrix.ewm(span=params['ema_span'], adjust=False).mean(),
+        'ifr': rsi,
+        'macd': macd,
+        'macd_sinal': signal,
+        'macd_histograma': macd - signal,
+        'bollinger_media': middle,
+        'bollinger_inferior': middle - width,
+        'bollinger_superior': middle + width,
+    }
+
+
+def _calendars(matrix):
+    """The columns of `matrix` grouped by the rows they have a price in, as (rows, columns) pairs."""
+    present = matrix.notna().to_numpy()
+    groups = {}
+    for column, mask in enumerate(present.T):
+        if mask.any():
+            groups.setdefault(np.packbits(mask).tobytes(), (mask, []))[1].append(column)
+    return list(groups.values())
+
+
+def compute_indicators(matrix, params=DEFAULT_PARAMS):
+    """
+    Every indicator of every ticker of a price matrix.
+
+    Parameters:
+        matrix (DataFrame): The prices of each ticker, one column per ticker, as from `price_matrix`.
+        params (dict): The windows of the indicators, as in `DEFAULT_PARAMS`.
+
+    Returns:
+        dict: One frame shaped like `matrix` per name of `INDICATORS`, missing where the ticker has no price.
+    """
+    calendars = _calendars(matrix)
+    if len(calendars) == 1 and calendars[0][0].all() and len(calendars[0][1]) == matrix.shape[1]:
+        # Every ticker has a price every day: the usual case needs no regrouping.
+        return _indicators_of(matrix, params)
+    values = np.full((len(INDICATORS), *matrix.shape), np.nan)
+    for rows, columns in calendars:
+        group = matrix.iloc[rows, columns]
+        computed = _indicators_of(group, params)
+        for position, name in enumerate(INDICATORS):
+            values[position][np.ix_(rows, columns)] = computed[name].to_numpy()
+    return {
+        name: pd.DataFrame(values[position], index=matrix.index, columns=matrix.columns)
+        for position, name in enumerate(INDICATORS)
+    }
+
+
+def correlation(returns):
+    """
+    Correlation of the daily returns of each pair of tickers, over the days both have a return.
+
+    The sums of every pair are taken from a few matrix products over the returns, with
+    the missing days zeroed and masked, instead of one pass over the days per pair.
+
+    Parameters:
+        returns (DataFrame): The 'retorno' frame of `compute_indicators`.
+
+    Returns:
+        DataFrame: The correlation matrix, indexed by ticker on both axes.
+    """
+    present = returns.notna().to_numpy().astype(np.float64)
+    values = np.nan_to_num(returns.to_numpy())
+    # Entry (i, j) of each product sums over the days both ticker i and ticker j have a return.
+    count = present.T @ present
+    sums = values.T @ present
+    squares = (values * values).T @ present
+    products = values.T @ values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = count * products - sums * sums.T
+        variances = count * squares - sums * sums
+        result = np.clip(covariance / np.sqrt(variances * variances.T), -1, 1)
+    result[count < MIN_PAIRED_DAYS] = np.nan
+    return pd.DataFrame(result, index=returns.columns, columns=returns.columns)
+
+
+class IndicatorCache:
+    """
+    Indicators stored per ticker, range and parameters.
+
+    Parameters:
+        cache (DiskCache): Where the entries are stored.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def indicators(self, matrix, start, end, params=DEFAULT_PARAMS):
+        """
+        The indicators of `compute_indicators`, computed only for the tickers without a stored entry.
+
+        Parameters:
+            matrix (DataFrame): The prices of each ticker, one column per ticker.
+            start (date): First day of the range the prices were loaded for.
+            end (date): Day after the last day of the range.
+            params (dict): The windows of the indicators, as in `DEFAULT_PARAMS`.
+
+        Returns:
+            dict: One frame shaped like `matrix` per name of `INDICATORS`.
+        """
+        present = matrix.notna().to_numpy()
+        dates = matrix.index.asi8
+        keys = [
+            cache_key('indicators', ticker, str(start), str(end), params, dates[rows], matrix.iloc[rows, column])
+            for column, (ticker, rows) in enumerate(zip(matrix.columns, present.T))
+        ]
+        # Each entry holds the indicators of the days the ticker has a price, one row per day.
+        entries = [self.cache.get(key) for key in keys]
+        missing = [column for column, entry in enumerate(entries) if entry is None]
+        if missing:
+            computed = compute_indicators(matrix.iloc[:, missing], params)
+            stacked = np.stack([computed[name].to_numpy() for name in INDICATORS], axis=-1)
+            for position, column in enumerate(missing):
+                entries[column] = stacked[present[:, column], position]
+            self.cache.set_many((keys[column], entries[column]) for column in missing)
+
+        values = np.full((len(INDICATORS), *matrix.shape), np.nan)
+        for column, entry in enumerate(entries):
+            values[:, present[:, column], column] = entry.T
+        return {
+            name: pd.DataFrame(values[position], index=matrix.index, columns=matrix.columns)
+            for position, name in enumerate(INDICATORS)
+        }
+
+
+indicator_cache = IndicatorCache(DiskCache(CACHE_DIR / 'indicators'))
@@ -0,0 +1,225 @@
+"""
+Frequent itemset mining engines for the retail recommender.
+
+Every engine takes the sparse baskets of `services.transactions` and returns the
+DataFrame produced by mlxtend, with a 'support' column and an 'itemsets' column of
+frozensets of item names, so its output feeds `association_rules` unchanged.
+
+Apriori and FP-Growth come from mlxtend. Eclat is implemented here on vertical bitsets:
+the pairs are counted at once with a sparse co-occurrence product, and each item's
+extensions are then mined depth first over bitsets restricted to the transactions that
+contain the item, so the bitsets stay as small as the item is rare.
+
+`MiningCache` keeps the encoded baskets, the mined itemsets and the rule indexes of each
+file on disk, so changing only the rule thresholds does not parse or mine the file again,
+and the baskets of the last files in memory, so it does not unpickle them either.
+"""
+
+import hashlib
+import io
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from services.cache import CACHE_DIR, DiskCache, cache_key
+from services.rule_index import RuleIndex
+from services.transactions import encode_transactions
+
+ENGINES = {'eclat': 'Eclat', 'fpgrowth': 'FP-Growth', 'apriori': 'Apriori'}
+# Files whose encoded baskets stay decoded in memory.
+MEMORY_ENTRIES = 4
+# Number of items of a pair, the itemsets counted from the co-occurrence matrix.
+PAIR_SIZE = 2
+# Number of set bits of every byte value.
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.int64)
+
+
+def _min_count(min_support, n_transactions):
+    return max(1, math.ceil(min_support * n_transactions - 1e-9))
+
+
+def _eclat_extend(prefix, items, bitsets, min_count, max_len, found):  # noqa: PLR0913, PLR0917
+    """Depth-first search of the equivalence class of `prefix`, whose members are `items`."""
+    for position in range(len(items) - 1):
+        if max_len is not None and len(prefix) + 2 > max_len:
+            return
+        joined = bitsets[position + 1 :] & bitsets[position]
+        joined_counts = POPCOUNT[joined].sum(axis=1)
+        keep = np.flatnonzero(joined_counts >= min_count)
+        if not len(keep):
+            continue
+        itemset = (*prefix, items[position])
+        extensions = [items[position + 1 + k] for k in keep]
+        found.extend(((*itemset, item), int(count)) for item, count in zip(extensions, joined_counts[keep]))
+        _eclat_extend(itemset, extensions, joined[keep], min_count, max_len, found)
+
+
+def eclat(transactions, min_support, max_len=None):  # noqa: PLR0914
+    """
+    Mine frequent itemsets with Eclat on vertical bitsets.
+
+    Parameters:
+        transactions (EncodedTransactions): The encoded baskets.
+        min_support (float): Minimum share of transactions containing an itemset.
+        max_len (int, optional): Largest itemset size to mine.
+
+    Returns:
+        DataFrame: 'support' and 'itemsets' columns, in the format of mlxtend.
+    """
+    n_transactions = transactions.n_transactions
+    min_count = _min_count(min_support, n_transactions)
+    matrix = transactions.matrix
+    item_counts = np.bincount(matrix.indices, minlength=len(transactions.items))
+    # Visit rare items first: their classes are small and hold the fewest transactions.
+    order = np.flatnonzero(item_counts >= min_count)
+    order = order[np.argsort(item_counts[order], kind='stable')]
+    matrix = matrix[:, order].tocsr()
+    columns = matrix.tocsc()
+
+    found = [((item,), int(item_counts[column])) for item, column in enumerate(order)]
+    if max_len is None or max_len > 1:
+        ones = matrix.astype(np.int32)
+        pairs = (ones.T @ ones).tocsr()
+        for item in range(len(order)):
+            start, end = pairs.indptr[item], pairs.indptr[item + 1]
+            partners, pair_counts = pairs.indices[start:end], pairs.data[start:end]
+            keep = (partners > item) & (pair_counts >= min_count)
+            if not keep.any():
+                continue
+            partners, pair_counts = partners[keep], pair_counts[keep]
+            rank = np.argsort(partners)
+            partners, pair_counts = partners[rank], pair_counts[rank]
+            found.extend(((item, int(partner)), int(count)) for partner, count in zip(partners, pair_counts))
+            if max_len is not None and max_len <= PAIR_SIZE:
+                continue
+
+            # Bitsets of the partners over the transactions that contain `item`.
+            rows = columns.indices[columns.indptr[item] : columns.indptr[item + 1]]
+            projected = matrix[rows][:, partners].tocsc()
+            bitsets = np.zeros((len(partners), (len(rows) + 7) // 8), dtype=np.uint8)
+            for k in range(len(partners)):
+                present = np.zeros(len(rows), dtype=bool)
+                present[projected.indices[projected.indptr[k] : projected.indptr[k + 1]]] = True
+                bitsets[k] = np.packbits(present)
+            _eclat_extend((item,), partners.tolist(), bitsets, min_count, max_len, found)
+
+    found.sort(key=lambda entry: len(entry[0]))
+    names = np.asarray(transactions.items, dtype=object)[order]
+    return pd.DataFrame({
+        'support': [count / n_transactions for _, count in found],
+        'itemsets': [frozenset(names[list(itemset)]) for itemset, _ in found],
+    })
+
+
+def frequent_itemsets(transactions, min_support, engine='eclat', max_len=None):
+    """
+    Mine the frequent itemsets of the baskets with the chosen engine.
+
+    Items whose own support is below `min_support` are dropped before mining, which
+    gives the same result with fewer columns.
+
+    Parameters:
+        transactions (EncodedTransactions): The encoded baskets.
+        min_support (float): Minimum share of transactions containing an itemset.
+        engine (str): One of the keys of `ENGINES`.
+        max_len (int, optional): Largest itemset size to mine.
+
+    Returns:
+        DataFrame: 'support' and 'itemsets' columns, the input of `association_rules`.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine {engine!r}; expected one of {", ".join(ENGINES)}')
+    if engine == 'eclat':
+        return eclat(transactions, min_support, max_len)
+    from mlxtend.frequent_patterns import apriori, fpgrowth  # noqa: PLC0415
+
+    miner = fpgrowth if engine == 'fpgrowth' else apriori
+    return miner(
+        transactions.prune(min_support).to_frame(), min_support=min_support, use_colnames=True, max_len=max_len
+    )
+
+
+def file_fingerprint(upload):
+    """SHA-256 of the contents of an uploaded file."""
+    return hashlib.sha256(upload.getvalue()).hexdigest()
+
+
+class MiningCache:
+    """
+    Encoded baskets and frequent itemsets stored per file fingerprint.
+
+    Itemsets mined at a support s hold every itemset of any support above s, so a request
+    at a higher support is answered by filtering the closest run below it.
+
+    Parameters:
+        cache (DiskCache): Where the entries are stored.
+        memory_entries (int): Number of files whose baskets are also kept decoded in memory.
+    """
+
+    def __init__(self, cache, memory_entries=MEMORY_ENTRIES):
+        self.cache = cache
+        self.memory_entries = memory_entries
+        self._decoded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def transactions(self, fingerprint, source):
+        """
+        The encoded baskets of the file, encoding `source` on a miss.
+
+        The baskets of the last `memory_entries` files are answered from memory, so a rerun
+        that only changes the thresholds does not read and unpickle the matrix again.
+        """
+        with self._lock:
+            if fingerprint in self._decoded:
+                self._decoded.move_to_end(fingerprint)
+                return self._decoded[fingerprint]
+        transactions = self.cache.get_or_set(
+            cache_key('transactions', fingerprint), lambda: encode_transactions(source)
+        )
+        with self._lock:
+            self._decoded[fingerprint] = transactions
+            while len(self._decoded) > self.memory_entries:
+                self._decoded.popitem(last=False)
+        return transactions
+
+    def itemsets(self, fingerprint, transactions, min_support, engine='eclat'):
+        """
+        The frequent itemsets of the file at `min_support`, mined only when no run at an
+        equal or lower support is stored.
+
+        Every engine finds the same itemsets, so runs are shared across engines.
+        """
+        index_key = cache_key('supports', fingerprint)
+        supports = self.cache.get(index_key, [])
+        for support in sorted((s for s in supports if s <= min_support), reverse=True):
+            mined = self.cache.get(cache_key('itemsets', fingerprint, support))
+            if mined is not None:
+                return mined[mined['support'] >= min_support].reset_index(drop=True)
+
+        mined = frequent_itemsets(transactions, min_support, engine)
+        self.cache.set(cache_key('itemsets', fingerprint, min_support), mined)
+        self.cache.set(index_key, sorted({*supports, min_support}))
+        return mined
+
+    def rule_index(self, fingerprint, thresholds, rules):
+        """
+        The `RuleIndex` of `rules`, built once per file and rule thresholds.
+
+        The index is stored in the `.npz` form of `RuleIndex.save`, whose plain arrays load
+        faster than a pickle of the index.
+        """
+
+        def build():
+            buffer = io.BytesIO()
+            RuleIndex.from_rules(rules).save(buffer)
+            return buffer.getvalue()
+
+        return RuleIndex.load(
+            io.BytesIO(self.cache.get_or_set(cache_key('rule_index', fingerprint, thresholds), build))
+        )
+
+
+mining_cache = MiningCache(DiskCache(CACHE_DIR / 'itemsets'))
@@ -0,0 +1,190 @@
+"""
+Exact two-constraint (weight and volume) knapsack solver for cargo selection.
+
+Depth-first branch-and-bound over the items sorted by surrogate efficiency. Each node is
+bounded by the LP relaxation of a surrogate knapsack, where weight and volume are
+combined with the multiplier that gives the tightest bound at the root. The search
+stops at a time budget and then reports the best load found and its optimality gap.
+"""
+
+from bisect import bisect_right
+from time import perf_counter
+
+import numpy as np
+
+from services.cargo import item_arrays
+
+SURROGATE_MULTIPLIERS = np.linspace(0.0, 1.0, 21)
+TIME_CHECK_INTERVAL = 1024
+EPSILON = 1e-9
+
+
+def _surrogate_weights(weights, volumes, max_weight, max_volume, multiplier):
+    return multiplier * weights / max_weight + (1 - multiplier) * volumes / max_volume
+
+
+def _fractional_bound(order_values, order_sizes, prefix_values, prefix_sizes, start, capacity):  # noqa: PLR0913, PLR0917
+    """Dantzig bound of the items `start:` (already sorted by efficiency) for a capacity."""
+    end = bisect_right(prefix_sizes, prefix_sizes[start] + capacity + EPSILON) - 1
+    bound = prefix_values[end] - prefix_values[start]
+    if end < len(order_values):
+        remaining = capacity - (prefix_sizes[end] - prefix_sizes[start])
+        bound += max(remaining, 0.0) * order_values[end] / order_sizes[end]
+    return bound
+
+
+def _surrogate_order(weights, volumes, values, candidates, max_weight, max_volume):  # noqa: PLR0913, PLR0917
+    """
+    Sort the candidate items by surrogate efficiency.
+
+    The multiplier that yields the tightest root bound is kept; with it the surrogate
+    capacity of the whole knapsack is 1.
+
+    Returns:
+        tuple: The multiplier, the sorted item indexes, their surrogate sizes and the
+            prefix sums of values and sizes in that order.
+    """
+    best = None
+    for multiplier in SURROGATE_MULTIPLIERS:
+        sizes = np.maximum(
+            _surrogate_weights(weights[candidates], volumes[candidates], max_weight, max_volume, multiplier),
+            EPSILON,
+        )
+        order = np.argsort(-values[candidates] / sizes, kind='stable')
+        sorted_values = values[candidates][order].tolist()
+        sorted_sizes = sizes[order].tolist()
+        prefix_values = np.concatenate(([0.0], np.cumsum(sorted_values))).tolist()
+        prefix_sizes = np.concatenate(([0.0], np.cumsum(sorted_sizes))).tolist()
+        root = _fractional_bound(sorted_values, sorted_sizes, prefix_values, prefix_sizes, 0, 1.0)
+        if best is None or root < best[0]:
+            best = (root, multiplier, candidates[order], sorted_sizes, prefix_values, prefix_sizes)
+    return best[1:]
+
+
+def solve_knapsack(weights, volumes, values, max_weight, max_volume, time_budget=10.0):  # noqa: PLR0913, PLR0914, PLR0917
+    """
+    Select items maximizing total value under weight and volume limits.
+
+    Parameters:
+        weights (array-like): Weight of each item.
+        volumes (array-like): Volume of each item.
+        values (array-like): Value of each item.
+        max_weight (float): Maximum allowable weight for the selected items.
+        max_volume (float): Maximum allowable volume for the selected items.
+        time_budget (float): Seconds after which the search stops and returns the best load so far.
+
+    Returns:
+        dict: Solver output with the keys
+            - 'variable' (ndarray): 0/1 selection in the original item order.
+            - 'value' (float): Total value of the selection.
+            - 'bound' (float): Proven upper bound on the optimal value.
+            - 'gap' (float): Relative optimality gap, (bound - value) / bound.
+            - 'optimal' (bool): Whether the search finished within the budget.
+            - 'elapsed' (float): Total search time in seconds.
+            - 'time_to_best' (float): Seconds until the returned selection was found.
+            - 'nodes' (int): Number of explored branch-and-bound nodes.
+    """
+    start_time = perf_counter()
+    weights = np.asarray(weights, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    integral = bool(np.all(values == np.round(values)))
+    selection = np.zeros(len(values))
+
+    candidates = np.flatnonzero((weights <= max_weight) & (volumes <= max_volume) & (values > 0))
+    if len(candidates) == 0 or max_weight <= 0 or max_volume <= 0:
+        return {
+            'variable': selection,
+            'value': 0.0,
+            'bound': 0.0,
+            'gap': 0.0,
+            'optimal': True,
+            'elapsed': perf_counter() - start_time,
+            'time_to_best': 0.0,
+            'nodes': 0,
+        }
+
+    multiplier, items, item_sizes, prefix_values, prefix_sizes = _surrogate_order(
+        weights, volumes, values, candidates, max_weight, max_volume
+    )
+    item_weights = weights[items].tolist()
+    item_volumes = volumes[items].tolist()
+    item_values = values[items].tolist()
+    n_items = len(items)
+
+    def node_bound(depth, weight_left, volume_left, value):
+        capacity = multiplier * weight_left / max_weight + (1 - multiplier) * volume_left / max_volume
+        bound = value + _fractional_bound(item_values, item_sizes, prefix_values, prefix_sizes, depth, capacity)
+        return np.floor(bound + EPSILON) if integral else bound
+
+    # Greedy incumbent in efficiency order.
+    best_value, best_path = 0.0, None
+    weight_left, volume_left = max_weight, max_volume
+    for position in range(n_items):
+        if item_weights[position] <= weight_left and item_volumes[position] <= volume_left:
+            weight_left -= item_weights[position]
+            volume_left -= item_volumes[position]
+            best_value += item_values[position]
+            best_path = (position, best_path)
+    time_to_best = perf_counter() - start_time
+
+    stack = [(0, max_weight, max_volume, 0.0, None)]
+    nodes = 0
+    timed_out = False
+    while stack:
+        nodes += 1
+        if nodes % TIME_CHECK_INTERVAL == 0 and perf_counter() - start_time > time_budget:
+            timed_out = True
+            break
+
+        depth, weight_left, volume_left, value, path = stack.pop()
+        if value > best_value:
+            best_value, best_path = value, path
+            time_to_best = perf_counter() - start_time
+        if depth == n_items or node_bound(depth, weight_left, volume_left, value) <= best_value + EPSILON:
+            continue
+
+        stack.append((depth + 1, weight_left, volume_left, value, path))
+        if item_weights[depth] <= weight_left and item_volumes[depth] <= volume_left:
+            stack.append((
+                depth + 1,
+                weight_left - item_weights[depth],
+                volume_left - item_volumes[depth],
+                value + item_values[depth],
+                (depth, path),
+            ))
+
+    # Every load better than the incumbent lies below one of the unexplored nodes.
+    bound = max([best_value, *(node_bound(*node[:4]) for node in stack)]) if timed_out else best_value
+
+    while best_path is not None:
+        position, best_path = best_path
+        selection[items[position]] = 1.0
+
+    return {
+        'variable': selection,
+        'value': float(best_value),
+        'bound': float(bound),
+        'gap': float((bound - best_value) / bound) if bound > 0 else 0.0,
+        'optimal': not timed_out,
+        'elapsed': perf_counter() - start_time,
+        'time_to_best': time_to_best,
+        'nodes': nodes,
+    }
+
+
+def solve_cargo(data, max_volume, max_weight, time_budget=10.0):
+    """
+    Run `solve_knapsack` on a cargo manifest.
+
+    Parameters:
+        data (DataFrame): Item details with columns 'PESO', 'VOLUME' and 'VALOR'.
+        max_volume (float): Maximum allowable volume for the selected items.
+        max_weight (float): Maximum allowable weight for the selected items.
+        time_budget (float): Seconds after which the best load so far is returned.
+
+    Returns:
+        dict: The solver output described in `solve_knapsack`.
+    """
+    items = item_arrays(data)
+    return solve_knapsack(items[:, 0], items[:, 1], items[:, 2], max_weight, max_volume, time_budget)
@@ -0,0 +1,210 @@
+"""
+Registry of fitted models shared by every session and process.
+
+A model is identified by a name, a hash of its training data and its hyperparameters.
+Each fitted model is written with joblib next to a JSON file with its metadata: the data
+hash, the parameters, its metrics, how long the fit took and the versions of the
+libraries that produced it. Models are kept in memory once loaded, so a model is fitted
+once per data and parameters instead of once per process, rerun or click, and `warm`
+loads the newest model of every name when the server starts. Both the models in memory
+and the files on disk are bounded, and the least recently used ones are evicted first,
+as in `DiskCache`.
+
+Pickled models are not portable across library versions, so a stored model saved by
+other versions is fitted again.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from importlib import metadata as package_metadata
+from pathlib import Path
+from time import perf_counter
+
+from services.cache import CACHE_DIR, cache_key
+
+LIBRARIES = ('numpy', 'pandas', 'scikit-learn', 'statsmodels')
+MODEL_SUFFIX = '.joblib'
+METADATA_SUFFIX = '.json'
+MEMORY_MODELS = 16
+DEFAULT_MAX_BYTES = 1024**3
+
+
+def library_versions():
+    """Installed version of each of `LIBRARIES`, None for the missing ones."""
+    versions = {}
+    for library in LIBRARIES:
+        try:
+            versions[library] = package_metadata.version(library)
+        except package_metadata.PackageNotFoundError:
+            versions[library] = None
+    return versions
+
+
+class ModelRegistry:
+    """
+    Fitted models stored on disk with their metadata and kept in memory once loaded.
+
+    Parameters:
+        directory (str or Path): Where the models are stored, one subdirectory per name.
+        max_models (int): Models kept in memory.
+        max_bytes (int): Total size of the stored files above which the least recently used models are removed.
+    """
+
+    def __init__(self, directory=CACHE_DIR / 'models', max_models=MEMORY_MODELS, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.fits = 0
+        self.loads = {'memory': 0, 'disk': 0}
+        self._models = OrderedDict()
+        self._fitting = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name, key, suffix):
+        return self.directory / name / f'{key}{suffix}'
+
+    def _read(self, name, key):
+        """The stored model and metadata, or None when missing or saved by other library versions."""
+        import joblib  # noqa: PLC0415
+
+        try:
+            metadata = json.loads(self._path(name, key, METADATA_SUFFIX).read_text())
+            if metadata['versions'] != library_versions():
+                return None
+            model = joblib.load(self._path(name, key, MODEL_SUFFIX))
+            # Reading a model refreshes its place in the eviction order.
+            os.utime(self._path(name, key, METADATA_SUFFIX))
+        except (FileNotFoundError, KeyError, ValueError, EOFError, AttributeError, ImportError):
+            return None
+        return model, metadata
+
+    def _write(self, name, key, model, metadata):
+        import joblib  # noqa: PLC0415
+
+        directory = self.directory / name
+        directory.mkdir(parents=True, exist_ok=True)
+        # The model goes first and each file replaces the old one at once, so a reader
+        # that finds the metadata also finds a complete model.
+        for suffix, write in (
+            (MODEL_SUFFIX, lambda file: joblib.dump(model, file)),
+            (METADATA_SUFFIX, lambda file: file.write(json.dumps(metadata, default=str, indent=2).encode())),
+        ):
+            with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as file:
+                write(file)
+            os.replace(file.name, self._path(name, key, suffix))
+        self.evict()
+
+    def _remember(self, name, key, entry):
+        """Keep a model in memory, dropping the least recently used ones beyond `max_models`."""
+        with self._lock:
+            self._models[(name, key)] = entry
+            self._models.move_to_end((name, key))
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+    def evict(self):
+        """Remove the least recently used stored models until the files fit in `max_bytes`."""
+        stored = []
+        for path in self.directory.glob(f'*/*{METADATA_SUFFIX}'):
+            model_path = path.with_suffix(MODEL_SUFFIX)
+            try:
+                stored.append((path.stat().st_mtime, path.stat().st_size + model_path.stat().st_size, path))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in stored)
+        for _, size, path in sorted(stored):
+            if total <= self.max_bytes:
+                break
+            # The metadata goes first, so readers never find it without its model.
+            path.unlink(missing_ok=True)
+            path.with_suffix(MODEL_SUFFIX).unlink(missing_ok=True)
+            total -= size
+
+    def get_or_fit(self, name, data_hash, params, fit):
+        """
+        The model of `name` for the given data and parameters, fitting it only when no
+        stored model matches.
+
+        Concurrent requests for the same model wait for a single fit.
+
+        Parameters:
+            name (str): The model family, such as 'franchise'.
+            data_hash (str): A hash of the training data, such as a dataset version.
+            params (dict): The hyperparameters; any value `cache_key` can hash.
+            fit (callable): Called without arguments on a miss; returns the fitted model and a dict of metrics.
+
+        Returns:
+            tuple: The model and its metadata dict.
+        """
+        key = cache_key(name, data_hash, params)
+        with self._lock:
+            entry = self._models.get((name, key))
+            if entry is not None:
+                self._models.move_to_end((name, key))
+                self.loads['memory'] += 1
+                return entry
+            fitting = self._fitting.setdefault((name, key), threading.Lock())
+
+        try:
+            with fitting:
+                with self._lock:
+                    entry = self._models.get((name, key))
+                if entry is None:
+                    entry = self._read(name, key)
+                    if entry is not None:
+                        self.loads['disk'] += 1
+                    else:
+                        entry = self._fit(name, key, data_hash, params, fit)
+                    self._remember(name, key, entry)
+        finally:
+            with self._lock:
+                self._fitting.pop((name, key), None)
+        return entry
+
+    def _fit(self, name, key, data_hash, params, fit):
+        start = perf_counter()
+        model, metrics = fit()
+        metadata = {
+            'name': name,
+            'key': key,
+            'data_hash': data_hash,
+            'params': params,
+            'metrics': metrics,
+            'fit_time': perf_counter() - start,
+            'fitted_at': datetime.now(timezone.utc).isoformat(),
+            'versions': library_versions(),
+        }
+        self._write(name, key, model, metadata)
+        self.fits += 1
+        return model, json.loads(json.dumps(metadata, default=str))
+
+    def warm(self):
+        """
+        Load the most recently fitted model of every name into memory.
+
+        Returns:
+            list of str: The names whose model was loaded.
+        """
+        warmed = []
+        for directory in sorted(path for path in self.directory.glob('*') if path.is_dir()):
+            entries = []
+            for path in directory.glob(f'*{METADATA_SUFFIX}'):
+                try:
+                    entries.append((json.loads(path.read_text())['fitted_at'], path.stem))
+                except (FileNotFoundError, KeyError, ValueError):
+                    continue
+            if not entries:
+                continue
+            key = max(entries)[1]
+            entry = self._read(directory.name, key)
+            if entry is not None:
+                self._remember(directory.name, key, entry)
+                warmed.append(directory.name)
+        return warmed
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,353 @@
+"""
+Normality tests of a numeric column of any size, read one chunk at a time.
+
+A single pass over the file keeps three summaries whose size does not depend on the
+number of rows:
+
+- `StreamingMoments`, the count, mean and central moments up to the fourth, merged chunk
+  by chunk with the pairwise update of Pébay, so D'Agostino-Pearson and Jarque-Bera run
+  on the full data;
+- `StreamingHistogram`, a fixed number of bins whose width doubles when a value falls
+  outside them, so the counts stay exact without knowing the range in advance;
+- `Reservoir`, a uniform random sample of fixed size, on which Shapiro-Wilk,
+  Anderson-Darling and Kolmogorov-Smirnov run. Shapiro-Wilk is not meaningful above
+  5000 points, the default sample size;
+- a `KLLSketch` of the quantiles, from which `qq_points` draws the QQ plot of the full
+  data with a fixed number of points.
+
+When the file has no more rows than the sample, the sample is the full data and every
+test runs on all of it. Files with fewer than `MIN_MOMENT_VALUES` values, too few for
+D'Agostino-Pearson, are only tested on the sample, which then holds every value.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from services.sketches import KLLSketch
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_SAMPLE_SIZE = 5000
+DEFAULT_BINS = 64
+SHAPIRO_MAX_SIZE = 5000
+DEFAULT_QQ_POINTS = 400
+# Shapiro-Wilk needs 3 values, and the kurtosis test of D'Agostino-Pearson needs 8.
+MIN_VALUES = 3
+MIN_MOMENT_VALUES = 8
+FULL_DATA = 'dados completos'
+SAMPLE = 'amostra'
+
+
+class TooFewValuesError(ValueError):
+    """Raised by `stream_normality` when the column has fewer than `MIN_VALUES` valid values."""
+
+    def __init__(self, n):
+        super().__init__(f'At least {MIN_VALUES} valid values are needed to test normality; the column has {n}')
+        self.n = n
+
+
+class StreamingMoments:
+    """Count, minimum, maximum, mean and central moment sums of the values seen."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values):
+        """Add a chunk of values, without missing ones."""
+        n_b = len(values)
+        if not n_b:
+            return self
+        mean_b = values.mean()
+        centered = values - mean_b
+        squares = centered * centered
+        m2_b, m3_b, m4_b = squares.sum(), (squares * centered).sum(), (squares * squares).sum()
+        n_a, n = self.n, self.n + n_b
+        delta = mean_b - self.mean
+        # Pébay's formulas merge the central moment sums of the two parts exactly.
+        self.m4 += (
+            m4_b
+            + delta**4 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b) / n**3
+            + 6 * delta**2 * (n_a * n_a * m2_b + n_b * n_b * self.m2) / n**2
+            + 4 * delta * (n_a * m3_b - n_b * self.m3) / n
+        )
+        self.m3 += m3_b + delta**3 * n_a * n_b * (n_a - n_b) / n**2 + 3 * delta * (n_a * m2_b - n_b * self.m2) / n
+        self.m2 += m2_b + delta**2 * n_a * n_b / n
+        self.mean += delta * n_b / n
+        self.n = n
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        return self
+
+    @property
+    def std(self):
+        """Sample standard deviation, with n - 1 degrees of freedom."""
+        return math.sqrt(self.m2 / (self.n - 1))
+
+    @property
+    def skewness(self):
+        """Biased sample skewness, as `scipy.stats.skew`."""
+        return math.sqrt(self.n) * self.m3 / self.m2**1.5
+
+    @property
+    def kurtosis(self):
+        """Biased Pearson kurtosis (3 for a normal distribution), as `scipy.stats.kurtosis(fisher=False)`."""
+        return self.n * self.m4 / (self.m2 * self.m2)
+
+
+class StreamingHistogram:
+    """
+    Exact counts of the values in a fixed number of equal bins.
+
+    Bin i holds the values v with floor((v - origin) / width) == first + i, where
+    `origin` is the smallest value of the first chunk. When a value falls outside the
+    bins, the width doubles and pairs of neighbouring bins merge; doubling the width
+    halves the bin index of every value exactly, so no count is estimated and the
+    counts equal the ones of a single pass with the final bins.
+
+    Parameters:
+        n_bins (int): Number of bins, even.
+    """
+
+    def __init__(self, n_bins=DEFAULT_BINS):
+        if n_bins <= 0 or n_bins % 2:
+            raise ValueError('The number of bins must be even')
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.origin = self.width = None
+        self.first = 0
+
+    @property
+    def edges(self):
+        return self.origin + (self.first + np.arange(len(self.counts) + 1)) * self.width
+
+    def _double(self, towards_low):
+        n_bins = len(self.counts)
+        if towards_low:
+            # The old bins end up at the top of the new range.
+            first = (self.first + n_bins - 1) // 2 - n_bins + 1
+        else:
+            first = self.first // 2
+        merged = np.zeros_like(self.counts)
+        np.add.at(merged, (self.first + np.arange(n_bins)) // 2 - first, self.counts)
+        self.counts, self.first, self.width = merged, first, self.width * 2
+
+    def update(self, values):
+        """Add a chunk of values, without missing ones."""
+        if not len(values):
+            return self
+        n_bins = len(self.counts)
+        if self.origin is None:
+            self.origin = float(values.min())
+            self.width = (float(values.max()) - self.origin) / (n_bins - 1) or 1.0
+        bins = np.floor((values - self.origin) / self.width).astype(np.int64)
+        while bins.min() < self.first or bins.max() >= self.first + n_bins:
+            self._double(towards_low=bins.min() < self.first)
+            bins //= 2
+        self.counts += np.bincount(bins - self.first, minlength=n_bins)
+        return self
+
+
+class Reservoir:
+    """
+    A uniform random sample of at most `size` of the values seen (Vitter's algorithm R).
+
+    Parameters:
+        size (int): Size of the sample.
+        seed (int): Seed of the random generator.
+    """
+
+    def __init__(self, size=DEFAULT_SAMPLE_SIZE, seed=0):
+        self.size = size
+        self.seen = 0
+        self.values = np.empty(size)
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def sample(self):
+        return self.values[: min(self.seen, self.size)]
+
+    def update(self, values):
+        """Add a chunk of values."""
+        free = max(0, min(self.size - self.seen, len(values)))
+        self.values[self.seen : self.seen + free] = values[:free]
+        rest = values[free:]
+        if len(rest):
+            # Value i of the stream replaces a random slot with probability size / (i + 1).
+            seen = np.arange(self.seen + free, self.seen + len(values)) + 1
+            slots = self.rng.integers(0, seen)
+            chosen = slots < self.size
+            slots, rest = slots[chosen], rest[chosen]
+            # A slot drawn several times keeps the latest of its values, as in the sequential algorithm;
+            # fancy assignment does not say which of the repeated indices wins.
+            _, last_from_end = np.unique(slots[::-1], return_index=True)
+            latest = len(slots) - 1 - last_from_end
+            self.values[slots[latest]] = rest[latest]
+        self.seen += len(values)
+        return self
+
+
+def dagostino_pearson(moments):  # noqa: PLR0914
+    """
+    D'Agostino-Pearson K² test of the full data, from its skewness and kurtosis.
+
+    The statistics are the ones of `scipy.stats.skewtest` and `scipy.stats.kurtosistest`.
+
+    Returns:
+        tuple: The K² statistic and its p-value.
+    """
+    from scipy.stats import chi2  # noqa: PLC0415
+
+    n = moments.n
+    y = moments.skewness * math.sqrt((n + 1) * (n + 3) / (6.0 * (n - 2)))
+    beta2 = 3.0 * (n * n + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+    w2 = -1 + math.sqrt(2 * (beta2 - 1))
+    delta = 1 / math.sqrt(0.5 * math.log(w2))
+    alpha = math.sqrt(2.0 / (w2 - 1))
+    y = y or 1.0
+    z_skew = delta * math.log(y / alpha + math.sqrt((y / alpha) ** 2 + 1))
+
+    expected = 3.0 * (n - 1) / (n + 1)
+    variance = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+    x = (moments.kurtosis - expected) / math.sqrt(variance)
+    sqrt_beta1 = (
+        6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9)) * math.sqrt(6.0 * (n + 3) * (n + 5) / (n * (n - 2) * (n - 3)))
+    )
+    a = 6.0 + 8.0 / sqrt_beta1 * (2.0 / sqrt_beta1 + math.sqrt(1 + 4.0 / sqrt_beta1**2))
+    denominator = 1 + x * math.sqrt(2 / (a - 4.0))
+    if denominator == 0:
+        return math.nan, math.nan
+    term = math.copysign(((1 - 2.0 / a) / abs(denominator)) ** (1 / 3.0), denominator)
+    z_kurtosis = (1 - 2 / (9.0 * a) - term) / math.sqrt(2 / (9.0 * a))
+
+    statistic = z_skew**2 + z_kurtosis**2
+    return statistic, float(chi2.sf(statistic, 2))
+
+
+def jarque_bera(moments):
+    """Jarque-Bera test of the full data; returns the statistic and its p-value."""
+    from scipy.stats import chi2  # noqa: PLC0415
+
+    statistic = moments.n / 6 * (moments.skewness**2 + (moments.kurtosis - 3) ** 2 / 4)
+    return statistic, float(chi2.sf(statistic, 2))
+
+
+def anderson_darling(sample):
+    """
+    Anderson-Darling test of a sample against the normal distribution with estimated parameters.
+
+    The p-value is the approximation of D'Agostino and Stephens (1986) for the adjusted statistic.
+    """
+    from scipy.stats import norm  # noqa: PLC0415
+
+    n = len(sample)
+    standardized = np.sort((sample - sample.mean()) / sample.std(ddof=1))
+    weights = 2 * np.arange(1, n + 1) - 1
+    statistic = float(-n - (weights * (norm.logcdf(standardized) + norm.logsf(standardized[::-1]))).sum() / n)
+    adjusted = statistic * (1 + 0.75 / n + 2.25 / n**2)
+    # The breakpoints and coefficients are the ones of the published approximation.
+    if adjusted >= 0.6:  # noqa: PLR2004
+        pvalue = math.exp(1.2937 - 5.709 * adjusted + 0.0186 * adjusted**2)
+    elif adjusted >= 0.34:  # noqa: PLR2004
+        pvalue = math.exp(0.9177 - 4.279 * adjusted - 1.38 * adjusted**2)
+    elif adjusted > 0.2:  # noqa: PLR2004
+        pvalue = 1 - math.exp(-8.318 + 42.796 * adjusted - 59.938 * adjusted**2)
+    else:
+        pvalue = 1 - math.exp(-13.436 + 101.14 * adjusted - 223.73 * adjusted**2)
+    return statistic, min(max(pvalue, 0.0), 1.0)
+
+
+def stream_normality(
+    source, chunk_size=DEFAULT_CHUNK_SIZE, sample_size=DEFAULT_SAMPLE_SIZE, n_bins=DEFAULT_BINS, seed=0
+):
+    """
+    Summarize the first column of a CSV file without a header in one pass and test its normality.
+
+    Values that are not numbers are skipped and counted as missing. With fewer than
+    `MIN_MOMENT_VALUES` valid values, only the tests of the sample run.
+
+    Parameters:
+        source: A path or file object of the CSV file.
+        chunk_size (int): Rows read at a time.
+        sample_size (int): Size of the random sample of the sample-based tests.
+        n_bins (int): Number of bins of the histogram, even.
+        seed (int): Seed of the sample.
+
+    Returns:
+        dict: The 'moments' (StreamingMoments), 'histogram' (StreamingHistogram), 'sample'
+            (ndarray), 'sketch' (KLLSketch), number of 'missing' values, and the 'tests', a DataFrame with the
+            'teste', 'estatistica', 'valor_p', 'base' (`FULL_DATA` or `SAMPLE`) and 'n' of each test.
+
+    Raises:
+        TooFewValuesError: When the column has fewer than `MIN_VALUES` valid values.
+    """
+    from scipy import stats  # noqa: PLC0415
+
+    moments, histogram, reservoir = StreamingMoments(), StreamingHistogram(n_bins), Reservoir(sample_size, seed)
+    sketch = KLLSketch(seed=seed)
+    missing = 0
+    for chunk in pd.read_csv(source, header=None, usecols=[0], chunksize=chunk_size):
+        values = pd.to_numeric(chunk.iloc[:, 0], errors='coerce').to_numpy(dtype=np.float64)
+        valid = values[~np.isnan(values)]
+        missing += len(values) - len(valid)
+        moments.update(valid)
+        histogram.update(valid)
+        reservoir.update(valid)
+        sketch.update(valid)
+    if moments.n < MIN_VALUES:
+        raise TooFewValuesError(moments.n)
+
+    sample = reservoir.sample
+    sample_base = FULL_DATA if len(sample) == moments.n else SAMPLE
+    rows = []
+    if moments.n >= MIN_MOMENT_VALUES:
+        rows.extend([
+            ("D'Agostino-Pearson", *dagostino_pearson(moments), FULL_DATA, moments.n),
+            ('Jarque-Bera', *jarque_bera(moments), FULL_DATA, moments.n),
+        ])
+    if len(sample) <= SHAPIRO_MAX_SIZE:
+        rows.append(('Shapiro-Wilk', *stats.shapiro(sample), sample_base, len(sample)))
+    rows.append(('Anderson-Darling', *anderson_darling(sample), sample_base, len(sample)))
+    # The parameters of the normal distribution come from the full data.
+    kolmogorov = stats.kstest(sample, 'norm', args=(moments.mean, moments.std))
+    rows.append(('Kolmogorov-Smirnov', kolmogorov.statistic, kolmogorov.pvalue, sample_base, len(sample)))
+    tests = pd.DataFrame(rows, columns=['teste', 'estatistica', 'valor_p', 'base', 'n'])
+    tests[['estatistica', 'valor_p']] = tests[['estatistica', 'valor_p']].astype(np.float64)
+    return {
+        'moments': moments,
+        'histogram': histogram,
+        'sample': sample,
+        'sketch': sketch,
+        'missing': missing,
+        'tests': tests,
+    }
+
+
+def qq_points(sketch, n_points=DEFAULT_QQ_POINTS):
+    """
+    Points of the normal QQ plot of the values summarized by a sketch.
+
+    The probabilities are the order statistic medians of Filliben used by
+    `scipy.stats.probplot`, for `n_points` points or for every value when there are
+    fewer; an exact sketch with no more values than points gives the points of `probplot`.
+
+    Returns:
+        tuple: The theoretical quantiles of the standard normal distribution and the
+            observed quantiles, as ndarrays.
+    """
+    from scipy.stats import norm  # noqa: PLC0415
+
+    n = min(n_points, sketch.n)
+    probabilities = (np.arange(1, n + 1) - 0.3175) / (n + 0.365)
+    probabilities[-1] = 0.5 ** (1.0 / n)
+    probabilities[0] = 1 - probabilities[-1]
+    if sketch.exact and sketch.n == n:
+        observed = np.sort(sketch.levels[0])
+    else:
+        observed = sketch.quantiles(probabilities)
+    return norm.ppf(probabilities), observed
@@ -0,0 +1,356 @@
+"""
+Local store of daily OHLCV prices, filled from a pluggable data source.
+
+The prices of each ticker are kept in one Parquet file together with the list of date
+ranges the store has already asked its source for. A request for a date range fetches
+only the gaps that are not covered yet, merges them into the stored frame and extends the
+covered ranges, so moving the start or end date of a chart downloads a few days instead of
+the whole period again, and the same range is never downloaded twice. An empty answer is
+recorded as covered only when the source confirms the range has no trading days, such as
+a weekend; sources like Yahoo Finance also answer failures and throttling with nothing,
+and such a gap must be asked for again.
+
+The prices of today and later can still change, so coverage is only recorded up to
+yesterday.
+
+Sources implement `PriceSource.fetch`. `YahooSource` downloads from Yahoo Finance and
+`CsvSource` reads local files, for tests and offline runs; the `PRICE_SOURCE_DIR`
+environment variable switches the shared store to the files of a directory. `get_many`
+loads several tickers at once through a bounded pool of threads.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.cache import CACHE_DIR
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume')
+INDEX_NAME = 'Date'
+COVERED_RANGES = b'covered_ranges'
+DEFAULT_WORKERS = 8
+# Tickers name files, so they are limited to the characters of exchange symbols such as BRK-B, PETR4.SA and ^BVSP.
+TICKER_PATTERN = re.compile(r'[A-Z0-9.\-^=]{1,15}')
+
+
+class MissingPricesError(LookupError):
+    """Raised by `PriceStore.get` when the source returns no prices for a range that has trading days."""
+
+
+def validate_ticker(ticker):
+    """
+    Check that a ticker is a plain exchange symbol before it reaches a path or a source.
+
+    Parameters:
+        ticker (str): The ticker symbol, in upper case.
+
+    Returns:
+        str: The ticker.
+
+    Raises:
+        ValueError: When the ticker holds other characters, such as path separators.
+    """
+    if not isinstance(ticker, str) or not TICKER_PATTERN.fullmatch(ticker):
+        raise ValueError(f'Invalid ticker: {ticker!r}')
+    return ticker
+
+
+def empty_prices():
+    """A frame of prices without rows."""
+    return pd.DataFrame(
+        np.empty((0, len(PRICE_COLUMNS))),
+        index=pd.DatetimeIndex([], dtype='datetime64[ns]', name=INDEX_NAME),
+        columns=list(PRICE_COLUMNS),
+    )
+
+
+def normalize_prices(frame):
+    """The `PRICE_COLUMNS` of `frame` as float64, indexed by naive dates in ascending order."""
+    if isinstance(frame.columns, pd.MultiIndex):
+        # Newer yfinance versions add a ticker level even for one ticker.
+        frame = frame.droplevel(-1, axis=1)
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    # Truncating the values to days skips the frequency inference of `DatetimeIndex.normalize`.
+    days = index.to_numpy().astype('datetime64[D]').astype('datetime64[ns]')
+    frame = frame.reindex(columns=list(PRICE_COLUMNS)).astype('float64')
+    frame = frame.set_axis(pd.DatetimeIndex(days, name=INDEX_NAME))
+    return _merge_prices([frame])
+
+
+def _merge_prices(frames):
+    """The rows of `frames` sorted by date, keeping the last row of each date."""
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    merged = pd.concat(frames) if len(frames) > 1 else frames[0]
+    if not merged.index.is_unique:
+        merged = merged[~merged.index.duplicated(keep='last')]
+    return merged if merged.index.is_monotonic_increasing else merged.sort_index()
+
+
+def _merge_ranges(ranges):
+    """Sorted, non-overlapping union of half-open (start, end) date ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(covered, start, end):
+    """
+    Parts of the half-open range [start, end) outside the `covered` ranges.
+
+    Parameters:
+        covered (list of tuple): Sorted, non-overlapping (start, end) date ranges.
+        start (date): First day requested.
+        end (date): Day after the last day requested.
+
+    Returns:
+        list of tuple: The missing (start, end) ranges, in order.
+    """
+    gaps = []
+    for covered_start, covered_end in covered:
+        if covered_end <= start:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > start:
+            gaps.append((start, covered_start))
+        start = max(start, covered_end)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+
+class PriceSource:
+    """
+    Where a `PriceStore` gets the prices it does not have.
+
+    Subclasses set `name`, which separates the stored prices of each source, and implement `fetch`.
+    """
+
+    name = None
+
+    def fetch(self, ticker, start, end):
+        """
+        Daily prices of a ticker.
+
+        Parameters:
+            ticker (str): The ticker symbol.
+            start (date): First day.
+            end (date): Day after the last day.
+
+        Returns:
+            DataFrame: The `PRICE_COLUMNS` of each trading day, indexed by date; empty when there is none.
+        """
+        raise NotImplementedError
+
+    def confirms_empty(self, ticker, start, end):  # noqa: PLR6301
+        """
+        Whether an empty answer of `fetch` means the range has no trading days.
+
+        By default only ranges without weekdays are known to be empty; holidays and failed
+        downloads cannot be told apart.
+
+        Parameters:
+            ticker (str): The ticker symbol.
+            start (date): First day.
+            end (date): Day after the last day.
+
+        Returns:
+            bool: True when the range can be recorded as covered.
+        """
+        return pd.bdate_range(start, end, inclusive='left').empty
+
+
+class YahooSource(PriceSource):
+    """
+    Prices downloaded from Yahoo Finance with yfinance.
+
+    Each call goes through its own `yf.Ticker`: `yf.download` keeps its results and errors in
+    module-level state, which concurrent calls from `PriceStore.get_many` would mix up.
+    """
+
+    name = 'yahoo'
+
+    def fetch(self, ticker, start, end):  # noqa: PLR6301
+        import yfinance as yf  # noqa: PLC0415
+
+        return yf.Ticker(validate_ticker(ticker)).history(start=start, end=end, auto_adjust=False)
+
+
+class CsvSource(PriceSource):
+    """
+    Prices read from local CSV files, one `<ticker>.csv` per ticker with a `Date` column and the `PRICE_COLUMNS`.
+
+    Parameters:
+        directory (str or Path): Where the files are.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.name = f'files-{self.directory.name}'
+
+    def fetch(self, ticker, start, end):
+        path = self.directory / f'{validate_ticker(ticker)}.csv'
+        if not path.exists():
+            return empty_prices()
+        frame = pd.read_csv(path, index_col=INDEX_NAME, parse_dates=[INDEX_NAME])
+        return frame.loc[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))]
+
+    def confirms_empty(self, ticker, start, end):  # noqa: PLR6301
+        # The files hold every price there is.
+        return True
+
+
+class PriceStore:
+    """
+    Daily prices kept on disk per ticker, with the date ranges already fetched from the source.
+
+    Parameters:
+        source (PriceSource): Where missing prices are fetched from.
+        directory (str or Path): Where the prices are stored, one subdirectory per source.
+        today (callable): Returns the current date; coverage is recorded up to the day before.
+    """
+
+    def __init__(self, source, directory=CACHE_DIR / 'prices', today=date.today):
+        self.source = source
+        self.directory = Path(directory) / source.name
+        self.today = today
+        # ticker -> (covered ranges, frame) of the prices loaded in memory.
+        self._prices = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ticker):
+        return self.directory / f'{validate_ticker(ticker)}.parquet'
+
+    def _read(self, ticker):
+        try:
+            table = pq.read_table(self._path(ticker))
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return [], empty_prices()
+        ranges = json.loads((table.schema.metadata or {}).get(COVERED_RANGES, b'[]'))
+        covered = [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in ranges]
+        return covered, table.to_pandas()
+
+    def _write(self, ticker, covered, frame):
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+        ranges = json.dumps([(start.isoformat(), end.isoformat()) for start, end in covered])
+        metadata = {**(table.schema.metadata or {}), COVERED_RANGES: ranges.encode()}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that other processes never read a partial copy.
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as file:
+            pq.write_table(table.replace_schema_metadata(metadata), file)
+        os.replace(file.name, self._path(ticker))
+
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _load(self, ticker):
+        if ticker not in self._prices:
+            self._prices[ticker] = self._read(ticker)
+        return self._prices[ticker]
+
+    def get(self, ticker, start, end):
+        """
+        Daily prices of a ticker, fetching only the days not fetched before.
+
+        Concurrent requests for the same ticker wait for each other, so a gap is fetched once.
+        A gap the source answers with nothing, without confirming it has no trading days, is
+        not recorded as covered and is fetched again by the next request.
+
+        Parameters:
+            ticker (str): The ticker symbol.
+            start (date): First day.
+            end (date): Day after the last day, as in `yf.download`.
+
+        Returns:
+            DataFrame: The `PRICE_COLUMNS` of each trading day in the range, indexed by date.
+
+        Raises:
+            ValueError: When the ticker is not a plain exchange symbol.
+            MissingPricesError: When the range holds no prices and the source did not confirm it has no trading days.
+        """
+        validate_ticker(ticker)
+        start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+        unconfirmed = []
+        with self._ticker_lock(ticker):
+            covered, frame = self._load(ticker)
+            gaps = missing_ranges(covered, start, end)
+            if gaps:
+                fetched, confirmed = [], []
+                for gap_start, gap_end in gaps:
+                    prices = normalize_prices(self.source.fetch(ticker, gap_start, gap_end))
+                    if len(prices) or self.source.confirms_empty(ticker, gap_start, gap_end):
+                        fetched.append(prices)
+                        confirmed.append((gap_start, gap_end))
+                    else:
+                        unconfirmed.append((gap_start, gap_end))
+                if confirmed:
+                    frame = _merge_prices([frame, *fetched])
+                    # Only the days before today are final.
+                    final = [(gap_start, min(gap_end, self.today())) for gap_start, gap_end in confirmed]
+                    covered = _merge_ranges([*covered, *(gap for gap in final if gap[0] < gap[1])])
+                    self._write(ticker, covered, frame)
+                    self._prices[ticker] = covered, frame
+        prices = frame.loc[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))]
+        if unconfirmed and prices.empty:
+            raise MissingPricesError(
+                f'{self.source.name} returned no prices for {ticker} from {start} to {end}; '
+                'the ticker may not exist or the source may be unavailable'
+            )
+        return prices
+
+    def get_many(self, tickers, start, end, max_workers=DEFAULT_WORKERS):
+        """
+        Daily prices of several tickers, fetched concurrently by at most `max_workers` threads.
+
+        Parameters:
+            tickers (list of str): The ticker symbols.
+            start (date): First day.
+            end (date): Day after the last day.
+            max_workers (int): Largest number of tickers fetched at the same time.
+
+        Returns:
+            tuple: The prices of each ticker loaded, as a dict in the order of `tickers`,
+                and the error message of each ticker that failed.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        prices, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as executor:
+            futures = {ticker: executor.submit(self.get, ticker, start, end) for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    prices[ticker] = future.result()
+                except Exception as error:
+                    errors[ticker] = str(error) or type(error).__name__
+        return prices, errors
+
+    def covered(self, ticker):
+        """The (start, end) date ranges of `ticker` already fetched, end excluded."""
+        with self._ticker_lock(ticker):
+            return list(self._load(ticker)[0])
+
+
+def configured_source():
+    """The local files of `PRICE_SOURCE_DIR` when it is set, Yahoo Finance otherwise."""
+    directory = os.environ.get('PRICE_SOURCE_DIR')
+    return CsvSource(directory) if directory else YahooSource()
+
+
+price_store = PriceStore(configured_source())
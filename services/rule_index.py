@@ -0,0 +1,265 @@
+"""
+Lookup index from baskets to recommendations over mined association rules.
+
+Rules are grouped by antecedent and only the best `top_k` consequents of each antecedent
+are kept, ranked by lift and then confidence. Antecedents and consequents are stored as
+item id arrays in CSR layout, with an inverted index from each item to the antecedents
+that contain it.
+
+A basket query finds the antecedents contained in the basket either by enumerating the
+basket's subsets up to the longest antecedent and looking them up in a hash table, or by
+counting the basket's hits in the inverted index, whichever touches fewer entries. For
+the short antecedents mined in practice the work grows with the basket size, not with
+the number of rules. Basket files are matched basket by basket and ranked in one
+vectorized pass.
+"""
+
+from functools import cached_property
+from itertools import combinations
+from math import comb
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DEFAULT_TOP_K = 10
+
+
+def _csr_lists(lists, n_columns):
+    """Boolean CSR matrix whose row i holds the columns in `lists[i]`."""
+    lengths = np.fromiter((len(row) for row in lists), dtype=np.int64, count=len(lists))
+    indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((item for row in lists for item in row), dtype=np.int32, count=int(indptr[-1]))
+    return sp.csr_matrix((np.ones(len(indices), dtype=bool), indices, indptr), shape=(len(lists), n_columns))
+
+
+class RuleIndex:
+    """
+    Association rules indexed for basket queries.
+
+    Build it with `from_rules` or `load`.
+
+    Parameters:
+        items (ndarray): Item name of each item id.
+        antecedents (csr_matrix): (n_antecedents, n_items) incidence matrix.
+        consequents (csr_matrix): (n_consequents, n_items) incidence matrix.
+        top_indptr (ndarray): Offsets of each antecedent's entries in the `top_*` arrays.
+        top_consequents (ndarray): Consequent id of each kept rule.
+        top_lift (ndarray): Lift of each kept rule.
+        top_confidence (ndarray): Confidence of each kept rule.
+    """
+
+    def __init__(self, items, antecedents, consequents, top_indptr, top_consequents, top_lift, top_confidence):  # noqa: PLR0913, PLR0917
+        self.items = np.asarray(items, dtype=str)
+        self.antecedents = antecedents
+        self.consequents = consequents
+        self.top_indptr = top_indptr
+        self.top_consequents = top_consequents
+        self.top_lift = top_lift
+        self.top_confidence = top_confidence
+        self.antecedent_lengths = np.diff(antecedents.indptr)
+        self.consequent_lengths = np.diff(consequents.indptr)
+        self.max_antecedent_length = int(self.antecedent_lengths.max(initial=0))
+        # Inverted index: row i of the CSC layout lists the antecedents containing item i.
+        self.postings = antecedents.tocsc()
+        self.item_ids = {item: i for i, item in enumerate(self.items.tolist())}
+
+    @classmethod
+    def from_rules(cls, rules, top_k=DEFAULT_TOP_K):
+        """
+        Index a rules DataFrame produced by `mlxtend.frequent_patterns.association_rules`.
+
+        Parameters:
+            rules (DataFrame): Rules with 'antecedents', 'consequents', 'lift' and 'confidence'.
+            top_k (int): Consequents kept per antecedent.
+        """
+        rules = rules.sort_values(['lift', 'confidence'], ascending=False, kind='stable')
+        items = sorted(set().union(*rules['antecedents'], *rules['consequents']))
+        ids = {item: i for i, item in enumerate(items)}
+
+        antecedent_codes, antecedent_sets = pd.factorize(rules['antecedents'])
+        consequent_codes, consequent_sets = pd.factorize(rules['consequents'])
+        kept = pd.Series(antecedent_codes).groupby(antecedent_codes).cumcount().to_numpy() < top_k
+        order = np.argsort(antecedent_codes[kept], kind='stable')
+        counts = np.bincount(antecedent_codes[kept], minlength=len(antecedent_sets))
+        top_indptr = np.zeros(len(antecedent_sets) + 1, dtype=np.int64)
+        np.cumsum(counts, out=top_indptr[1:])
+
+        return cls(
+            items,
+            _csr_lists([sorted(ids[item] for item in itemset) for itemset in antecedent_sets], len(items)),
+            _csr_lists([sorted(ids[item] for item in itemset) for itemset in consequent_sets], len(items)),
+            top_indptr,
+            consequent_codes[kept][order].astype(np.int32),
+            rules['lift'].to_numpy(dtype=np.float64)[kept][order],
+            rules['confidence'].to_numpy(dtype=np.float64)[kept][order],
+        )
+
+    def save(self, path):
+        """Write the index to a compressed `.npz` file, given by path or file object."""
+        np.savez_compressed(
+            path,
+            items=self.items,
+            antecedent_indptr=self.antecedents.indptr,
+            antecedent_indices=self.antecedents.indices,
+            consequent_indptr=self.consequents.indptr,
+            consequent_indices=self.consequents.indices,
+            top_indptr=self.top_indptr,
+            top_consequents=self.top_consequents,
+            top_lift=self.top_lift,
+            top_confidence=self.top_confidence,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by `save`, from a path or file object."""
+        with np.load(path) as arrays:
+            n_items = len(arrays['items'])
+
+            def incidence(name):
+                indices = arrays[f'{name}_indices']
+                indptr = arrays[f'{name}_indptr']
+                data = np.ones(len(indices), dtype=bool)
+                return sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, n_items))
+
+            return cls(
+                arrays['items'],
+                incidence('antecedent'),
+                incidence('consequent'),
+                arrays['top_indptr'],
+                arrays['top_consequents'],
+                arrays['top_lift'],
+                arrays['top_confidence'],
+            )
+
+    @property
+    def n_rules(self):
+        return len(self.top_consequents)
+
+    @cached_property
+    def _antecedent_ids(self):
+        """Hash table from the sorted item ids of each antecedent to its id."""
+        indptr, indices = self.antecedents.indptr, self.antecedents.indices
+        return {tuple(indices[indptr[i] : indptr[i + 1]].tolist()): i for i in range(len(indptr) - 1)}
+
+    def matching_antecedents(self, basket_ids):
+        """Ids of the antecedents whose items are all in the basket."""
+        basket_ids = sorted(set(basket_ids))
+        enumeration_cost = sum(comb(len(basket_ids), size) for size in range(1, self.max_antecedent_length + 1))
+        postings = self.postings.indptr
+        inverted_cost = sum(int(postings[i + 1] - postings[i]) for i in basket_ids)
+        if enumeration_cost <= inverted_cost:
+            lookup = self._antecedent_ids
+            found = (
+                lookup.get(subset)
+                for size in range(1, self.max_antecedent_length + 1)
+                for subset in combinations(basket_ids, size)
+            )
+            return np.array([i for i in found if i is not None], dtype=np.int64)
+        if not basket_ids:
+            return np.zeros(0, dtype=np.int64)
+        hits = np.concatenate([self.postings.indices[postings[i] : postings[i + 1]] for i in basket_ids])
+        candidates, counts = np.unique(hits, return_counts=True)
+        return candidates[counts == self.antecedent_lengths[candidates]]
+
+    def _names(self, matrix, row):
+        return frozenset(self.items[matrix.indices[matrix.indptr[row] : matrix.indptr[row + 1]]].tolist())
+
+    def _rank(self, baskets, antecedents):
+        """
+        Candidate rules of (basket, matched antecedent) pairs, keeping the best rule of each
+        (basket, consequent) and ordering each basket's rules by lift and then confidence.
+        """
+        starts, ends = self.top_indptr[antecedents], self.top_indptr[antecedents + 1]
+        repeats = ends - starts
+        rules = np.repeat(ends - np.cumsum(repeats), repeats) + np.arange(repeats.sum())
+        baskets = np.repeat(baskets, repeats)
+        consequents = self.top_consequents[rules].astype(np.int64)
+        order = np.lexsort((-self.top_confidence[rules], -self.top_lift[rules], baskets))
+        # First occurrence of each (basket, consequent) in ranking order.
+        _, first = np.unique(baskets[order] * len(self.consequent_lengths) + consequents[order], return_index=True)
+        order = order[np.sort(first)]
+        return {
+            'basket': baskets[order],
+            'consequent': consequents[order],
+            'rule': rules[order],
+            'antecedent': np.repeat(antecedents, repeats)[order],
+        }
+
+    def _results(self, ranked):
+        return pd.DataFrame({
+            'consequents': [self._names(self.consequents, row) for row in ranked['consequent']],
+            'lift': self.top_lift[ranked['rule']],
+            'confidence': self.top_confidence[ranked['rule']],
+            'antecedents': [self._names(self.antecedents, row) for row in ranked['antecedent']],
+        })
+
+    def _recommend(self, baskets, top_k):
+        """
+        Top recommendations of several baskets, each given as a sorted list of item ids.
+
+        Matching runs basket by basket, which keeps the work proportional to the baskets;
+        ranking and the check that a consequent is not already in the basket are then
+        vectorized over every (basket, rule) candidate at once.
+        """
+        matches = [self.matching_antecedents(basket) for basket in baskets]
+        counts = np.fromiter((len(found) for found in matches), dtype=np.int64, count=len(matches))
+        antecedents = np.concatenate(matches).astype(np.int64) if matches else np.zeros(0, dtype=np.int64)
+        ranked = self._rank(np.repeat(np.arange(len(baskets)), counts), antecedents)
+
+        # A consequent is covered when every one of its items is in the basket.
+        n_items = len(self.items)
+        lengths = self.consequent_lengths[ranked['consequent']]
+        positions = np.repeat(self.consequents.indptr[ranked['consequent']] - np.cumsum(lengths) + lengths, lengths)
+        consequent_items = self.consequents.indices[positions + np.arange(lengths.sum())]
+        basket_lengths = np.fromiter((len(basket) for basket in baskets), dtype=np.int64, count=len(baskets))
+        basket_keys = np.repeat(np.arange(len(baskets)), basket_lengths) * n_items + np.fromiter(
+            (item for basket in baskets for item in basket), dtype=np.int64, count=int(basket_lengths.sum())
+        )
+        present = np.isin(np.repeat(ranked['basket'], lengths) * n_items + consequent_items, basket_keys)
+        covered = np.add.reduceat(present, np.cumsum(lengths) - lengths) if len(lengths) else lengths
+        keep = np.flatnonzero(covered < lengths)
+
+        # Position of each kept rule within its basket; baskets are contiguous in `ranked`.
+        kept_baskets = ranked['basket'][keep]
+        first = np.searchsorted(kept_baskets, kept_baskets)
+        keep = keep[np.arange(len(keep)) - first < top_k]
+        return {name: values[keep] for name, values in ranked.items()}
+
+    def recommend(self, basket, top_k=DEFAULT_TOP_K):
+        """
+        Recommend consequents for one basket.
+
+        Parameters:
+            basket (iterable of str): Items in the basket; unknown items are ignored.
+            top_k (int): Recommendations returned.
+
+        Returns:
+            DataFrame: The best rules whose antecedent is in the basket and whose
+                consequent is not, one per consequent, with 'consequents', 'lift',
+                'confidence' and 'antecedents' columns.
+        """
+        basket_ids = sorted({self.item_ids[item] for item in basket if item in self.item_ids})
+        return self._results(self._recommend([basket_ids], top_k))
+
+    def recommend_many(self, transactions, top_k=DEFAULT_TOP_K):
+        """
+        Recommend consequents for every basket of a file.
+
+        Parameters:
+            transactions (EncodedTransactions): The baskets, as encoded by `services.transactions`.
+            top_k (int): Recommendations returned per basket.
+
+        Returns:
+            DataFrame: The columns returned by `recommend`, preceded by 'cesta', the row of
+                the basket in the file.
+        """
+        # Item ids of the index for each basket; items the rules never mention are dropped.
+        known = np.array([self.item_ids.get(item, -1) for item in transactions.items], dtype=np.int64)
+        matrix = transactions.matrix
+        baskets = [sorted(ids[ids >= 0].tolist()) for ids in np.split(known[matrix.indices], matrix.indptr[1:-1])]
+        ranked = self._recommend(baskets, top_k)
+        results = self._results(ranked)
+        results.insert(0, 'cesta', ranked['basket'])
+        return results
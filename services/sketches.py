@@ -0,0 +1,204 @@
+"""
+Mergeable quantile sketches, to summarize columns too long to sort.
+
+`KLLSketch` is the sketch of Karnin, Lang and Liberty (2016). Values enter the lowest of
+a stack of buffers; when a buffer holds more than its capacity, it is sorted and every
+other value, starting at a random one of the first two, moves up a level with twice the
+weight. The capacities shrink geometrically down the stack, so the sketch keeps about
+`3 * k` values whatever the number of rows.
+
+Each compaction at weight w moves the rank of any value by -w, 0 or +w, with mean zero,
+so the rank error of a quantile is a sum of independent bounded terms. The sketch keeps
+the sum of their squared weights and states the bound that Hoeffding's inequality gives
+for it (`rank_error`), instead of a worst case over every possible input.
+
+Sketches of parts of a column, built chunk by chunk or on several threads, merge into
+the sketch of the whole column with `merge`. While no compaction has happened the
+sketch holds every value and its quantiles are exact.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 200
+# Ratio between the capacities of consecutive levels.
+CAPACITY_RATIO = 2 / 3
+DEFAULT_CONFIDENCE = 0.99
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+class KLLSketch:
+    """
+    Quantiles of a stream of numbers, within a stated rank error.
+
+    Parameters:
+        k (int): Capacity of the top level; the rank error shrinks about as 1 / k.
+        seed (int): Seed of the compaction offsets.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.levels = [np.empty(0)]
+        # Sum of the squared weights of the compactions, the variance bound of the rank error.
+        self.variance = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self):
+        """Whether every value is still held, with weight one."""
+        return len(self.levels) == 1
+
+    @property
+    def size(self):
+        """Number of values held."""
+        return sum(len(items) for items in self.levels)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(math.ceil(self.k * CAPACITY_RATIO**depth), 2)
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # With an odd number of values, the smallest one stays behind.
+            odd = len(items) % 2
+            kept = items[odd + self._rng.integers(2) :: 2]
+            self.levels[level] = items[:odd]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], kept])
+            self.variance += 4.0**level
+            # A new level lowers the capacity of the ones below it.
+            level = 0
+        return self
+
+    def update(self, values):
+        """Add a chunk of values, without missing ones."""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        return self._compact()
+
+    def merge(self, other):
+        """Add the values summarized by another sketch, built with any seed."""
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.variance += other.variance
+        return self._compact()
+
+    def rank_error(self, confidence=DEFAULT_CONFIDENCE):
+        """
+        Bound of the rank error of a quantile, as a fraction of the number of values.
+
+        Parameters:
+            confidence (float): Probability that the true rank of a returned quantile is
+                within the bound of the requested one.
+
+        Returns:
+            float: The bound; 0 while the sketch is exact.
+        """
+        if not self.n:
+            return 0.0
+        return math.sqrt(2 * self.variance * math.log(2 / (1 - confidence))) / self.n
+
+    def quantiles(self, probabilities):
+        """
+        Values at the given probabilities.
+
+        An exact sketch interpolates linearly between values, like `numpy.quantile` and
+        `DataFrame.describe`; otherwise each quantile is the smallest value held whose
+        cumulative weight reaches the requested rank.
+
+        Parameters:
+            probabilities (array-like): Probabilities between 0 and 1.
+
+        Returns:
+            ndarray: One value per probability; NaN when the sketch is empty.
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        if not self.n:
+            return np.full(probabilities.shape, np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], probabilities)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2.0**level) for level, values in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, probabilities * self.n, side='left')
+        result = items[order][np.minimum(positions, len(items) - 1)]
+        # The extremes are kept exactly.
+        return np.where(probabilities <= 0, self.minimum, np.where(probabilities >= 1, self.maximum, result))
+
+
+def describe(chunks, k=DEFAULT_K, percentiles=DESCRIBE_PERCENTILES, confidence=DEFAULT_CONFIDENCE):
+    """
+    `DataFrame.describe` of the numeric columns of frames read one after the other.
+
+    Counts, means, standard deviations and extremes are exact; the percentiles come from
+    a `KLLSketch` per column and are exact while it holds every value of its column.
+
+    Parameters:
+        chunks (iterable of DataFrame): Parts of a table, such as `pd.read_csv(..., chunksize=...)`.
+        k (int): The `KLLSketch` size.
+        percentiles (sequence of float): The percentiles to report.
+        confidence (float): Confidence of the stated rank errors.
+
+    Returns:
+        tuple: The table, with the rows of `DataFrame.describe`, and a Series with the rank
+            error bound of the percentiles of each column, as a fraction of its count.
+    """
+    sketches, moments = {}, {}
+    for chunk in chunks:
+        for column in chunk.select_dtypes('number').columns:
+            values = chunk[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            sketches.setdefault(column, KLLSketch(k)).update(values)
+            moments[column] = _merge_moments(moments.get(column, (0, 0.0, 0.0)), values)
+
+    rows = {}
+    for column, sketch in sketches.items():
+        n, mean, m2 = moments[column]
+        rows[column] = [
+            float(n),
+            mean if n else np.nan,
+            math.sqrt(m2 / (n - 1)) if n > 1 else np.nan,
+            sketch.minimum if n else np.nan,
+            *sketch.quantiles(percentiles),
+            sketch.maximum if n else np.nan,
+        ]
+    index = ['count', 'mean', 'std', 'min', *(f'{percentile:.0%}' for percentile in percentiles), 'max']
+    table = pd.DataFrame(rows, index=index)
+    errors = pd.Series({column: sketch.rank_error(confidence) for column, sketch in sketches.items()}, dtype=float)
+    return table, errors
+
+
+def _merge_moments(moments, values):
+    """Count, mean and sum of squared deviations of the values seen, merged with a chunk (Chan et al.)."""
+    n_a, mean_a, m2_a = moments
+    n_b = len(values)
+    if not n_b:
+        return moments
+    mean_b = values.mean()
+    m2_b = ((values - mean_b) ** 2).sum()
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
@@ -0,0 +1,91 @@
+"""
+Background prewarming of the heavy libraries used by the pages.
+
+The pages and services import statsmodels, pmdarima, scikit-learn, mlxtend, torch and
+the other large libraries inside the functions that use them, so opening the app only
+pays for what the first page renders. Once that page is on screen, `start_prewarm`
+imports the libraries the other features need in a daemon thread, so the first click on
+a feature does not wait for its imports either. Other warm-up tasks, such as loading
+the stored models, run in the same thread after the imports.
+
+The modules are read from the `PREWARM_MODULES` environment variable, a comma-separated
+list; setting it to an empty string disables the imports. torch and diffusers are left out
+of the default list: importing them takes about a gigabyte of memory, which only the
+image generation page should pay for; add them to the variable to prewarm them too.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+from time import perf_counter
+
+DEFAULT_PREWARM_MODULES = (
+    'sklearn.naive_bayes',
+    'sklearn.linear_model',
+    'scipy.stats',
+    'statsmodels.tsa.api',
+    'pmdarima',
+    'mlxtend.frequent_patterns',
+    'yfinance',
+)
+
+import_times = {}
+_thread = None
+_lock = threading.Lock()
+
+
+def configured_modules():
+    """Modules to prewarm, from `PREWARM_MODULES` or the defaults."""
+    value = os.environ.get('PREWARM_MODULES')
+    if value is None:
+        return DEFAULT_PREWARM_MODULES
+    return tuple(name.strip() for name in value.split(',') if name.strip())
+
+
+def prewarm(modules, tasks=()):
+    """
+    Import `modules` one after the other, recording how long each one took in `import_times`,
+    then call each of `tasks`.
+
+    Modules already imported or not installed are skipped, and errors are ignored: the
+    feature that needs the module or the task reports them when it is used.
+    """
+    for name in modules:
+        # Only the top-level package is looked up, which does not import anything.
+        if name in sys.modules or importlib.util.find_spec(name.partition('.')[0]) is None:
+            continue
+        start = perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception:
+            continue
+        import_times[name] = perf_counter() - start
+    for task in tasks:
+        try:
+            task()
+        except Exception:
+            continue
+
+
+def start_prewarm(modules=None, tasks=()):
+    """
+    Start prewarming in a daemon thread, once per process.
+
+    Parameters:
+        modules (iterable of str, optional): Modules to import; defaults to `configured_modules()`.
+        tasks (iterable of callable): Called without arguments after the imports.
+
+    Returns:
+        Thread: The prewarming thread, or None when it was already started or there is nothing to do.
+    """
+    global _thread  # noqa: PLW0603
+    modules = tuple(configured_modules() if modules is None else modules)
+    tasks = tuple(tasks)
+    with _lock:
+        if _thread is not None or not (modules or tasks):
+            return None
+        _thread = threading.Thread(target=prewarm, args=(modules, tasks), name='prewarm', daemon=True)
+        _thread.start()
+        return _thread
@@ -0,0 +1,143 @@
+"""
+Sparse encoding of market basket transactions.
+
+Transactions are read as comma-separated lines, one basket per line, and encoded into a
+boolean CSR matrix with one row per basket and one column per distinct item. Lines are
+parsed in chunks and only the column ids of the items present are kept, so memory grows
+with the number of item occurrences instead of baskets times distinct items.
+"""
+
+import io
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DEFAULT_CHUNK_SIZE = 100_000
+PREVIEW_ROWS = 100
+
+
+class EncodedTransactions:
+    """
+    Baskets encoded as a sparse boolean matrix.
+
+    Parameters:
+        matrix (csr_matrix): A (n_transactions, n_items) boolean matrix.
+        items (list of str): Item name of each column.
+    """
+
+    def __init__(self, matrix, items):
+        self.matrix = matrix
+        self.items = list(items)
+
+    @property
+    def n_transactions(self):
+        return self.matrix.shape[0]
+
+    def item_support(self):
+        """Share of the transactions that contain each item, as a Series indexed by item."""
+        counts = np.bincount(self.matrix.indices, minlength=len(self.items))
+        return pd.Series(counts / max(self.n_transactions, 1), index=self.items)
+
+    def prune(self, min_support):
+        """
+        Drop the items whose own support is below `min_support`.
+
+        No itemset containing such an item can be frequent, so mining the pruned matrix
+        gives the same frequent itemsets with far fewer columns.
+        """
+        keep = np.flatnonzero(self.item_support().to_numpy() >= min_support)
+        return EncodedTransactions(self.matrix[:, keep].tocsr(), [self.items[i] for i in keep])
+
+    def to_frame(self):
+        """The matrix as a sparse boolean DataFrame, the input expected by mlxtend."""
+        return pd.DataFrame.sparse.from_spmatrix(self.matrix, columns=self.items)
+
+    def append(self, other):
+        """
+        The transactions of `self` followed by those of `other`.
+
+        Items of `other` that are new are added at the end of the vocabulary, so the
+        column of every existing item is unchanged.
+        """
+        ids = {item: i for i, item in enumerate(self.items)}
+        items = self.items + [item for item in other.items if item not in ids]
+        ids.update((item, i) for i, item in enumerate(items))
+        columns = np.array([ids[item] for item in other.items], dtype=np.int32)
+        shape = (other.n_transactions, len(items))
+        appended = sp.csr_matrix((other.matrix.data, columns[other.matrix.indices], other.matrix.indptr), shape=shape)
+        appended.sort_indices()
+        widened = sp.csr_matrix(
+            (self.matrix.data, self.matrix.indices, self.matrix.indptr), shape=(self.n_transactions, len(items))
+        )
+        return EncodedTransactions(sp.vstack([widened, appended], format='csr'), items)
+
+    def baskets(self, rows):
+        """Item names of the given transactions."""
+        items = np.asarray(self.items, dtype=object)
+        return [
+            items[self.matrix.indices[self.matrix.indptr[row] : self.matrix.indptr[row + 1]]].tolist() for row in rows
+        ]
+
+    def preview(self, n_rows=PREVIEW_ROWS, seed=0):
+        """
+        A random sample of transactions for display.
+
+        Returns:
+            DataFrame: The sampled transactions, indexed by their position in the file,
+                with their items joined in the 'Itens' column.
+        """
+        n_rows = min(n_rows, self.n_transactions)
+        rows = np.sort(np.random.default_rng(seed).choice(self.n_transactions, n_rows, replace=False))
+        return pd.DataFrame({'Itens': [', '.join(basket) for basket in self.baskets(rows)]}, index=rows)
+
+
+def _lines(source):
+    """Iterate over the text lines of a path, a binary or text file object or an iterable of lines."""
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, encoding='utf-8') as file:
+            yield from file
+        return
+    if hasattr(source, 'read') and not isinstance(source, io.TextIOBase):
+        text = io.TextIOWrapper(source, encoding='utf-8')
+        yield from text
+        # Detach so that the caller's file object stays open.
+        text.detach()
+        return
+    for line in source:
+        yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def encode_transactions(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Encode comma-separated baskets into a sparse matrix, reading them in chunks.
+
+    Blank lines are skipped, surrounding whitespace is removed from item names and
+    repeated items count once per basket.
+
+    Parameters:
+        source: A path, a file object (such as a Streamlit upload) or an iterable of lines.
+        chunk_size (int): Lines parsed at a time.
+
+    Returns:
+        EncodedTransactions: The encoded baskets, with columns in order of first appearance.
+    """
+    vocabulary = {}
+    indices, lengths = [], []
+    lines = _lines(source)
+    while chunk := list(islice(lines, chunk_size)):
+        ids = []
+        for line in map(str.strip, chunk):
+            if not line:
+                continue
+            basket = {vocabulary.setdefault(item, len(vocabulary)) for item in map(str.strip, line.split(',')) if item}
+            ids.extend(sorted(basket))
+            lengths.append(len(basket))
+        indices.append(np.array(ids, dtype=np.int32))
+
+    indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+    indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    matrix = sp.csr_matrix((np.ones(len(indices), dtype=bool), indices, indptr), shape=(len(lengths), len(vocabulary)))
+    return EncodedTransactions(matrix, vocabulary)
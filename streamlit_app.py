@@ -1,22 +1,34 @@
 from datetime import datetime, timedelta
-from time import sleep
 
 import streamlit as st
 from streamlit_cookies_controller import CookieController
 
+from services.models import model_registry
+from services.startup import start_prewarm
+
 cookie_expires = datetime.now() + timedelta(days=30)
 controller = CookieController()
 
-sleep(2)
-user_id = controller.get('user_id')
+# The user is kept in the session once known. Otherwise it comes from the cookie, which the
+# cookie component only reports once it has mounted in the browser: until then `getAll`
+# returns None and the script stops, and the component reruns it when the cookies arrive.
+user_id = st.session_state.get('user_id')
+if user_id is None:
+    cookies = controller.getAll()
+    if cookies is None:
+        st.stop()
+    user_id = cookies.get('user_id')
 
 if user_id is None:
-    try:
-        param = st.query_params['user']
-        controller.set('user_id', param, expires=cookie_expires)
+    user_id = st.query_params.get('user')
+    if user_id is not None:
+        controller.set('user_id', user_id, expires=cookie_expires)
         st.success('User authenticated')
-    except IndexError:
-        st.error('Auth error')
+    else:
+        st.sidebar.warning('Auth error')
+
+if user_id is not None:
+    st.session_state['user_id'] = user_id
 
 pages = {
     f'Aplicações de Inteligência Artificial - {user_id}': [
@@ -69,3 +81,4 @@ pages = {
 
 pages = st.navigation(pages)
 pages.run()
+start_prewarm(tasks=[model_registry.warm])
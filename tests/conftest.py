@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def tiny_pipeline_path(tmp_path_factory):
+    """A random-weight Stable Diffusion pipeline small enough to run on CPU, saved to disk."""
+    pytest.importorskip('torch')
+    diffusers = pytest.importorskip('diffusers')
+    transformers = pytest.importorskip('transformers')
+    import torch  # noqa: PLC0415
+    from transformers.models.clip.tokenization_clip import bytes_to_unicode  # noqa: PLC0415
+
+    path = tmp_path_factory.mktemp('tiny-stable-diffusion')
+    torch.manual_seed(0)
+
+    # Character-level CLIP vocabulary: every byte with and without the end-of-word marker.
+    characters = list(bytes_to_unicode().values())
+    vocab = {token: index for index, token in enumerate(['<|startoftext|>', '<|endoftext|>', *characters])}
+    vocab.update({f'{character}</w>': len(vocab) + index for index, character in enumerate(characters)})
+    (path / 'vocab.json').write_text(json.dumps(vocab))
+    (path / 'merges.txt').write_text('#version: 0.2\n')
+    tokenizer = transformers.CLIPTokenizer(path / 'vocab.json', path / 'merges.txt', model_max_length=77)
+
+    text_encoder = transformers.CLIPTextModel(
+        transformers.CLIPTextConfig(
+            bos_token_id=0,
+            eos_token_id=1,
+            pad_token_id=1,
+            hidden_size=32,
+            intermediate_size=37,
+            num_attention_heads=4,
+            num_hidden_layers=2,
+            vocab_size=len(vocab),
+        )
+    )
+    unet = diffusers.UNet2DConditionModel(
+        block_out_channels=(32, 64),
+        layers_per_block=1,
+        sample_size=16,
+        in_channels=4,
+        out_channels=4,
+        down_block_types=('DownBlock2D', 'CrossAttnDownBlock2D'),
+        up_block_types=('CrossAttnUpBlock2D', 'UpBlock2D'),
+        cross_attention_dim=32,
+    )
+    vae = diffusers.AutoencoderKL(
+        block_out_channels=(32, 64),
+        in_channels=3,
+        out_channels=3,
+        down_block_types=('DownEncoderBlock2D', 'DownEncoderBlock2D'),
+        up_block_types=('UpDecoderBlock2D', 'UpDecoderBlock2D'),
+        latent_channels=4,
+    )
+    scheduler = diffusers.EulerDiscreteScheduler(beta_start=0.00085, beta_end=0.012, beta_schedule='scaled_linear')
+    pipeline = diffusers.StableDiffusionPipeline(
+        vae=vae,
+        text_encoder=text_encoder,
+        tokenizer=tokenizer,
+        unet=unet,
+        scheduler=scheduler,
+        safety_checker=None,
+        feature_extractor=None,
+        requires_safety_checker=False,
+    )
+    pipeline.save_pretrained(path)
+    return str(path)
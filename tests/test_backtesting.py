@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtesting import backtest, backtest_method, baseline_forecasts, forecast_errors, rolling_cutoffs
+from services.forecasting import fit_forecast
+
+SERIES = pd.read_csv('data/monthly-milk-production-pounds-p.csv', header=None).iloc[:, 0]
+VALUES = SERIES.to_numpy(dtype=np.float64)
+HORIZON = 6
+
+
+def test_rolling_cutoffs_end_one_horizon_before_the_last_observation():
+    cutoffs = rolling_cutoffs(len(VALUES), HORIZON, n_origins=10)
+
+    np.testing.assert_array_equal(cutoffs, np.arange(len(VALUES) - HORIZON - 9, len(VALUES) - HORIZON + 1))
+    with pytest.raises(ValueError, match='at least'):
+        rolling_cutoffs(20, HORIZON)
+
+
+def test_vectorized_baselines_match_fitting_each_origin():
+    cutoffs = rolling_cutoffs(len(VALUES), HORIZON, n_origins=5)
+
+    baselines = baseline_forecasts(VALUES, cutoffs, HORIZON)
+
+    for method in ('naive', 'mean', 'drift'):
+        expected = [fit_forecast(method, VALUES[:cutoff], HORIZON)[0] for cutoff in cutoffs]
+        np.testing.assert_allclose(baselines[method], expected)
+
+
+def test_warm_started_holt_matches_cold_fits():
+    cutoffs = rolling_cutoffs(len(VALUES), HORIZON, n_origins=5)
+
+    warm, _, _ = backtest_method('holt', VALUES, cutoffs, HORIZON)
+
+    cold = [fit_forecast('holt', VALUES[:cutoff], HORIZON)[0] for cutoff in cutoffs]
+    np.testing.assert_allclose(warm, cold, rtol=1e-3)
+
+
+def test_perfect_forecast_has_zero_errors():
+    cutoffs = rolling_cutoffs(len(VALUES), HORIZON, n_origins=3)
+    actual = VALUES[cutoffs[:, np.newaxis] + np.arange(HORIZON)]
+
+    errors = forecast_errors(VALUES, cutoffs, actual)
+
+    assert errors == {'MAE': 0.0, 'RMSE': 0.0, 'MAPE': 0.0, 'MASE': 0.0}
+
+
+def test_backtest_scores_every_selected_method():
+    metrics, timings = backtest(SERIES, HORIZON, {'naive': True, 'drift': True, 'holt': True}, n_origins=10)
+
+    assert list(metrics.index) == ['Naive', 'Drift', 'Holt']
+    assert list(metrics.columns) == ['MAE', 'RMSE', 'MAPE', 'MASE']
+    assert metrics.notna().all().all()
+    assert [timing['status'] for timing in timings] == ['ok'] * 3
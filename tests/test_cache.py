@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from services.cache import DiskCache, cache_key
+
+
+def test_cache_key_depends_on_values_and_settings():
+    series = pd.Series([1.0, 2.0, 3.0])
+
+    assert cache_key(series, 12, {'naive': True}) == cache_key(series.copy(), 12, {'naive': True})
+    assert cache_key(series, 12) != cache_key(series, 24)
+    assert cache_key(series, 12) != cache_key(pd.Series([1.0, 2.0, 4.0]), 12)
+    assert cache_key(np.array(['a', 'b'], dtype=object)) == cache_key(np.array(['a', 'b'], dtype=object))
+
+
+def test_get_and_set_count_hits_and_misses(tmp_path):
+    cache = DiskCache(tmp_path)
+
+    assert cache.get('key') is None
+    cache.set('key', {'forecast': [1, 2, 3]})
+
+    assert cache.get('key') == {'forecast': [1, 2, 3]}
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['entries'] == 1
+
+
+def test_get_or_set_computes_only_once(tmp_path):
+    cache = DiskCache(tmp_path)
+    calls = []
+
+    for _ in range(3):
+        cache.get_or_set('key', lambda: calls.append(1) or 'value')
+
+    assert len(calls) == 1
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    payload = b'x' * 1000
+    cache = DiskCache(tmp_path, max_bytes=2500)
+    cache.set('old', payload)
+    cache.set('recent', payload)
+    os.utime(tmp_path / 'old.pkl', (1, 1))
+    os.utime(tmp_path / 'recent.pkl', (2, 2))
+    cache.get('old')
+
+    cache.set('new', payload)
+
+    assert cache.get('recent') is None
+    assert cache.get('old') == payload
+    assert cache.get('new') == payload
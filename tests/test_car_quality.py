@@ -0,0 +1,60 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.car_quality import FEATURES, PREDICTED_COLUMN, train, train_streaming
+from services.datasets import dataset_store, load_dataset
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    return train(load_dataset('car_ml_classification'), test_size=0.3, random_state=42)[0]
+
+
+def test_table_matches_the_model_on_every_combination(fitted):
+    table, encoder, model = fitted['table'], fitted['encoder'], fitted['model']
+    grid = np.indices([len(levels) for levels in table.categories]).reshape(len(FEATURES), -1).T
+    vehicles = pd.DataFrame({feature: table.categories[i][grid[:, i]] for i, feature in enumerate(FEATURES)}, dtype=str)
+
+    scores = table.score(vehicles)
+
+    assert len(table) == 1728
+    expected = model.predict_proba(encoder.transform(vehicles))
+    np.testing.assert_allclose(scores.drop(columns=PREDICTED_COLUMN).to_numpy(), expected, rtol=1e-5)
+    assert scores[PREDICTED_COLUMN].tolist() == table.classes[expected.argmax(axis=1)].tolist()
+    assert table.predict_one(vehicles.iloc[100].tolist()) == scores[PREDICTED_COLUMN].iloc[100]
+
+
+def test_csv_is_scored_in_chunks_and_unknown_levels_are_left_empty(fitted):
+    table = fitted['table']
+    text = 'buying,maint,doors,persons,lug_boot,safety\n' + 'low,low,4,more,big,high\nnew,low,4,more,big,high\n' * 3
+
+    scored, counts = table.score_csv(io.BytesIO(text.encode()), chunk_size=2)
+
+    result = pd.read_csv(io.BytesIO(scored), dtype={'doors': str})
+    assert len(result) == 6
+    assert result[PREDICTED_COLUMN].isna().tolist() == [False, True] * 3
+    assert result['doors'].tolist() == ['4'] * 6
+    assert counts[None] == 3
+    assert counts.sum() == 6
+
+
+def test_csv_without_an_attribute_is_rejected(fitted):
+    with pytest.raises(ValueError, match='safety'):
+        fitted['table'].score_csv(io.BytesIO(b'buying,maint,doors,persons,lug_boot\nlow,low,4,more,big\n'))
+
+
+def test_streamed_training_does_not_depend_on_the_chunk_size(tmp_path):
+    path = dataset_store.path('car_ml_classification')
+    source = tmp_path / 'cars.csv'
+    source.write_text(path.read_text() + 'high,high,9,2,big,low,unacc\nlow,low,2,2,big,low,excellent\n')
+
+    whole, whole_metrics = train_streaming(source, chunk_size=10_000)
+    chunked, chunked_metrics = train_streaming(io.BytesIO(source.read_bytes()), chunk_size=37)
+
+    np.testing.assert_array_equal(whole['table'].probabilities, chunked['table'].probabilities)
+    assert whole_metrics['accuracy'] == chunked_metrics['accuracy'] > 0.7
+    assert whole_metrics['skipped_rows'] == 2
+    assert whole_metrics['train_rows'] + whole_metrics['holdout_rows'] == 1000
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from services.cargo import item_arrays, population_fitness
+
+DATA = pd.DataFrame({'PESO': [10, 20, 30], 'VALOR': [100, 200, 300], 'VOLUME': [1, 2, 3]})
+
+
+def test_feasible_individuals_score_negative_value():
+    population = np.array([[1, 0, 0], [1, 1, 0], [0, 0, 0]])
+
+    fitness = population_fitness(population, item_arrays(DATA), max_volume=10, max_weight=100)
+
+    np.testing.assert_array_equal(fitness, [-100, -300, 0])
+
+
+def test_penalty_is_graded_and_worse_than_any_feasible_load():
+    population = np.array([[1, 1, 1], [0, 1, 1], [1, 0, 0]])
+
+    fitness = population_fitness(population, item_arrays(DATA), max_volume=10, max_weight=45)
+
+    assert fitness[2] < 0 < fitness[1] < fitness[0]
+
+
+def test_single_individual_vector_is_accepted():
+    fitness = population_fitness(np.array([0.0, 1.0, 0.0]), item_arrays(DATA), max_volume=10, max_weight=100)
+
+    np.testing.assert_array_equal(fitness, [-200])
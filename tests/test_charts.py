@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from services.charts import (
+    DEFAULT_WIDTH,
+    WEBGL_THRESHOLD,
+    aggregate_ohlc,
+    decimate,
+    line_trace,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def test_lttb_keeps_the_ends_and_the_spikes():
+    y = np.zeros(1000)
+    y[[137, 512, 803]] = [5.0, -7.0, 3.0]
+
+    kept = lttb_indices(np.arange(1000), y, 50)
+
+    assert len(kept) == 50
+    assert kept[0] == 0
+    assert kept[-1] == 999
+    assert np.all(np.diff(kept) > 0)
+    assert {137, 512, 803} <= set(kept.tolist())
+
+
+def test_minmax_keeps_the_envelope_of_every_bucket():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_000)
+    y[4000:4100] = np.nan
+
+    kept = minmax_indices(y, 100)
+
+    assert len(kept) <= 202
+    buckets = np.array_split(np.arange(10_000), 100)
+    for bucket in buckets:
+        values = y[bucket]
+        in_bucket = y[kept[(kept >= bucket[0]) & (kept <= bucket[-1])]]
+        if not np.isnan(values).all():
+            assert np.nanmax(in_bucket) == np.nanmax(values)
+            assert np.nanmin(in_bucket) == np.nanmin(values)
+
+
+def test_short_series_are_not_decimated():
+    x = pd.date_range('2024-01-01', periods=100)
+    y = pd.Series(np.arange(100.0), index=x)
+
+    assert decimate(x, y, 200)[1] is y
+    kept_x, kept_y = decimate(x, y, 20, method='minmax')
+    assert isinstance(kept_x, pd.DatetimeIndex)
+    assert len(kept_y) <= 20
+
+
+def test_aggregated_bars_keep_the_extremes_and_the_total_volume():
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(size=1000))
+    bars = pd.DataFrame(
+        {'Open': close - 0.5, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 10.0},
+        index=pd.date_range('2024-01-01', periods=1000, freq='min'),
+    )
+
+    merged = aggregate_ohlc(bars, 30)
+
+    assert len(merged) <= 30
+    assert merged.index[0] == bars.index[0]
+    assert merged['Open'].iloc[0] == bars['Open'].iloc[0]
+    assert merged['Close'].iloc[-1] == bars['Close'].iloc[-1]
+    assert merged['High'].max() == bars['High'].max()
+    assert merged['Low'].min() == bars['Low'].min()
+    assert merged['Volume'].sum() == bars['Volume'].sum()
+
+
+def test_line_trace_uses_webgl_only_for_long_series():
+    long_x = np.arange(WEBGL_THRESHOLD * 2)
+    short_x = np.arange(WEBGL_THRESHOLD)
+
+    decimated = line_trace(long_x, np.sin(long_x))
+    full = line_trace(long_x, np.sin(long_x), max_points=None)
+
+    assert isinstance(decimated, go.Scattergl)
+    assert len(decimated.y) == DEFAULT_WIDTH
+    assert isinstance(full, go.Scattergl)
+    assert len(full.y) == len(long_x)
+    assert isinstance(line_trace(short_x, np.sin(short_x)), go.Scatter)
@@ -0,0 +1,75 @@
+import hashlib
+import os
+
+from services.datasets import DATASETS, DatasetStore
+
+FRANCHISE = 'FrqAnual;CusInic\n1000;1050\n1125;1150\n'
+
+
+def make_store(tmp_path, text=FRANCHISE):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir(exist_ok=True)
+    (data_dir / 'franchise_linear_regression.csv').write_text(text)
+    return DatasetStore(data_dir, tmp_path / 'parquet', {'franchise': DATASETS['franchise']})
+
+
+def test_dataset_is_parsed_once_with_compact_dtypes(tmp_path):
+    store = make_store(tmp_path)
+
+    frame = store.load('franchise')
+
+    assert frame['FrqAnual'].dtype == 'int32'
+    assert frame['CusInic'].tolist() == [1050, 1150]
+    assert store.load('franchise') is frame
+    assert store.loads == {'memory': 1, 'parquet': 0, 'csv': 1}
+
+
+def test_new_store_reads_the_parquet_copy(tmp_path):
+    make_store(tmp_path).load('franchise')
+    store = DatasetStore(tmp_path / 'data', tmp_path / 'parquet', {'franchise': DATASETS['franchise']})
+
+    frame = store.load('franchise')
+
+    assert frame['FrqAnual'].dtype == 'int32'
+    assert store.loads == {'memory': 0, 'parquet': 1, 'csv': 0}
+
+
+def test_edited_file_is_reloaded_and_touched_file_is_not(tmp_path):
+    store = make_store(tmp_path)
+    store.load('franchise')
+    version = store.version('franchise')
+    source = tmp_path / 'data' / 'franchise_linear_regression.csv'
+
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.version('franchise') == version
+    store.load('franchise')
+    assert store.loads['csv'] == 1
+
+    source.write_text(FRANCHISE + '1087;1213\n')
+    assert len(store.load('franchise')) == 3
+    assert store.version('franchise') != version
+    assert store.loads['csv'] == 2
+
+
+def test_chunks_stream_the_file_with_the_dataset_dtypes(tmp_path):
+    store = make_store(tmp_path, FRANCHISE + '1087;1213\n')
+
+    with store.chunks('franchise', chunk_size=2) as reader:
+        chunks = list(reader)
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[1]['CusInic'].dtype == 'int32'
+    assert store.loads == {'memory': 0, 'parquet': 0, 'csv': 0}
+
+
+def test_version_hashes_the_file_without_parsing_it(tmp_path):
+    store = make_store(tmp_path)
+
+    version = store.version('franchise')
+
+    assert version == hashlib.sha256(FRANCHISE.encode()).hexdigest()
+    assert store.loads == {'memory': 0, 'parquet': 0, 'csv': 0}
+    assert store._loaded == {}
+    store.load('franchise')
+    assert store.version('franchise') == version
@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+diffusion = pytest.importorskip('services.diffusion')
+
+POOL_SIZE = 2
+
+OPTIONS = {
+    'negative_prompt': '',
+    'num_images_per_prompt': 1,
+    'num_inference_steps': 2,
+    'height': 32,
+    'width': 32,
+    'seed': 42,
+    'guidance_scale': 7.5,
+}
+
+
+def test_pipeline_is_loaded_once_and_reused(tiny_pipeline_path):
+    pool = diffusion.PipelinePool(tiny_pipeline_path, size=1, device='cpu')
+
+    first, first_timings = diffusion.generate(pool, 'a red box', **OPTIONS)
+    second, _ = diffusion.generate(pool, 'a red box', **OPTIONS)
+
+    assert pool.stats()['loaded'] == 1
+    assert len(pool.load_times) == 1
+    assert first_timings['loading'] >= pool.load_times[0]
+    assert list(first[0].getdata()) == list(second[0].getdata())
+
+
+def test_pool_never_loads_more_than_its_size(tiny_pipeline_path):
+    pool = diffusion.PipelinePool(tiny_pipeline_path, size=POOL_SIZE, device='cpu')
+
+    threads = [
+        threading.Thread(target=diffusion.generate, args=(pool, f'prompt {index}'), kwargs=OPTIONS)
+        for index in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.stats()['loaded'] <= POOL_SIZE
+    assert pool.stats()['idle'] == pool.stats()['loaded']
@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from services.forecasting import fit_forecast, forecast_methods, run_in_pool
+
+TRAIN = pd.read_csv('data/monthly-milk-production-pounds-p.csv', header=None).iloc[:, 0]
+HORIZON = 6
+ALL_METHODS = {'naive': True, 'mean': True, 'drift': True, 'holt': True, 'hw': True, 'arima': False}
+
+
+def test_selected_methods_return_forecasts_and_timings():
+    forecasts, titles, timings = forecast_methods(TRAIN, HORIZON, ALL_METHODS)
+
+    assert titles == ['Naive', 'Mean', 'Drift', 'Holt', 'HW Additive']
+    assert all(len(forecast) == HORIZON for forecast in forecasts)
+    np.testing.assert_allclose(forecasts[0], TRAIN.iloc[-1])
+    assert [timing['status'] for timing in timings] == ['ok'] * 5
+    assert all(timing['fit_time'] >= 0 and timing['forecast_time'] >= 0 for timing in timings)
+
+
+def test_slow_method_times_out_without_blocking_the_others():
+    methods = {'naive': True, 'arima': True}
+
+    forecasts, titles, timings = forecast_methods(TRAIN, HORIZON, methods, timeout=0.01)
+
+    assert titles == ['Naive']
+    assert len(forecasts) == 1
+    assert timings[1] == {'method': 'ARIMA', 'status': 'timeout', 'fit_time': None, 'forecast_time': None}
+
+
+def test_timeouts_count_from_the_start_of_each_task():
+    # One worker runs the tasks one after the other; each one is within its own deadline.
+    tasks = {name: (time.sleep, (0.5,)) for name in ('a', 'b', 'c')}
+
+    results, statuses = run_in_pool(tasks, timeout=1.0, max_workers=1)
+
+    assert statuses == {}
+    assert set(results) == {'a', 'b', 'c'}
+
+
+def test_a_timeout_does_not_cancel_the_tasks_of_other_calls():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        slow = pool.submit(run_in_pool, {'arima': (fit_forecast, ('arima', TRAIN, HORIZON))}, 0.01)
+        other = pool.submit(run_in_pool, {'holt': (fit_forecast, ('holt', TRAIN, HORIZON))})
+
+    assert slow.result() == ({}, {'arima': 'timeout'})
+    results, statuses = other.result()
+    assert statuses == {}
+    assert len(results['holt'][0]) == HORIZON
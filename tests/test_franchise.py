@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from services.franchise import IncrementalOLS, predict_csv
+
+
+@pytest.fixture
+def observations():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(800, 2000, 200)
+    return x, 900 + 0.4 * x + rng.normal(0, 50, 200)
+
+
+def test_incremental_fit_matches_least_squares(observations):
+    x, y = observations
+
+    model = IncrementalOLS()
+    for start in range(0, len(x), 7):
+        model.update(x[start : start + 7], y[start : start + 7])
+    model.update(x[:0], y[:0])
+
+    slope, intercept = np.polyfit(x, y, 1)
+    assert model.n == len(x)
+    assert model.slope == pytest.approx(slope)
+    assert model.intercept == pytest.approx(intercept)
+    residuals = y - (intercept + slope * x)
+    assert model.residual_std == pytest.approx(np.sqrt(residuals @ residuals / (len(x) - 2)))
+    assert model.r2 == pytest.approx(np.corrcoef(x, y)[0, 1] ** 2)
+
+
+def test_prediction_interval_follows_the_ols_formula(observations):
+    x, y = observations
+    model = IncrementalOLS.fit(x, y)
+
+    prediction, lower, upper = model.interval([1000.0, 1500.0], level=0.9)
+
+    leverage = 1 + 1 / len(x) + (np.array([1000.0, 1500.0]) - x.mean()) ** 2 / ((x - x.mean()) ** 2).sum()
+    margin = stats.t.ppf(0.95, len(x) - 2) * model.residual_std * np.sqrt(leverage)
+    np.testing.assert_allclose(upper - prediction, margin)
+    np.testing.assert_allclose(prediction - lower, margin)
+
+
+def test_csv_predictions_keep_the_input_columns(observations):
+    model = IncrementalOLS.fit(*observations)
+    source = io.BytesIO(b'nome;FrqAnual\nCentro;1500\nBairro;abc\nNorte;1200.5\n')
+
+    data, n_rows = predict_csv(model, source, chunk_size=2)
+
+    result = pd.read_csv(io.BytesIO(data), sep=';')
+    assert n_rows == 3
+    assert result['nome'].tolist() == ['Centro', 'Bairro', 'Norte']
+    assert result['previsao'].iloc[0] == pytest.approx(model.predict(1500.0), abs=0.005)
+    assert result['previsao'].isna().tolist() == [False, True, False]
+    assert (result['limite_inferior'] < result['previsao']).iloc[[0, 2]].all()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+diffusion = pytest.importorskip('services.diffusion')
+generation_queue = pytest.importorskip('services.generation_queue')
+
+SETTINGS = {'num_inference_steps': 2, 'height': 32, 'width': 32, 'guidance_scale': 7.5}
+
+
+def submit(queue, prompt, seed):
+    return queue.submit(prompt, '', 1, seed=seed, **SETTINGS)
+
+
+def test_compatible_requests_share_a_batch_and_keep_their_seeds(tiny_pipeline_path):
+    pool = diffusion.PipelinePool(tiny_pipeline_path, size=1, device='cpu')
+    queue = generation_queue.GenerationQueue(pool, batch_window=0.5)
+
+    results = [future.result() for future in [submit(queue, f'prompt {seed}', seed) for seed in range(3)]]
+
+    assert [timings['batch_size'] for _, timings in results] == [3, 3, 3]
+    assert all(timings['loading'] >= 0 and timings['inference'] > 0 for _, timings in results)
+    for seed, (images, _) in enumerate(results):
+        expected, _ = diffusion.generate(pool, f'prompt {seed}', '', 1, seed=seed, **SETTINGS)
+        np.testing.assert_allclose(np.asarray(images[0], dtype=float), np.asarray(expected[0], dtype=float), atol=2)
+
+
+def test_full_queue_rejects_new_requests(tiny_pipeline_path):
+    pool = diffusion.PipelinePool(tiny_pipeline_path, size=1, device='cpu')
+    queue = generation_queue.GenerationQueue(pool, max_queue=0)
+
+    with pytest.raises(generation_queue.QueueFullError):
+        submit(queue, 'prompt', 0)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from benchmarks.common import synthetic_manifest
+from services.cargo import item_arrays
+from services.genetic import iterate_island_ga, run_island_ga
+
+DATA = synthetic_manifest(200, seed=3)
+ITEMS = item_arrays(DATA)
+MAX_WEIGHT = DATA['PESO'].sum() / 4
+MAX_VOLUME = DATA['VOLUME'].sum() / 4
+MAX_GENERATIONS = 500
+
+
+def test_same_seed_gives_same_result_in_process_and_in_pool():
+    options = {'n_islands': 2, 'population_size': 20, 'max_generations': 30, 'seed': 5}
+
+    inline = run_island_ga(ITEMS, MAX_VOLUME, MAX_WEIGHT, processes=0, **options)
+    pooled = run_island_ga(ITEMS, MAX_VOLUME, MAX_WEIGHT, processes=2, **options)
+
+    assert inline['best_value'] == pooled['best_value']
+    np.testing.assert_array_equal(inline['variable'], pooled['variable'])
+
+
+def test_progress_is_reported_for_every_generation_and_result_is_feasible():
+    progress = list(iterate_island_ga(ITEMS, MAX_VOLUME, MAX_WEIGHT, max_generations=25, processes=0))
+
+    assert [item['generation'] for item in progress[:-1]] == list(range(1, 26))
+    assert all(a['best_value'] <= b['best_value'] for a, b in zip(progress[:-2], progress[1:-1]))
+    result = progress[-1]
+    assert result['done']
+    assert result['variable'] @ ITEMS[:, 0] <= MAX_WEIGHT
+    assert result['variable'] @ ITEMS[:, 1] <= MAX_VOLUME
+    assert result['variable'] @ ITEMS[:, 2] == result['best_value']
+
+
+def test_stops_early_when_target_is_reached():
+    result = run_island_ga(ITEMS, MAX_VOLUME, MAX_WEIGHT, max_generations=MAX_GENERATIONS, target_value=1, processes=0)
+
+    assert result['stopped_by'] == 'target_value'
+    assert result['generation'] < MAX_GENERATIONS
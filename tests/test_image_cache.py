@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+from PIL import Image
+
+from services.image_cache import ImageCache, model_fingerprint
+
+REQUEST = ('a red car', '', 1, 20, 64, 64, 42, 7.5)
+
+
+def make_image(value):
+    return Image.fromarray(np.full((8, 8, 3), value, dtype=np.uint8))
+
+
+def test_key_normalizes_equivalent_requests():
+    assert ImageCache.key(*REQUEST) == ImageCache.key('a red car', None, 1.0, 20, 64, 64, 42, 7.5)
+    assert ImageCache.key(*REQUEST) != ImageCache.key('a red car', '', 1, 20, 64, 64, 43, 7.5)
+
+
+def test_images_round_trip_losslessly(tmp_path):
+    cache = ImageCache('model', directory=tmp_path)
+    key = cache.key(*REQUEST)
+
+    assert cache.get(key) is None
+    cache.set(key, [make_image(10), make_image(200)])
+    images = cache.get(key)
+
+    assert [np.asarray(image)[0, 0, 0] for image in images] == [10, 200]
+
+
+def test_fingerprint_follows_local_scheduler_config(tmp_path):
+    (tmp_path / 'scheduler').mkdir()
+    config = tmp_path / 'scheduler' / 'scheduler_config.json'
+    config.write_text(json.dumps({'beta_start': 0.00085}))
+    before = model_fingerprint(str(tmp_path), 'EulerDiscreteScheduler')
+
+    config.write_text(json.dumps({'beta_start': 0.001}))
+
+    assert model_fingerprint(str(tmp_path), 'EulerDiscreteScheduler') != before
+    assert model_fingerprint('some/model', 'EulerDiscreteScheduler') != model_fingerprint('some/model', 'DDIMScheduler')
+
+
+def test_prune_other_models_keeps_current_fingerprint(tmp_path):
+    old = ImageCache('old', directory=tmp_path)
+    current = ImageCache('current', directory=tmp_path)
+    key = current.key(*REQUEST)
+    old.set(key, [make_image(1)])
+    current.set(key, [make_image(2)])
+
+    current.prune_other_models()
+
+    assert not (tmp_path / 'old').exists()
+    assert current.get(key) is not None
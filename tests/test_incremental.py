@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.common import synthetic_baskets
+from services.cache import DiskCache
+from services.incremental import IncrementalMiner, merge_batch
+from services.itemsets import eclat
+from services.transactions import encode_transactions
+
+
+def as_dict(itemsets):
+    return {itemset: round(support, 12) for itemset, support in zip(itemsets['itemsets'], itemsets['support'])}
+
+
+@pytest.mark.parametrize('min_support', [0.01, 0.003])
+def test_updates_match_full_mining(min_support):
+    lines = synthetic_baskets(6_000, 80, mean_size=6)
+    miner = IncrementalMiner.from_transactions(encode_transactions(lines[:4_000]), min_support)
+
+    # Small and large batches, one of them bringing items never seen before.
+    for start, end in ((4_000, 4_050), (4_050, 5_000), (5_000, 6_000)):
+        batch = lines[start:end] + ['NEW1,NEW2,SKU000001'] * ((end - start) // 4)
+        miner.update(encode_transactions(batch))
+
+        assert as_dict(miner.itemsets()) == as_dict(eclat(miner.history, min_support))
+
+
+def test_merge_batch_reuses_stored_miners(tmp_path):
+    cache = DiskCache(tmp_path)
+    lines = synthetic_baskets(1_000, 30)
+    transactions = encode_transactions(lines[:800])
+
+    first = merge_batch(cache, 'file', transactions, 0.02, 'batch', lines[800:])
+    second = merge_batch(cache, 'file', transactions, 0.02, 'batch', None)
+
+    assert first[0] == second[0]
+    assert second[1].n_transactions == 1_000
+    assert as_dict(second[1].itemsets()) == as_dict(eclat(encode_transactions(lines), 0.02))
+
+
+def test_batches_chain_onto_the_merged_log(tmp_path):
+    cache = DiskCache(tmp_path)
+    lines = synthetic_baskets(1_200, 30, seed=2)
+
+    merged, _ = merge_batch(cache, 'file', encode_transactions(lines[:800]), 0.02, 'first', lines[800:1_000])
+    _, miner = merge_batch(cache, merged, None, 0.02, 'second', lines[1_000:])
+
+    assert miner.n_transactions == 1_200
+    assert as_dict(miner.itemsets()) == as_dict(eclat(encode_transactions(lines), 0.02))
+    with pytest.raises(ValueError, match='no longer stored'):
+        merge_batch(cache, 'evicted', None, 0.02, 'third', lines[:10])
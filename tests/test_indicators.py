@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from services.cache import DiskCache
+from services.indicators import INDICATORS, IndicatorCache, compute_indicators, correlation
+
+
+def random_prices(n_days=300, tickers=('AAA', 'BBB', 'CCC'), seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2020-01-01', periods=n_days)
+    walks = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, len(tickers))), axis=0))
+    return pd.DataFrame(walks, index=days, columns=list(tickers))
+
+
+def test_wide_pass_matches_each_ticker_on_its_own_days():
+    matrix = random_prices()
+    matrix.iloc[:40, 1] = np.nan
+    matrix.iloc[100, 2] = np.nan
+
+    indicators = compute_indicators(matrix)
+
+    for ticker in matrix.columns:
+        alone = compute_indicators(matrix[[ticker]].dropna())
+        for name in INDICATORS:
+            expected = alone[name][ticker]
+            pd.testing.assert_series_equal(indicators[name][ticker].loc[expected.index], expected)
+    assert indicators['mms']['BBB'].iloc[:40].isna().all()
+
+
+def test_indicators_match_their_definitions():
+    close = random_prices(tickers=('AAA',))['AAA']
+
+    indicators = compute_indicators(close.to_frame())
+
+    np.testing.assert_allclose(indicators['mms']['AAA'].iloc[19], close.iloc[:20].mean())
+    np.testing.assert_allclose(
+        indicators['bollinger_superior']['AAA'].iloc[19], close.iloc[:20].mean() + 2 * close.iloc[:20].std(ddof=0)
+    )
+    np.testing.assert_allclose(indicators['retorno']['AAA'].iloc[1], close.iloc[1] / close.iloc[0] - 1)
+    rising = compute_indicators(pd.DataFrame({'UP': np.arange(1.0, 50.0)}))
+    assert (rising['ifr']['UP'].dropna() == 100).all()
+
+
+def test_correlation_matches_pairwise_complete_correlation():
+    returns = compute_indicators(random_prices(tickers=('AAA', 'BBB', 'CCC', 'DDD')))['retorno']
+    returns.iloc[50:80, 0] = np.nan
+
+    pd.testing.assert_frame_equal(correlation(returns), returns.corr(), atol=1e-10)
+
+
+def test_cache_computes_only_the_new_tickers(tmp_path):
+    matrix = random_prices()
+    cache = IndicatorCache(DiskCache(tmp_path))
+
+    cache.indicators(matrix[['AAA', 'BBB']], '2020-01-01', '2021-03-01')
+    indicators = cache.indicators(matrix, '2020-01-01', '2021-03-01')
+
+    assert cache.cache.stats()['entries'] == 3
+    assert cache.cache.hits == 2
+    for name, frame in compute_indicators(matrix).items():
+        pd.testing.assert_frame_equal(indicators[name], frame)
@@ -0,0 +1,71 @@
+import pytest
+
+import services.itemsets as itemsets_module
+from benchmarks.common import synthetic_baskets
+from services.cache import DiskCache
+from services.itemsets import ENGINES, MiningCache, frequent_itemsets
+from services.transactions import encode_transactions
+
+
+def as_dict(itemsets):
+    return {itemset: round(support, 12) for itemset, support in zip(itemsets['itemsets'], itemsets['support'])}
+
+
+@pytest.mark.parametrize('max_len', [None, 1, 2, 3])
+def test_engines_find_the_same_itemsets(max_len):
+    transactions = encode_transactions(synthetic_baskets(2_000, 60, mean_size=6))
+
+    results = [as_dict(frequent_itemsets(transactions, 0.01, engine, max_len)) for engine in ENGINES]
+
+    assert results[0] == results[1] == results[2]
+    assert max(map(len, results[0])) == (max_len or max(map(len, results[0])))
+
+
+def test_eclat_counts_small_baskets():
+    transactions = encode_transactions(['a,b,c', 'a,b', 'a,c', 'b'])
+
+    itemsets = as_dict(frequent_itemsets(transactions, 0.5, 'eclat'))
+
+    assert itemsets == {
+        frozenset('a'): 0.75,
+        frozenset('b'): 0.75,
+        frozenset('c'): 0.5,
+        frozenset('ab'): 0.5,
+        frozenset('ac'): 0.5,
+    }
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError, match='Unknown engine'):
+        frequent_itemsets(encode_transactions(['a']), 0.5, 'lcm')
+
+
+def test_mining_cache_filters_runs_at_lower_support(tmp_path, monkeypatch):
+    cache = MiningCache(DiskCache(tmp_path))
+    lines = synthetic_baskets(2_000, 60, mean_size=6)
+    transactions = cache.transactions('file', lines)
+    mined = []
+    monkeypatch.setattr(
+        itemsets_module, 'frequent_itemsets', lambda *args: mined.append(args) or frequent_itemsets(*args)
+    )
+
+    low = cache.itemsets('file', transactions, 0.01)
+    high = cache.itemsets('file', transactions, 0.05)
+
+    assert len(mined) == 1
+    assert as_dict(high) == as_dict(frequent_itemsets(transactions, 0.05))
+    assert len(high) < len(low)
+    assert cache.transactions('file', None).items == transactions.items
+
+
+def test_mining_cache_keeps_the_last_baskets_decoded(tmp_path):
+    disk = DiskCache(tmp_path)
+    cache = MiningCache(disk, memory_entries=1)
+    first = cache.transactions('first', synthetic_baskets(100, 10))
+
+    assert cache.transactions('first', None) is first
+    assert disk.hits == 0
+
+    cache.transactions('second', synthetic_baskets(100, 10, seed=1))
+    assert cache.transactions('first', None).items == first.items
+    assert disk.hits == 1
@@ -0,0 +1,58 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from services.knapsack import solve_cargo, solve_knapsack
+
+MAX_WEIGHT = 6000
+MAX_VOLUME = 350
+
+
+def brute_force(weights, volumes, values, max_weight, max_volume):
+    best = 0
+    for bits in product((0, 1), repeat=len(values)):
+        selection = np.array(bits)
+        if selection @ weights <= max_weight and selection @ volumes <= max_volume:
+            best = max(best, selection @ values)
+    return best
+
+
+def test_matches_brute_force_on_small_instances():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        weights, volumes, values = rng.integers(1, 50, (3, 12))
+        max_weight, max_volume = weights.sum() / 3, volumes.sum() / 2
+
+        result = solve_knapsack(weights, volumes, values, max_weight, max_volume)
+
+        assert result['optimal']
+        assert result['value'] == brute_force(weights, volumes, values, max_weight, max_volume)
+        assert result['variable'] @ weights <= max_weight
+        assert result['variable'] @ volumes <= max_volume
+        assert result['gap'] == 0
+
+
+def test_time_budget_returns_feasible_solution_with_bound():
+    rng = np.random.default_rng(0)
+    weights, volumes, values = rng.integers(100, 1000, (3, 3000))
+    max_weight, max_volume = weights.sum() / 4, volumes.sum() / 4
+
+    result = solve_knapsack(weights, volumes, values, max_weight, max_volume, time_budget=0.05)
+
+    assert result['variable'] @ weights <= max_weight
+    assert result['variable'] @ volumes <= max_volume
+    assert result['value'] <= result['bound']
+    assert 0 <= result['gap'] < 1
+
+
+def test_solve_cargo_reads_manifest_columns():
+    data = pd.read_csv('data/Itens.csv', sep=';')
+
+    result = solve_cargo(data, max_volume=MAX_VOLUME, max_weight=MAX_WEIGHT)
+
+    selected = data.iloc[result['variable'].astype(bool), :]
+    assert result['optimal']
+    assert selected['PESO'].sum() <= MAX_WEIGHT
+    assert selected['VOLUME'].sum() <= MAX_VOLUME
+    assert selected['VALOR'].sum() == result['value']
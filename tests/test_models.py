@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from services import models
+from services.models import ModelRegistry
+
+
+def counting_fit(calls, value):
+    def fit():
+        calls.append(value)
+        time.sleep(0.05)
+        return {'coefficient': value}, {'score': 1.0}
+
+    return fit
+
+
+def test_model_is_fitted_once_and_loaded_by_other_registries(tmp_path):
+    calls = []
+    registry = ModelRegistry(tmp_path)
+
+    model, metadata = registry.get_or_fit('linear', 'data-v1', {'alpha': 1}, counting_fit(calls, 2))
+    again, _ = registry.get_or_fit('linear', 'data-v1', {'alpha': 1}, counting_fit(calls, 3))
+    stored, stored_metadata = ModelRegistry(tmp_path).get_or_fit(
+        'linear', 'data-v1', {'alpha': 1}, counting_fit(calls, 4)
+    )
+
+    assert calls == [2]
+    assert model is again
+    assert stored == {'coefficient': 2}
+    assert stored_metadata == metadata
+    assert metadata['metrics'] == {'score': 1.0}
+    assert metadata['fit_time'] > 0
+
+
+def test_new_data_parameters_or_library_versions_refit(tmp_path, monkeypatch):
+    calls = []
+    ModelRegistry(tmp_path).get_or_fit('linear', 'data-v1', {'alpha': 1}, counting_fit(calls, 1))
+
+    registry = ModelRegistry(tmp_path)
+    registry.get_or_fit('linear', 'data-v2', {'alpha': 1}, counting_fit(calls, 2))
+    registry.get_or_fit('linear', 'data-v1', {'alpha': 2}, counting_fit(calls, 3))
+    monkeypatch.setattr(models, 'library_versions', lambda: {'scikit-learn': 'other'})
+    ModelRegistry(tmp_path).get_or_fit('linear', 'data-v1', {'alpha': 1}, counting_fit(calls, 4))
+
+    assert calls == [1, 2, 3, 4]
+
+
+def test_concurrent_requests_share_one_fit(tmp_path):
+    calls = []
+    registry = ModelRegistry(tmp_path)
+    threads = [
+        threading.Thread(target=registry.get_or_fit, args=('linear', 'data', {}, counting_fit(calls, 1)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+
+
+def test_warm_loads_the_newest_model_of_each_name(tmp_path):
+    calls = []
+    registry = ModelRegistry(tmp_path)
+    registry.get_or_fit('linear', 'data-v1', {}, counting_fit(calls, 1))
+    registry.get_or_fit('linear', 'data-v2', {}, counting_fit(calls, 2))
+
+    warm = ModelRegistry(tmp_path)
+    assert warm.warm() == ['linear']
+    model, _ = warm.get_or_fit('linear', 'data-v2', {}, counting_fit(calls, 3))
+
+    assert model == {'coefficient': 2}
+    assert warm.loads == {'memory': 1, 'disk': 0}
+
+
+def test_least_recently_used_models_are_evicted(tmp_path):
+    calls = []
+    registry = ModelRegistry(tmp_path, max_models=2)
+    for version in (1, 2, 3):
+        registry.get_or_fit('linear', f'data-v{version}', {}, counting_fit(calls, version))
+    size = sum(path.stat().st_size for path in tmp_path.rglob('*.*'))
+
+    assert len(registry._models) == 2
+    registry.get_or_fit('linear', 'data-v1', {}, counting_fit(calls, 4))
+    assert registry.loads == {'memory': 0, 'disk': 1}
+
+    small = ModelRegistry(tmp_path, max_bytes=size // 2)
+    small.evict()
+    assert len(list(tmp_path.rglob('*.json'))) == len(list(tmp_path.rglob('*.joblib'))) == 1
+    # The model read last is the one kept.
+    small.get_or_fit('linear', 'data-v1', {}, counting_fit(calls, 5))
+    assert calls == [1, 2, 3]
+
+
+def test_failed_fit_leaves_no_pending_entry(tmp_path):
+    registry = ModelRegistry(tmp_path)
+
+    def failing_fit():
+        raise RuntimeError('singular matrix')
+
+    with pytest.raises(RuntimeError):
+        registry.get_or_fit('linear', 'data', {}, failing_fit)
+
+    assert registry._fitting == {}
+    assert registry._models == {}
@@ -0,0 +1,128 @@
+import io
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from services.normality import (
+    FULL_DATA,
+    SAMPLE,
+    Reservoir,
+    StreamingHistogram,
+    StreamingMoments,
+    TooFewValuesError,
+    qq_points,
+    stream_normality,
+)
+
+
+def csv_of(values):
+    return io.BytesIO('\n'.join(str(value) for value in values).encode())
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 1000])
+def test_moments_merged_by_chunk_match_the_full_data(chunk):
+    values = np.random.default_rng(0).gamma(2.0, 3.0, 1000) + 1e6
+    moments = StreamingMoments()
+
+    for start in range(0, len(values), chunk):
+        moments.update(values[start : start + chunk])
+
+    assert moments.n == 1000
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.std == pytest.approx(values.std(ddof=1))
+    assert moments.skewness == pytest.approx(stats.skew(values))
+    assert moments.kurtosis == pytest.approx(stats.kurtosis(values, fisher=False))
+
+
+def test_histogram_counts_stay_exact_when_the_range_grows():
+    values = np.random.default_rng(1).standard_t(3, 20_000)
+    histogram = StreamingHistogram(16)
+
+    # The first chunk spans a small part of the range.
+    for chunk in np.array_split(np.sort(values[:100]).tolist() + values[100:].tolist(), 40):
+        histogram.update(np.asarray(chunk))
+
+    bins = np.floor((values - histogram.origin) / histogram.width).astype(np.int64) - histogram.first
+    expected = np.bincount(bins, minlength=16)
+    assert histogram.edges[0] <= values.min()
+    assert histogram.edges[-1] >= values.max()
+    np.testing.assert_array_equal(histogram.counts, expected)
+
+
+def test_reservoir_is_a_uniform_sample_of_the_stream():
+    stream = np.arange(200_000, dtype=np.float64)
+    reservoir = Reservoir(2000, seed=3)
+
+    for chunk in np.array_split(stream, 37):
+        reservoir.update(chunk)
+
+    sample = reservoir.sample
+    assert len(sample) == len(np.unique(sample)) == 2000
+    assert stats.kstest(sample, 'uniform', args=(0, 200_000)).pvalue > 0.01
+
+
+def test_small_files_are_tested_on_every_value():
+    values = np.random.default_rng(4).normal(10, 2, 500)
+
+    summary = stream_normality(csv_of([*values, 'x']), chunk_size=64)
+
+    tests = summary['tests'].set_index('teste')
+    assert summary['missing'] == 1
+    assert set(tests['base']) == {FULL_DATA}
+    assert tests.loc['Shapiro-Wilk', 'valor_p'] == pytest.approx(stats.shapiro(values).pvalue)
+    assert tests.loc["D'Agostino-Pearson", 'valor_p'] == pytest.approx(stats.normaltest(values).pvalue)
+    assert tests.loc['Jarque-Bera', 'valor_p'] == pytest.approx(stats.jarque_bera(values).pvalue)
+
+
+def test_files_too_short_for_the_moment_tests_still_get_shapiro_wilk():
+    values = [4.1, 5.3, 3.8, 6.0, 4.7]
+
+    tests = stream_normality(csv_of(values))['tests'].set_index('teste')
+
+    assert "D'Agostino-Pearson" not in tests.index
+    assert tests.loc['Shapiro-Wilk', 'base'] == FULL_DATA
+    assert tests.loc['Shapiro-Wilk', 'valor_p'] == pytest.approx(stats.shapiro(values).pvalue)
+    with pytest.raises(TooFewValuesError) as error:
+        stream_normality(csv_of([1.0, 'x', 2.0]))
+    assert error.value.n == 2
+
+
+def test_reservoir_keeps_the_latest_value_of_a_slot_drawn_twice():
+    reservoir = Reservoir(1, seed=0)
+
+    # Every value after the first replaces the single slot with probability 1 / (i + 1).
+    reservoir.update(np.arange(1000, dtype=np.float64))
+    generator = np.random.default_rng(0)
+    slots = generator.integers(0, np.arange(1, 1000) + 1)
+
+    assert reservoir.sample.tolist() == [float(np.flatnonzero(slots == 0)[-1] + 1)]
+
+
+def test_large_files_report_which_tests_used_a_sample():
+    values = np.random.default_rng(5).exponential(1.0, 20_000)
+
+    summary = stream_normality(csv_of(values), chunk_size=3000, sample_size=1000)
+
+    tests = summary['tests'].set_index('teste')
+    assert tests.loc["D'Agostino-Pearson", 'base'] == FULL_DATA
+    assert tests.loc["D'Agostino-Pearson", 'n'] == 20_000
+    assert tests.loc['Shapiro-Wilk', 'base'] == SAMPLE
+    assert tests.loc['Anderson-Darling', 'n'] == 1000
+    assert (tests['valor_p'] < 0.001).all()
+
+
+def test_qq_plot_of_large_files_has_a_fixed_number_of_quantiles():
+    small = np.random.default_rng(6).normal(size=150)
+    large = np.random.default_rng(7).normal(5, 2, 50_000)
+
+    (theoretical, observed), _ = stats.probplot(small)
+    small_points = qq_points(stream_normality(csv_of(small), chunk_size=64)['sketch'], n_points=400)
+    large_points = qq_points(stream_normality(csv_of(large), chunk_size=5000)['sketch'], n_points=100)
+
+    np.testing.assert_allclose(small_points[0], theoretical)
+    np.testing.assert_allclose(small_points[1], observed)
+    assert len(large_points[1]) == 100
+    slope, intercept = np.polyfit(*large_points, 1)
+    assert slope == pytest.approx(2, rel=0.05)
+    assert intercept == pytest.approx(5, abs=0.05)
@@ -0,0 +1,154 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.prices import (
+    PRICE_COLUMNS,
+    CsvSource,
+    MissingPricesError,
+    PriceSource,
+    PriceStore,
+    missing_ranges,
+    validate_ticker,
+)
+
+
+class BusinessDaySource(PriceSource):
+    """Made-up prices on every weekday, counting the requested ranges."""
+
+    name = 'business-days'
+
+    def __init__(self):
+        self.requests = []
+
+    def fetch(self, ticker, start, end):
+        self.requests.append((start, end))
+        days = pd.bdate_range(start, end, inclusive='left')
+        values = np.arange(len(days), dtype=np.float64) + days.day
+        return pd.DataFrame({column: values for column in PRICE_COLUMNS}, index=days)
+
+
+def test_missing_ranges_are_the_gaps_around_the_covered_ranges():
+    covered = [(date(2020, 1, 5), date(2020, 1, 10)), (date(2020, 1, 15), date(2020, 1, 20))]
+
+    assert missing_ranges(covered, date(2020, 1, 1), date(2020, 1, 25)) == [
+        (date(2020, 1, 1), date(2020, 1, 5)),
+        (date(2020, 1, 10), date(2020, 1, 15)),
+        (date(2020, 1, 20), date(2020, 1, 25)),
+    ]
+    assert missing_ranges(covered, date(2020, 1, 6), date(2020, 1, 9)) == []
+    assert missing_ranges(covered, date(2020, 1, 8), date(2020, 1, 16)) == [(date(2020, 1, 10), date(2020, 1, 15))]
+
+
+def test_only_the_gaps_are_fetched_and_merged(tmp_path):
+    source = BusinessDaySource()
+    store = PriceStore(source, tmp_path, today=lambda: date(2021, 1, 1))
+
+    first = store.get('AAPL', date(2020, 1, 6), date(2020, 1, 18))
+    inside = store.get('AAPL', date(2020, 1, 8), date(2020, 1, 10))
+    wider = store.get('AAPL', date(2020, 1, 1), date(2020, 1, 25))
+
+    assert source.requests == [
+        (date(2020, 1, 6), date(2020, 1, 18)),
+        (date(2020, 1, 1), date(2020, 1, 6)),
+        (date(2020, 1, 18), date(2020, 1, 25)),
+    ]
+    assert list(first.columns) == list(PRICE_COLUMNS)
+    assert len(first) == 10
+    assert inside.index.tolist() == [pd.Timestamp('2020-01-08'), pd.Timestamp('2020-01-09')]
+    assert wider.index.equals(pd.bdate_range('2020-01-01', '2020-01-24').rename('Date'))
+    assert store.covered('AAPL') == [(date(2020, 1, 1), date(2020, 1, 25))]
+
+
+def test_new_store_reads_the_prices_and_ranges_from_disk(tmp_path):
+    PriceStore(BusinessDaySource(), tmp_path, today=lambda: date(2021, 1, 1)).get(
+        'MSFT', date(2020, 3, 2), date(2020, 3, 7)
+    )
+    source = BusinessDaySource()
+    store = PriceStore(source, tmp_path, today=lambda: date(2021, 1, 1))
+
+    # The weekend holds no prices but was covered by the first request.
+    prices = store.get('MSFT', date(2020, 3, 2), date(2020, 3, 9))
+
+    assert source.requests == [(date(2020, 3, 7), date(2020, 3, 9))]
+    assert len(prices) == 5
+
+
+def test_days_from_today_on_are_fetched_again(tmp_path):
+    source = BusinessDaySource()
+    store = PriceStore(source, tmp_path, today=lambda: date(2020, 1, 9))
+
+    store.get('TSLA', date(2020, 1, 6), date(2020, 1, 11))
+    store.get('TSLA', date(2020, 1, 6), date(2020, 1, 11))
+
+    assert source.requests == [(date(2020, 1, 6), date(2020, 1, 11)), (date(2020, 1, 9), date(2020, 1, 11))]
+
+
+def test_csv_source_reads_the_requested_days(tmp_path):
+    days = pd.bdate_range('2020-01-01', periods=10, name='Date')
+    pd.DataFrame({column: range(10) for column in PRICE_COLUMNS}, index=days).to_csv(tmp_path / 'GOOGL.csv')
+    store = PriceStore(CsvSource(tmp_path), tmp_path / 'store')
+
+    prices = store.get('GOOGL', date(2020, 1, 3), date(2020, 1, 8))
+
+    assert prices['Close'].tolist() == [2.0, 3.0, 4.0]
+    assert store.get('NONE', date(2020, 1, 3), date(2020, 1, 8)).empty
+
+
+def test_get_many_loads_every_ticker_and_reports_the_errors(tmp_path):
+    class FailingSource(BusinessDaySource):
+        def fetch(self, ticker, start, end):
+            if ticker == 'FAIL':
+                raise ConnectionError('timeout')
+            return super().fetch(ticker, start, end)
+
+    source = FailingSource()
+    store = PriceStore(source, tmp_path, today=lambda: date(2021, 1, 1))
+
+    prices, errors = store.get_many(
+        ['AAPL', 'FAIL', 'MSFT', 'AAPL'], date(2020, 1, 6), date(2020, 1, 11), max_workers=2
+    )
+
+    assert list(prices) == ['AAPL', 'MSFT']
+    assert all(len(frame) == 5 for frame in prices.values())
+    assert errors == {'FAIL': 'timeout'}
+    assert len(source.requests) == 2
+
+
+def test_an_unconfirmed_empty_answer_is_fetched_again(tmp_path):
+    class ThrottledSource(BusinessDaySource):
+        throttled = True
+
+        def fetch(self, ticker, start, end):
+            prices = super().fetch(ticker, start, end)
+            return prices.iloc[:0] if self.throttled else prices
+
+    source = ThrottledSource()
+    store = PriceStore(source, tmp_path, today=lambda: date(2021, 1, 1))
+
+    with pytest.raises(MissingPricesError):
+        store.get('AAPL', date(2020, 1, 6), date(2020, 1, 11))
+    source.throttled = False
+    prices = store.get('AAPL', date(2020, 1, 6), date(2020, 1, 11))
+
+    assert len(prices) == 5
+    assert source.requests == [(date(2020, 1, 6), date(2020, 1, 11))] * 2
+    assert store.covered('AAPL') == [(date(2020, 1, 6), date(2020, 1, 11))]
+
+
+@pytest.mark.parametrize('ticker', ['../../ESCAPED', 'A/B', 'aapl', '', 'X' * 16])
+def test_tickers_that_are_not_symbols_are_rejected(tmp_path, ticker):
+    store = PriceStore(CsvSource(tmp_path / 'files'), tmp_path / 'store', today=lambda: date(2021, 1, 1))
+
+    with pytest.raises(ValueError, match='Invalid ticker'):
+        store.get(ticker, date(2020, 1, 6), date(2020, 1, 11))
+    with pytest.raises(ValueError, match='Invalid ticker'):
+        store.source.fetch(ticker, date(2020, 1, 6), date(2020, 1, 11))
+    assert list(tmp_path.rglob('*')) == []
+
+
+def test_exchange_symbols_are_valid_tickers():
+    for ticker in ['AAPL', 'BRK-B', 'PETR4.SA', '^BVSP', 'BRL=X']:
+        assert validate_ticker(ticker) == ticker
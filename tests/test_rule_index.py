@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from mlxtend.frequent_patterns import association_rules
+
+from benchmarks.common import synthetic_baskets
+from services.cache import DiskCache, cache_key
+from services.itemsets import MiningCache, frequent_itemsets
+from services.rule_index import RuleIndex
+from services.transactions import encode_transactions
+
+
+@pytest.fixture(scope='module')
+def rules():
+    transactions = encode_transactions(synthetic_baskets(3_000, 40, mean_size=6))
+    return association_rules(frequent_itemsets(transactions, 0.01), metric='confidence', min_threshold=0.1)
+
+
+def brute_force(rules, basket, top_k):
+    """Scan every rule, as the page did before the index existed."""
+    basket = frozenset(basket)
+    matches = rules[rules['antecedents'].map(basket.issuperset) & ~rules['consequents'].map(basket.issuperset)]
+    matches = matches.sort_values(['lift', 'confidence'], ascending=False, kind='stable')
+    return matches.drop_duplicates('consequents').head(top_k)
+
+
+def test_recommend_matches_a_full_scan(rules):
+    index = RuleIndex.from_rules(rules, top_k=len(rules))
+    rng = np.random.default_rng(0)
+    items = sorted(set().union(*rules['antecedents']))
+
+    for size in (0, 1, 3, 8, 20):
+        basket = rng.choice(items, size, replace=False).tolist() + ['unknown']
+        expected = brute_force(rules, basket, 5)
+        found = index.recommend(basket, top_k=5)
+
+        assert found['consequents'].tolist() == expected['consequents'].tolist()
+        np.testing.assert_allclose(found['lift'], expected['lift'])
+
+
+def test_batch_scoring_matches_single_queries(rules, tmp_path):
+    index = RuleIndex.from_rules(rules, top_k=3)
+    index.save(tmp_path / 'rules.npz')
+    loaded = RuleIndex.load(tmp_path / 'rules.npz')
+    baskets = encode_transactions(synthetic_baskets(50, 45, mean_size=5, seed=1))
+
+    batch = loaded.recommend_many(baskets, top_k=4)
+
+    for row, basket in enumerate(baskets.baskets(range(baskets.n_transactions))):
+        single = index.recommend(basket, top_k=4)
+        assert batch.loc[batch['cesta'] == row, 'consequents'].tolist() == single['consequents'].tolist()
+
+
+def test_mining_cache_stores_the_index_in_npz_form(rules, tmp_path):
+    cache = MiningCache(DiskCache(tmp_path))
+
+    first = cache.rule_index('file', (0.01, 0.1), rules)
+    again = cache.rule_index('file', (0.01, 0.1), rules.iloc[:0])
+
+    assert first.n_rules == again.n_rules == RuleIndex.from_rules(rules).n_rules
+    np.testing.assert_array_equal(first.top_lift, again.top_lift)
+    assert cache.cache.get(cache_key('rule_index', 'file', (0.01, 0.1)))[:2] == b'PK'
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.sketches import KLLSketch, describe
+
+
+def true_ranks(values, quantiles):
+    return np.searchsorted(np.sort(values), quantiles, side='right') / len(values)
+
+
+def test_small_columns_are_summarized_exactly():
+    values = np.random.default_rng(0).normal(size=150)
+    sketch = KLLSketch().update(values[:50]).update(values[50:])
+    probabilities = np.linspace(0, 1, 11)
+
+    assert sketch.exact
+    assert sketch.rank_error() == 0
+    np.testing.assert_allclose(sketch.quantiles(probabilities), np.quantile(values, probabilities))
+
+
+def test_quantiles_stay_within_the_stated_rank_error():
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    sketch = KLLSketch(k=100)
+    probabilities = np.linspace(0.05, 0.95, 19)
+
+    for chunk in np.array_split(values, 300):
+        sketch.update(chunk)
+
+    errors = np.abs(true_ranks(values, sketch.quantiles(probabilities)) - probabilities)
+    assert not sketch.exact
+    assert sketch.size < 4 * sketch.k
+    assert errors.max() <= sketch.rank_error()
+    assert sketch.quantiles([0, 1]).tolist() == [values.min(), values.max()]
+
+
+def test_sketches_built_in_parallel_merge_into_one():
+    values = np.random.default_rng(2).exponential(size=400_000)
+    probabilities = np.linspace(0.1, 0.9, 9)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        parts = list(pool.map(lambda part: KLLSketch(seed=part[0]).update(part[1]), enumerate(np.split(values, 8))))
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert merged.n == len(values)
+    assert merged.size < 4 * merged.k
+    errors = np.abs(true_ranks(values, merged.quantiles(probabilities)) - probabilities)
+    assert errors.max() <= merged.rank_error()
+
+
+def test_describe_matches_pandas_while_exact_and_states_the_error_otherwise():
+    rng = np.random.default_rng(3)
+    small = pd.DataFrame({'valor': rng.normal(size=120), 'codigo': np.arange(120), 'nome': ['x'] * 120})
+    large = pd.DataFrame({'valor': rng.gamma(2.0, size=100_000)})
+
+    table, errors = describe([small.iloc[:70], small.iloc[70:]])
+    large_table, large_errors = describe(large.iloc[start : start + 10_000] for start in range(0, len(large), 10_000))
+
+    pd.testing.assert_frame_equal(table, small.describe())
+    assert errors.tolist() == [0.0, 0.0]
+    assert large_table.loc[['count', 'min', 'max'], 'valor'].tolist() == [
+        1e5,
+        large['valor'].min(),
+        large['valor'].max(),
+    ]
+    assert large_table.loc['mean', 'valor'] == pytest.approx(large['valor'].mean())
+    assert large_table.loc['std', 'valor'] == pytest.approx(large['valor'].std())
+    quartiles = large_table.loc[['25%', '50%', '75%'], 'valor']
+    assert np.abs(true_ranks(large['valor'], quartiles) - [0.25, 0.5, 0.75]).max() <= large_errors['valor']
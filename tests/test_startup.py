@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+from services import startup
+
+HEAVY_MODULES = ('torch', 'diffusers', 'statsmodels', 'pmdarima', 'mlxtend', 'yfinance')
+
+
+def test_services_import_without_heavy_dependencies():
+    probe = (
+        'import sys\n'
+        'import services.backtesting, services.diffusion, services.forecasting, services.generation_queue\n'
+        'import services.incremental, services.itemsets, services.startup\n'
+        f'print(",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n'
+    )
+    completed = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+
+    assert not completed.stdout.strip()
+
+
+def test_prewarm_runs_once_and_skips_missing_modules(monkeypatch):
+    monkeypatch.setattr(startup, '_thread', None)
+    monkeypatch.setattr(startup, 'import_times', {})
+
+    thread = startup.start_prewarm(['json', 'not_an_installed_module'])
+    thread.join()
+
+    assert startup.start_prewarm(['json']) is None
+    assert 'not_an_installed_module' not in startup.import_times
+
+
+def test_prewarm_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(startup, '_thread', None)
+    monkeypatch.setenv('PREWARM_MODULES', '')
+
+    assert startup.start_prewarm() is None
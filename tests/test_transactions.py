@@ -0,0 +1,45 @@
+import io
+
+import numpy as np
+from mlxtend.preprocessing import TransactionEncoder
+
+from services.transactions import encode_transactions
+
+LINES = ['Leite,Pão,Ovos\n', 'Pão, Manteiga\n', '\n', 'Leite,Leite,Cerveja\n', 'Ovos\n']
+
+
+def test_encoding_matches_transaction_encoder():
+    encoded = encode_transactions(LINES, chunk_size=2)
+    baskets = [[item.strip() for item in line.strip().split(',')] for line in LINES if line.strip()]
+    encoder = TransactionEncoder().fit(baskets)
+    expected = encoder.transform(baskets)
+
+    order = [encoded.items.index(item) for item in encoder.columns_]
+    assert encoded.matrix.shape == (4, 5)
+    np.testing.assert_array_equal(encoded.matrix.toarray()[:, order], expected)
+
+
+def test_binary_upload_is_left_open():
+    upload = io.BytesIO(''.join(LINES).encode('utf-8'))
+
+    encoded = encode_transactions(upload)
+
+    assert not upload.closed
+    assert encoded.baskets([1]) == [['Pão', 'Manteiga']]
+
+
+def test_prune_drops_infrequent_items():
+    encoded = encode_transactions(LINES)
+
+    pruned = encoded.prune(0.5)
+
+    assert pruned.items == ['Leite', 'Pão', 'Ovos']
+    assert pruned.item_support().tolist() == [0.5, 0.5, 0.5]
+    assert list(pruned.to_frame().columns) == pruned.items
+
+
+def test_preview_samples_without_replacement():
+    preview = encode_transactions(LINES).preview(n_rows=10)
+
+    assert len(preview) == 4
+    assert preview.loc[2, 'Itens'] == 'Leite, Cerveja'